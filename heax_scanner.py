@@ -2,22 +2,41 @@
 # -*- coding: utf-8 -*-
 
 import os
+import atexit
 import sys
 import time
 import json
 import hashlib
+import importlib.util
 import threading
 import multiprocessing
 import asyncio
-import aiohttp
+import errno
+import select
 import socket
 import ssl
+import struct
+import ipaddress
+import sqlite3
 import subprocess
 import logging
+import http.server
+import socketserver
+import smtplib
+import urllib.request
+import urllib.error
+import urllib.parse
+import queue
 import configparser
 import argparse
 import csv
+import gzip
+import zlib
+import codecs
+import html
+import html.parser
 import xml.etree.ElementTree as ET
+from xml.sax import saxutils
 import zipfile
 import tarfile
 import base64
@@ -27,62 +46,3807 @@ import uuid
 import collections
 import itertools
 import functools
+import array
+import math
+import random
+import types
+import warnings
+import heapq
+import re
+import bisect
+from email.message import EmailMessage
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional, Any
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from rich.console import Console
 from rich.table import Table
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
 from rich.panel import Panel
 from rich.text import Text
-from rich.layout import Layout
-from rich.live import Live
 from rich.align import Align
 from rich.columns import Columns
-from rich.console import Group
 from rich.prompt import Prompt, Confirm
-from rich.syntax import Syntax
-from rich.traceback import install
 from colorama import init, Fore, Back, Style
-from pyfiglet import Figlet
-import termcolor
-import schedule
-import requests
-from bs4 import BeautifulSoup
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-import nmap
-import scapy.all as scapy
-import paramiko
-import psutil
-
-install()
+
+LAZY_MODULES = []
+
+def lazy_import(name):
+    # The module body runs on first attribute access, so CLI runs and worker processes only pay
+    # for the subsystems they use; None when the package is not installed
+    if name not in LAZY_MODULES:
+        LAZY_MODULES.append(name)
+    if name in sys.modules:
+        return sys.modules[name]
+    try:
+        spec = importlib.util.find_spec(name)
+    except ImportError:
+        spec = None
+    if spec is None:
+        return None
+    spec.loader = importlib.util.LazyLoader(spec.loader)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+aiohttp = lazy_import('aiohttp')
+pyfiglet = lazy_import('pyfiglet')
+x509 = lazy_import('cryptography.x509')
+dsa = lazy_import('cryptography.hazmat.primitives.asymmetric.dsa')
+ec = lazy_import('cryptography.hazmat.primitives.asymmetric.ec')
+rsa = lazy_import('cryptography.hazmat.primitives.asymmetric.rsa')
+pyarrow = lazy_import('pyarrow')
 
 init(autoreset=True)
 
-class Colors:
-    RED = Fore.RED
-    GREEN = Fore.GREEN
-    YELLOW = Fore.YELLOW
-    BLUE = Fore.BLUE
-    MAGENTA = Fore.MAGENTA
-    CYAN = Fore.CYAN
-    WHITE = Fore.WHITE
-    RESET = Style.RESET_ALL
-    BRIGHT = Style.BRIGHT
-    DIM = Style.DIM
+class Colors:
+    RED = Fore.RED
+    GREEN = Fore.GREEN
+    YELLOW = Fore.YELLOW
+    BLUE = Fore.BLUE
+    MAGENTA = Fore.MAGENTA
+    CYAN = Fore.CYAN
+    WHITE = Fore.WHITE
+    RESET = Style.RESET_ALL
+    BRIGHT = Style.BRIGHT
+    DIM = Style.DIM
+
+COMMON_SERVICES = {
+    21: 'FTP', 22: 'SSH', 23: 'Telnet', 25: 'SMTP', 53: 'DNS', 80: 'HTTP',
+    110: 'POP3', 143: 'IMAP', 443: 'HTTPS', 445: 'SMB', 993: 'IMAPS', 995: 'POP3S',
+    1433: 'MSSQL', 1521: 'Oracle', 3306: 'MySQL', 3389: 'RDP', 5432: 'PostgreSQL',
+    5900: 'VNC', 6379: 'Redis', 8080: 'HTTP-Proxy', 8443: 'HTTPS-Alt',
+    9000: 'HTTP-Alt', 9090: 'HTTP-Alt', 9200: 'Elasticsearch', 9300: 'Elasticsearch',
+    27017: 'MongoDB'
+}
+
+PORT_RISK = {
+    21: 'Medium', 22: 'Medium', 23: 'High', 445: 'High', 1433: 'Medium',
+    1521: 'Medium', 3306: 'Medium', 3389: 'Medium', 5432: 'Medium', 5900: 'High',
+    6379: 'High', 9200: 'High', 9300: 'High', 27017: 'High'
+}
+
+SERVICE_RISK = {
+    'FTP': 'Medium', 'SSH': 'Medium', 'Telnet': 'High', 'SMB': 'High', 'MSSQL': 'Medium',
+    'Oracle': 'Medium', 'MySQL': 'Medium', 'RDP': 'Medium', 'PostgreSQL': 'Medium', 'VNC': 'High',
+    'Redis': 'High', 'Elasticsearch': 'High', 'MongoDB': 'High', 'Memcached': 'High'
+}
+
+# (service, product, banner regex anchored at the start); a 'version' group captures the version.
+# Order matters: the first alternative that matches wins, so specific before generic.
+SERVICE_SIGNATURES = (
+    ('SSH', 'OpenSSH', rb'^SSH-[\d.]+-OpenSSH[_-](?P<version>[\w.]+)'),
+    ('SSH', 'Dropbear', rb'^SSH-[\d.]+-dropbear_(?P<version>[\w.]+)'),
+    ('SSH', None, rb'^SSH-[\d.]+-(?P<version>\S+)'),
+    ('FTP', 'vsFTPd', rb'^220[ -].{0,80}?vsFTPd (?P<version>[\d.]+)'),
+    ('FTP', 'ProFTPD', rb'^220[ -].{0,80}?ProFTPD (?P<version>[\d.]+)'),
+    ('FTP', 'FileZilla', rb'^220[ -].{0,80}?FileZilla Server (?:version )?(?P<version>[\d.a-z]+)'),
+    ('FTP', 'Pure-FTPd', rb'^220[ -].{0,80}?Pure-FTPd'),
+    ('SMTP', 'Postfix', rb'^220[ -]\S+ E?SMTP.{0,40}?Postfix'),
+    ('SMTP', 'Exim', rb'^220[ -]\S+ E?SMTP Exim (?P<version>[\d.]+)'),
+    ('SMTP', 'Sendmail', rb'^220[ -]\S+ E?SMTP Sendmail (?P<version>[\d.]+)'),
+    ('SMTP', 'Microsoft ESMTP', rb'^220[ -]\S+ Microsoft ESMTP MAIL Service'),
+    ('SMTP', None, rb'^220[ -].{0,80}?E?SMTP'),
+    ('FTP', None, rb'^220[ -].{0,80}?FTP'),
+    ('POP3', 'Dovecot', rb'^\+OK.{0,40}?Dovecot'),
+    ('POP3', None, rb'^\+OK'),
+    ('IMAP', 'Dovecot', rb'^\* OK.{0,80}?Dovecot'),
+    ('IMAP', None, rb'^\* OK.{0,80}?IMAP'),
+    ('VNC', None, rb'^RFB (?P<version>\d{3}\.\d{3})'),
+    ('MySQL', 'MariaDB', rb'^.{4}\x0a(?P<version>[\d.]+-MariaDB)'),
+    ('MySQL', None, rb'^.{4}\x0a(?P<version>\d+\.\d+\.\d+)[\w.-]*\x00'),
+    ('Redis', None, rb'^-(?:ERR unknown command|NOAUTH|DENIED)'),
+    ('Memcached', None, rb'^(?:ERROR|CLIENT_ERROR)\r\n'),
+    ('MongoDB', None, rb'^HTTP/1\.[01] \d{3}.{0,1024}?It looks like you are trying to access MongoDB over HTTP'),
+    ('Elasticsearch', None, rb'^HTTP/1\.[01] \d{3}.{0,1024}?"cluster_name".{0,512}?"number" ?: ?"(?P<version>[\d.]+)"'),
+    ('HTTP', 'nginx', rb'^HTTP/1\.[01] \d{3}.{0,2048}?\r\nServer: nginx(?:/(?P<version>[\d.]+))?'),
+    ('HTTP', 'Apache httpd', rb'^HTTP/1\.[01] \d{3}.{0,2048}?\r\nServer: Apache(?:/(?P<version>[\d.]+))?'),
+    ('HTTP', 'Microsoft IIS', rb'^HTTP/1\.[01] \d{3}.{0,2048}?\r\nServer: Microsoft-IIS/(?P<version>[\d.]+)'),
+    ('HTTP', 'lighttpd', rb'^HTTP/1\.[01] \d{3}.{0,2048}?\r\nServer: lighttpd/(?P<version>[\d.]+)'),
+    ('HTTP', 'Jetty', rb'^HTTP/1\.[01] \d{3}.{0,2048}?\r\nServer: Jetty\((?P<version>[^)]+)\)'),
+    ('HTTP', 'gunicorn', rb'^HTTP/1\.[01] \d{3}.{0,2048}?\r\nServer: gunicorn(?:/(?P<version>[\d.]+))?'),
+    ('HTTP', None, rb'^HTTP/1\.[01] \d{3}.{0,2048}?\r\nServer: (?P<version>[^\r\n]+)'),
+    ('HTTP', None, rb'^HTTP/1\.[01] \d{3}'),
+    ('Telnet', None, rb'^\xff[\xfb-\xfe]'),
+)
+
+# Most frequently open TCP ports, most likely first
+TOP_PORTS = (
+    80, 23, 443, 21, 22, 25, 3389, 110, 445, 139, 143, 53, 135, 3306, 8080, 1723, 111, 995,
+    993, 5900, 1025, 587, 8888, 199, 1720, 465, 548, 113, 81, 6001, 10000, 514, 5060, 179,
+    1026, 2000, 8443, 8000, 32768, 554, 26, 1433, 49152, 2001, 515, 8008, 49154, 1027, 5666,
+    646, 5000, 5631, 631, 49153, 8081, 2049, 88, 79, 5800, 106, 2121, 1110, 49155, 6000, 513,
+    990, 5357, 427, 49156, 543, 544, 5101, 144, 7, 389, 8009, 3128, 444, 9999, 5009, 7070,
+    5190, 3000, 5432, 1900, 3986, 13, 1029, 9, 5051, 6646, 49157, 1028, 873, 1755, 2717, 4899,
+    9100, 119, 37, 1521, 6379, 27017, 9200, 9090, 9000, 8443, 11211, 5672, 2375, 50000
+)
+
+SCAN_TYPE_PROFILES = {'fast': 'quick_scan', 'normal': 'normal_scan', 'deep': 'deep_scan'}
+
+ScanProfile = collections.namedtuple('ScanProfile', 'name ports timeout threads host_major options')
+
+def parse_port_ranges(spec):
+    ranges = []
+    for part in str(spec).replace(' ', '').split(','):
+        if not part:
+            continue
+        start, _, end = part.partition('-')
+        start, end = int(start), int(end or start)
+        if not 0 < start <= end <= 65535:
+            raise ValueError(f"Invalid port range: {part}")
+        ranges.append((start, end))
+    ranges.sort()
+    merged = []
+    for start, end in ranges:
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+class PortPlan:
+    __slots__ = ('ranges', 'offsets', 'size', 'order', 'seed', 'priority', 'priority_positions', 'multiplier',
+                 'shift')
+
+    def __init__(self, ranges, order='likely', seed=None):
+        if order not in ('likely', 'random', 'sequential'):
+            raise ValueError(f"Unknown port order: {order}")
+        ranges = parse_port_ranges(','.join(f"{a}-{b}" for a, b in ranges))
+        self.ranges = tuple(ranges)
+        self.offsets = array.array('L', itertools.accumulate([0] + [b - a + 1 for a, b in ranges]))
+        self.size = self.offsets[-1]
+        self.order = order
+        self.seed = seed
+        
+        priority = array.array('H')
+        if order == 'likely':
+            for port in dict.fromkeys(TOP_PORTS):
+                if self.position(port) >= 0:
+                    priority.append(port)
+        self.priority = priority
+        self.priority_positions = array.array('L', sorted(self.position(port) for port in priority))
+        
+        multiplier, shift = 1, 0
+        if order == 'random' and self.size > 1:
+            # Affine walk i -> (a*i + b) mod n is a full permutation when gcd(a, n) == 1
+            rng = random.Random(seed)
+            multiplier = rng.randrange(1, self.size)
+            while math.gcd(multiplier, self.size) != 1:
+                multiplier = rng.randrange(1, self.size)
+            shift = rng.randrange(self.size)
+        self.multiplier = multiplier
+        self.shift = shift
+
+    @classmethod
+    def parse(cls, spec, order='likely', seed=None):
+        return cls(parse_port_ranges(spec), order, seed)
+
+    def __setattr__(self, name, value):
+        if hasattr(self, name):
+            raise AttributeError("PortPlan is immutable")
+        object.__setattr__(self, name, value)
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        if self.order == 'sequential':
+            for start, end in self.ranges:
+                yield from range(start, end + 1)
+        else:
+            for index in range(self.size):
+                yield self[index]
+
+    def __contains__(self, port):
+        return self.position(port) >= 0
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("port plan index out of range")
+        if self.order == 'random':
+            return self.sorted_port((self.multiplier * index + self.shift) % self.size)
+        if self.order == 'likely':
+            if index < len(self.priority):
+                return self.priority[index]
+            # index-th sorted position that is not already served by the priority list
+            rest = index - len(self.priority)
+            position = rest
+            while True:
+                candidate = rest + bisect.bisect_right(self.priority_positions, position)
+                if candidate == position:
+                    return self.sorted_port(position)
+                position = candidate
+        return self.sorted_port(index)
+
+    def sorted_port(self, position):
+        block = bisect.bisect_right(self.offsets, position) - 1
+        return self.ranges[block][0] + position - self.offsets[block]
+
+    def position(self, port):
+        block = bisect.bisect_right(self.ranges, (port, 65536)) - 1
+        if block >= 0 and self.ranges[block][0] <= port <= self.ranges[block][1]:
+            return self.offsets[block] + port - self.ranges[block][0]
+        return -1
+
+    def spec(self):
+        return ','.join(str(a) if a == b else f"{a}-{b}" for a, b in self.ranges)
+
+    def __repr__(self):
+        return f"PortPlan({self.spec()!r}, order={self.order!r}, size={self.size})"
+
+def compile_scan_profile(name, spec, seed=None):
+    options = {}
+    for field in spec.split(';'):
+        key, _, value = field.partition(':')
+        if key.strip():
+            options[key.strip().lower()] = value.strip()
+    if 'ports' not in options:
+        raise ValueError(f"Scan profile {name} has no ports")
+    ports = PortPlan.parse(options.pop('ports'), order=options.pop('order', 'likely'), seed=seed)
+    host_order = options.pop('hosts', 'interleaved')
+    if host_order not in ('interleaved', 'sequential'):
+        raise ValueError(f"Unknown host order in scan profile {name}: {host_order}")
+    return ScanProfile(
+        name=name,
+        ports=ports,
+        timeout=int(options.pop('timeout', 30)),
+        threads=int(options.pop('threads', 100)),
+        host_major=host_order == 'sequential',
+        options=types.MappingProxyType({key: value.lower() in ('true', 'yes', '1') if value.lower() in
+                                        ('true', 'false', 'yes', 'no', '1', '0') else value
+                                        for key, value in options.items()})
+    )
+
+def is_probable_prime(n):
+    if n < 2:
+        return False
+    for p in (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37):
+        if n % p == 0:
+            return n == p
+    d, r = n - 1, 0
+    while d % 2 == 0:
+        d, r = d // 2, r + 1
+    for a in (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37):
+        x = pow(a, d, n)
+        if x in (1, n - 1):
+            continue
+        for _ in range(r - 1):
+            x = pow(x, 2, n)
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+def find_primitive_root(p, rng):
+    factors, n, f = set(), p - 1, 2
+    while f * f <= n:
+        while n % f == 0:
+            factors.add(f)
+            n //= f
+        f += 1
+    if n > 1:
+        factors.add(n)
+    while True:
+        g = rng.randrange(2, p - 1) if p > 3 else 2
+        if all(pow(g, (p - 1) // q, p) != 1 for q in factors):
+            return g
+
+class TargetSpace:
+    # Largest space we permute; factoring p - 1 for primitive roots gets slow beyond this
+    MAX_PERMUTED = 1 << 40
+
+    def __init__(self, specs, max_hosts=0, permute=False, seed=None, literal=False):
+        self.blocks = []
+        self.resolved = {}
+        self.cache = None
+        for index, spec in enumerate(specs):
+            # Literal specs are single addresses (e.g. discovered hosts) and skip file/list parsing
+            items = (spec,) if literal else self.iter_spec_items(spec)
+            for item in items:
+                self.blocks.append(self.parse_item(item, index))
+        self.offsets = list(itertools.accumulate([0] + [block[2] for block in self.blocks]))
+        self.total = self.offsets[-1]
+        self.size = min(self.total, max_hosts) if max_hosts else self.total
+        self.truncated = self.size < self.total
+        self.seed = seed
+        self.prime = None
+        if permute and 2 < self.size <= self.MAX_PERMUTED:
+            # Walk the multiplicative group mod the next prime above size; values past size are holes
+            rng = random.Random(seed)
+            prime = self.size + 1
+            while not is_probable_prime(prime):
+                prime += 1
+            self.prime = prime
+            self.generator = find_primitive_root(prime, rng)
+            self.start = pow(self.generator, rng.randrange(prime - 1), prime)
+        self.slots = self.prime - 1 if self.prime else self.size
+
+    @staticmethod
+    def iter_spec_items(spec):
+        spec = spec.strip()
+        # A spec is a target file as a whole, or a list in which @path items name target files
+        items = [spec] if os.path.isfile(spec) else spec.replace(',', ' ').split()
+        for item in items:
+            path = item[1:] if item.startswith('@') else item
+            if item.startswith('@') or os.path.isfile(path):
+                with open(path, encoding='utf-8') as f:
+                    for line in f:
+                        line = line.split('#', 1)[0].strip()
+                        yield from line.replace(',', ' ').split()
+            else:
+                yield item
+
+    @staticmethod
+    def parse_item(item, spec_index):
+        if '-' in item:
+            first, _, last = item.partition('-')
+            try:
+                start = ipaddress.ip_address(first)
+                if '.' not in last and ':' not in last:
+                    # Short form: 10.0.0.1-50 replaces the last octet
+                    last = first.rsplit('.', 1)[0] + '.' + last
+                end = ipaddress.ip_address(last)
+            except ValueError:
+                start = None
+            if start is not None:
+                if int(end) < int(start) or start.version != end.version:
+                    raise ValueError(f"Invalid address range: {item}")
+                return ('ip', int(start), int(end) - int(start) + 1, start.version, spec_index)
+        try:
+            network = ipaddress.ip_network(item, strict=False)
+        except ValueError:
+            return ('name', item, 1, None, spec_index)
+        start, count = int(network.network_address), network.num_addresses
+        if network.version == 4 and count > 2:
+            start, count = start + 1, count - 2
+        elif network.version == 6 and count > 2:
+            start, count = start + 1, count - 1
+        return ('ip', start, count, network.version, spec_index)
+
+    def __len__(self):
+        return self.size
+
+    def iter_items(self):
+        for kind, start, count, version, _ in self.blocks:
+            if kind == 'name':
+                yield start
+            elif count == 1:
+                yield str(ipaddress.ip_address(start))
+            else:
+                yield f"{ipaddress.ip_address(start)}-{ipaddress.ip_address(start + count - 1)}"
+
+    def canonical_index(self, slot):
+        if self.prime is None:
+            return slot
+        value = self.start * pow(self.generator, slot, self.prime) % self.prime
+        return value - 1 if value <= self.size else None
+
+    def locate_canonical(self, index):
+        block = bisect.bisect_right(self.offsets, index) - 1
+        kind, start, _, version, spec_index = self.blocks[block]
+        if kind == 'name':
+            return self.resolve(start), spec_index
+        address = start + index - self.offsets[block]
+        if version == 4:
+            return socket.inet_ntoa(struct.pack('!I', address)), spec_index
+        return str(ipaddress.IPv6Address(address)), spec_index
+
+    def locate(self, slot):
+        index = self.canonical_index(slot)
+        if index is None:
+            return None, None
+        return self.locate_canonical(index)
+
+    def host_at(self, slot):
+        return self.locate(slot)[0]
+
+    def resolve(self, name):
+        if name not in self.resolved:
+            address = self.cache.get('dns', name) if self.cache is not None else None
+            if address is None or ':' in address:
+                try:
+                    address = socket.gethostbyname(name)
+                except (socket.gaierror, UnicodeError):
+                    logging.getLogger(__name__).warning(f"Could not resolve target {name}")
+                    address = None
+                if address is not None and self.cache is not None:
+                    self.cache.put('dns', name, 0, address)
+            self.resolved[name] = address
+        return self.resolved[name]
+
+    def __iter__(self):
+        for _, host in self.iter_slots():
+            if host is not None:
+                yield host
+
+    def iter_slots(self, first=0):
+        # (slot, host) from slot first on; host is None for permutation holes and names that did not resolve
+        if self.prime is None:
+            for index in range(first, self.size):
+                yield index, self.locate_canonical(index)[0]
+            return
+        prime, generator, size = self.prime, self.generator, self.size
+        value = self.start * pow(generator, first, prime) % prime
+        for slot in range(first, self.slots):
+            yield slot, self.locate_canonical(value - 1)[0] if value <= size else None
+            value = value * generator % prime
+
+    def spec_of(self, host):
+        try:
+            address = ipaddress.ip_address(host)
+        except ValueError:
+            address = None
+        for kind, start, count, version, spec_index in self.blocks:
+            if kind == 'name':
+                if self.resolved.get(start) == host:
+                    return spec_index
+            elif address is not None and address.version == version and start <= int(address) < start + count:
+                return spec_index
+        return None
+
+    def iter_canonical(self):
+        # Unpermuted order, so callers that only filter hosts do not pay for the permutation
+        for index in range(self.size):
+            host = self.locate_canonical(index)[0]
+            if host is not None:
+                yield host
+
+    def without(self, excluded):
+        # Splits the blocks around the excluded addresses instead of listing every remaining host
+        addresses = []
+        for host in excluded:
+            try:
+                address = ipaddress.ip_address(host)
+            except ValueError:
+                continue
+            addresses.append((address.version, int(address)))
+        addresses.sort()
+        specs = []
+        for offset, (kind, start, count, version, _) in zip(self.offsets, self.blocks):
+            count = min(count, self.size - offset)
+            if count <= 0:
+                break
+            if kind == 'name':
+                if self.resolved.get(start) not in excluded:
+                    specs.append(start)
+                continue
+            low, end = start, start + count
+            first = bisect.bisect_left(addresses, (version, start))
+            for _, address in addresses[first:bisect.bisect_left(addresses, (version, end))]:
+                if address > low:
+                    specs.append(self.format_range(low, address - 1, version))
+                low = address + 1
+            if low < end:
+                specs.append(self.format_range(low, end - 1, version))
+        space = TargetSpace(specs, permute=self.prime is not None, seed=self.seed, literal=True)
+        space.cache = self.cache
+        space.resolved.update(self.resolved)
+        return space
+
+    @staticmethod
+    def format_range(first, last, version):
+        address = ipaddress.IPv4Address if version == 4 else ipaddress.IPv6Address
+        return str(address(first)) if first == last else f"{address(first)}-{address(last)}"
+
+    def iter_work(self, ports, host_major=False):
+        if host_major:
+            return ((host, port) for host in self for port in ports)
+        # Port-major order spreads consecutive probes across hosts
+        return ((host, port) for port in ports for host in self)
+
+def fd_budget(reserve=64):
+    try:
+        import resource
+    except ImportError:
+        return 512
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != resource.RLIM_INFINITY and (hard == resource.RLIM_INFINITY or soft < hard):
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+            soft = hard
+        except (ValueError, OSError):
+            pass
+    if soft == resource.RLIM_INFINITY:
+        return 65536
+    return max(16, soft - reserve)
+
+def ipaddress_sort_key(host):
+    try:
+        return (0, int(ipaddress.ip_address(host)))
+    except ValueError:
+        return (1, host)
+
+SCAN_SPEEDS = {
+    'slow': {'initial_window': 16, 'host_window': 2, 'max_host_window': 16},
+    'normal': {'initial_window': 64, 'host_window': 4, 'max_host_window': 128},
+    'fast': {'initial_window': 256, 'host_window': 8, 'max_host_window': 1024},
+    'insane': {'initial_window': 1024, 'host_window': 32, 'max_host_window': 4096}
+}
+
+LOCAL_CONGESTION_ERRORS = {errno.ENOBUFS, errno.EAGAIN, errno.EADDRNOTAVAIL, errno.EMFILE, errno.ENFILE}
+
+class HostWindow:
+    __slots__ = ('cwnd', 'ssthresh', 'inflight', 'srtt', 'rttvar', 'last_decrease')
+
+    def __init__(self, cwnd, ssthresh):
+        self.cwnd = float(cwnd)
+        self.ssthresh = float(ssthresh)
+        self.inflight = 0
+        self.srtt = None
+        self.rttvar = 0.0
+        self.last_decrease = 0.0
+
+class CongestionController:
+
+    def __init__(self, max_window, speed='fast', max_timeout=10.0, initial_timeout=1.0, min_timeout=0.1,
+                 max_hosts=65536):
+        settings = SCAN_SPEEDS.get(speed, SCAN_SPEEDS['normal'])
+        self.max_window = max(1, max_window)
+        self.host_window = settings['host_window']
+        self.max_host_window = settings['max_host_window']
+        self.max_timeout = max_timeout
+        self.initial_timeout = min(initial_timeout, max_timeout)
+        self.min_timeout = min(min_timeout, self.initial_timeout)
+        self.window = HostWindow(min(settings['initial_window'], self.max_window), self.max_window)
+        # Per-host windows are an LRU: idle hosts past max_hosts are forgotten, so sweeps of huge
+        # target spaces keep constant memory
+        self.hosts = collections.OrderedDict()
+        self.max_hosts = max(1, max_hosts)
+
+    def host(self, host):
+        window = self.hosts.get(host)
+        if window is None:
+            if len(self.hosts) >= self.max_hosts:
+                self.evict(self.max_hosts - 1)
+            window = self.hosts[host] = HostWindow(self.host_window, self.max_host_window)
+        else:
+            self.hosts.move_to_end(host)
+        return window
+
+    def evict(self, keep):
+        # Hosts with probes in flight are still needed; rotate them to the back instead
+        for _ in range(len(self.hosts)):
+            if len(self.hosts) <= keep:
+                return
+            host, window = self.hosts.popitem(last=False)
+            if window.inflight > 0:
+                self.hosts[host] = window
+
+    def can_send(self, host):
+        window = self.hosts.get(host)
+        if window is not None and window.inflight >= window.cwnd:
+            return False
+        return self.window.inflight < self.window.cwnd
+
+    def on_send(self, host):
+        self.window.inflight += 1
+        self.host(host).inflight += 1
+
+    def timeout(self, host):
+        window = self.hosts.get(host)
+        if window is None or window.srtt is None:
+            window = self.window
+        if window.srtt is None:
+            return self.initial_timeout
+        return min(self.max_timeout, max(self.min_timeout, window.srtt + 4 * window.rttvar))
+
+    def on_response(self, host, rtt):
+        window = self.host(host)
+        window.inflight -= 1
+        self.window.inflight -= 1
+        for w, limit in ((window, self.max_host_window), (self.window, self.max_window)):
+            # Only grow while the answer came back about as fast as usual
+            stable = w.srtt is None or rtt <= 1.5 * w.srtt + 0.005
+            self.update_rtt(w, rtt)
+            if stable and w.cwnd < limit:
+                w.cwnd = min(limit, w.cwnd + (1.0 if w.cwnd < w.ssthresh else 1.0 / w.cwnd))
+
+    def on_timeout(self, host, now):
+        window = self.host(host)
+        window.inflight -= 1
+        self.window.inflight -= 1
+        # Silence from a host that never answered is a filtered port, not congestion
+        if window.srtt is None:
+            return
+        self.decrease(window, now, floor=1)
+        self.decrease(self.window, now, floor=4)
+
+    def on_local_error(self, host, now):
+        window = self.host(host)
+        window.inflight -= 1
+        self.window.inflight -= 1
+        self.decrease(self.window, now, floor=4)
+
+    def decrease(self, window, now, floor):
+        # At most one multiplicative decrease per round trip, as in TCP
+        if now - window.last_decrease < (window.srtt or self.initial_timeout):
+            return
+        window.last_decrease = now
+        window.ssthresh = max(floor, window.cwnd / 2)
+        window.cwnd = window.ssthresh
+
+    @staticmethod
+    def update_rtt(window, rtt):
+        if window.srtt is None:
+            window.srtt = rtt
+            window.rttvar = rtt / 2
+        else:
+            window.rttvar = 0.75 * window.rttvar + 0.25 * abs(window.srtt - rtt)
+            window.srtt = 0.875 * window.srtt + 0.125 * rtt
+
+class PortScanEngine:
+
+    def __init__(self, concurrency=1000, speed='fast', max_timeout=10.0, retries=0):
+        self.concurrency = max(1, min(concurrency, fd_budget()))
+        self.controller = CongestionController(self.concurrency, speed=speed, max_timeout=max_timeout)
+        self.retries = retries
+        self.completed = 0
+        self.stats = collections.Counter()
+        self._slot_free = None
+        self._poller = None
+        self._waiting = {}
+        self._deadlines = []
+        self._sequence = itertools.count()
+
+    def start_probe(self, loop, host, port, done):
+        family = socket.AF_INET6 if ':' in host else socket.AF_INET
+        sock = None
+        try:
+            sock = socket.socket(family, socket.SOCK_STREAM)
+            sock.setblocking(False)
+            started = loop.time()
+            err = sock.connect_ex((host, port))
+        except OSError as e:
+            # EMFILE/ENFILE or an unsupported address family: the probe was already counted as sent,
+            # so it has to finish through done() like any other
+            self.finish_probe(sock, e.errno, host, port, done, None)
+            return
+        if err not in (errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY):
+            self.finish_probe(sock, err, host, port, done, 0.0)
+            return
+        
+        fd = sock.fileno()
+        timeout = self.controller.timeout(host)
+        if self._poller is not None:
+            # Fast path: one epoll set shared by every pending connect, reaped in bulk
+            self._poller.register(fd, select.EPOLLOUT)
+            self._waiting[fd] = (sock, host, port, done, started)
+            heapq.heappush(self._deadlines, (started + timeout, next(self._sequence), fd, sock))
+            return
+        
+        def on_writable():
+            loop.remove_writer(fd)
+            timer.cancel()
+            err = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+            self.finish_probe(sock, err, host, port, done, loop.time() - started)
+        
+        def on_timeout():
+            loop.remove_writer(fd)
+            sock.close()
+            done(host, port, 'filtered', None)
+        
+        loop.add_writer(fd, on_writable)
+        timer = loop.call_later(timeout, on_timeout)
+
+    def finish_probe(self, sock, err, host, port, done, rtt):
+        if err == 0:
+            # Reset instead of FIN on close so open ports don't pile up TIME_WAIT sockets
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+            state = 'open'
+        elif err == errno.ECONNREFUSED:
+            state = 'closed'
+        elif err in LOCAL_CONGESTION_ERRORS:
+            state = 'error'
+        else:
+            state = 'filtered'
+        if sock is not None:
+            sock.close()
+        done(host, port, state, rtt)
+
+    def drain_ready(self):
+        now = asyncio.get_running_loop().time()
+        for fd, _ in self._poller.poll(0, 4096):
+            entry = self._waiting.pop(fd, None)
+            if entry is None:
+                continue
+            sock, host, port, done, started = entry
+            self._poller.unregister(fd)
+            err = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+            self.finish_probe(sock, err, host, port, done, now - started)
+
+    def expire_pending(self, now):
+        deadlines = self._deadlines
+        while deadlines and deadlines[0][0] <= now:
+            _, _, fd, sock = heapq.heappop(deadlines)
+            entry = self._waiting.get(fd)
+            # The fd may already have been reaped and reused by a newer socket
+            if entry is None or entry[0] is not sock:
+                continue
+            del self._waiting[fd]
+            self._poller.unregister(fd)
+            sock.close()
+            entry[3](entry[1], entry[2], 'filtered', None)
+
+    async def reap_timeouts(self, loop):
+        while True:
+            await asyncio.sleep(self.controller.min_timeout / 2)
+            self.expire_pending(loop.time())
+
+    async def scan(self, hosts, ports, on_open=None, host_major=False):
+        if host_major:
+            items = ((host, port) for host in hosts for port in ports)
+        else:
+            # Port-major order spreads consecutive probes across hosts
+            items = ((host, port) for port in ports for host in hosts)
+        return await self.scan_items(items, on_open)
+
+    async def scan_items(self, items, on_open=None, on_answer=None, on_done=None):
+        loop = asyncio.get_running_loop()
+        controller = self.controller
+        self._slot_free = asyncio.Event()
+        open_ports = []
+        retry_queue = collections.deque()
+        attempts = {}
+        reaper = None
+        if hasattr(select, 'epoll'):
+            self._poller = select.epoll()
+            loop.add_reader(self._poller.fileno(), self.drain_ready)
+            reaper = asyncio.ensure_future(self.reap_timeouts(loop))
+        
+        def done(host, port, state, rtt):
+            if rtt is not None and state != 'error':
+                controller.on_response(host, rtt)
+            elif state == 'error':
+                controller.on_local_error(host, loop.time())
+            else:
+                controller.on_timeout(host, loop.time())
+            self._slot_free.set()
+            
+            if state in ('filtered', 'error'):
+                tries = attempts.get((host, port), 0)
+                if tries < self.retries:
+                    attempts[(host, port)] = tries + 1
+                    retry_queue.append((host, port))
+                    return
+            
+            attempts.pop((host, port), None)
+            self.completed += 1
+            self.stats['filtered' if state == 'error' else state] += 1
+            if on_done:
+                on_done(host, port, state)
+            if on_answer and state in ('open', 'closed'):
+                on_answer(host, port, state)
+            if state == 'open':
+                open_ports.append((host, port))
+                if on_open:
+                    on_open(host, port)
+        
+        async def send(host, port):
+            while not controller.can_send(host):
+                self._slot_free.clear()
+                await self._slot_free.wait()
+            controller.on_send(host)
+            self.start_probe(loop, host, port, done)
+        
+        try:
+            for sent, (host, port) in enumerate(items, 1):
+                while retry_queue:
+                    await send(*retry_queue.popleft())
+                await send(host, port)
+                # Refused connects can complete synchronously, so yield now and then
+                if sent % 1024 == 0:
+                    await asyncio.sleep(0)
+            
+            while controller.window.inflight or retry_queue:
+                while retry_queue:
+                    await send(*retry_queue.popleft())
+                self._slot_free.clear()
+                if controller.window.inflight:
+                    await self._slot_free.wait()
+        finally:
+            if self._poller is not None:
+                if reaper:
+                    reaper.cancel()
+                loop.remove_reader(self._poller.fileno())
+                for entry in self._waiting.values():
+                    entry[0].close()
+                self._waiting.clear()
+                self._deadlines.clear()
+                self._poller.close()
+                self._poller = None
+        return open_ports
+
+class ScanCheckpoint:
+    # Resumable position in a network scan's host x port enumeration. Every item before cursor is finished;
+    # done holds the finished items past it, which the engine's in-flight window keeps to a narrow band.
+
+    def __init__(self, target, scan_type, hosts, ports, host_major, created=None, cursor=0, done=(), open_ports=(),
+                 stats=None, reused=None):
+        self.target = target
+        self.scan_type = scan_type
+        self.hosts = hosts
+        self.ports = ports
+        self.host_major = host_major
+        self.created = created or time.time()
+        self.cursor = cursor
+        self.done = set(done)
+        self.open_ports = [tuple(item) for item in open_ports]
+        self.stats = collections.Counter(stats or {})
+        self.reused = reused
+        self.total = hosts.slots * len(ports)
+        self.pending = {}
+
+    @classmethod
+    def start(cls, target, scan_type, hosts, profile, reused=None):
+        # Pin the port order's seed so a resumed scan walks the same enumeration
+        ports = PortPlan(profile.ports.ranges, profile.ports.order, seed=random.randrange(1 << 32))
+        return cls(target, scan_type, hosts, ports, profile.host_major, reused=reused)
+
+    @classmethod
+    def from_row(cls, row):
+        layout = json.loads(row['layout'])
+        hosts = TargetSpace(layout['hosts'], max_hosts=layout['max_hosts'], permute=layout['permute'],
+                            seed=layout['host_seed'], literal=True)
+        ports = PortPlan.parse(layout['ports'], layout['order'], seed=layout['port_seed'])
+        return cls(row['target'], row['scan_type'], hosts, ports, layout['host_major'], row['created'],
+                   row['cursor'], cls.unpack_done(row['cursor'], row['done']), json.loads(row['open_ports']),
+                   json.loads(row['stats']), json.loads(row['reused']) if row['reused'] else None)
+
+    def matches(self, profile):
+        return (self.ports.spec() == profile.ports.spec() and self.ports.order == profile.ports.order
+                and self.host_major == profile.host_major)
+
+    def progress(self):
+        return self.cursor + len(self.done)
+
+    def iter_work(self):
+        hosts, ports, first = self.hosts, self.ports, self.cursor
+        if self.host_major:
+            for slot, host in hosts.iter_slots(first // len(ports)):
+                base = slot * len(ports)
+                for port_index in range(max(first - base, 0), len(ports)):
+                    if self.claim(base + port_index, host, ports[port_index]):
+                        yield host, ports[port_index]
+        else:
+            for port_index in range(first // hosts.slots, len(ports)):
+                port = ports[port_index]
+                base = port_index * hosts.slots
+                for slot, host in hosts.iter_slots(max(first - base, 0)):
+                    if self.claim(base + slot, host, port):
+                        yield host, port
+
+    def claim(self, index, host, port):
+        # Finished items ahead of the walk leave done once the cursor passes them
+        if index < self.cursor or index in self.done:
+            return False
+        if host is None or (host, port) in self.pending:
+            # Holes in the host permutation and repeated targets need no probe of their own
+            self.finish(index)
+            return False
+        self.pending[(host, port)] = index
+        return True
+
+    def complete(self, host, port, state):
+        index = self.pending.pop((host, port), None)
+        if index is not None:
+            self.finish(index)
+            if state == 'open':
+                self.open_ports.append((host, port))
+
+    def finish(self, index):
+        if index != self.cursor:
+            self.done.add(index)
+            return
+        self.cursor += 1
+        while self.cursor in self.done:
+            self.done.remove(self.cursor)
+            self.cursor += 1
+
+    def pack_done(self):
+        bitmap = bytearray((max(self.done) - self.cursor) // 8 + 1 if self.done else 0)
+        for index in self.done:
+            offset = index - self.cursor
+            bitmap[offset >> 3] |= 1 << (offset & 7)
+        return zlib.compress(bytes(bitmap))
+
+    @staticmethod
+    def unpack_done(cursor, blob):
+        bitmap = zlib.decompress(blob) if blob else b''
+        return {cursor + (position << 3) + bit for position, byte in enumerate(bitmap) if byte
+                for bit in range(8) if byte >> bit & 1}
+
+    def to_row(self):
+        hosts, ports = self.hosts, self.ports
+        layout = {
+            'hosts': list(hosts.iter_items()), 'max_hosts': hosts.size if hosts.truncated else 0,
+            'permute': hosts.prime is not None, 'host_seed': hosts.seed,
+            'ports': ports.spec(), 'order': ports.order, 'port_seed': ports.seed, 'host_major': self.host_major
+        }
+        return (self.target, self.scan_type, self.created, time.time(), json.dumps(layout),
+                json.dumps(self.reused, default=str) if self.reused is not None else None,
+                self.cursor, self.pack_done(), json.dumps(self.open_ports), json.dumps(self.stats))
+
+    def progress_row(self, stats):
+        return (time.time(), self.cursor, self.pack_done(), json.dumps(self.open_ports),
+                json.dumps(self.stats + collections.Counter(stats)), self.target, self.scan_type)
+
+def icmp_checksum(data):
+    if len(data) % 2:
+        data += b'\x00'
+    total = sum(struct.unpack(f'!{len(data) // 2}H', data))
+    total = (total >> 16) + (total & 0xffff)
+    total += total >> 16
+    return ~total & 0xffff
+
+class IcmpPinger:
+
+    def __init__(self, timeout=1.0, batch=256):
+        self.timeout = timeout
+        self.batch = batch
+        self.identifier = os.getpid() & 0xffff
+
+    @staticmethod
+    def available():
+        if not hasattr(os, 'geteuid') or os.geteuid() != 0:
+            return False
+        try:
+            socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP).close()
+            return True
+        except OSError:
+            return False
+
+    def build_echo(self, sequence):
+        header = struct.pack('!BBHHH', 8, 0, 0, self.identifier, sequence)
+        payload = b'heax-discovery'
+        return struct.pack('!BBHHH', 8, 0, icmp_checksum(header + payload), self.identifier, sequence) + payload
+
+    async def ping(self, hosts, on_alive=None):
+        loop = asyncio.get_running_loop()
+        sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+        sock.setblocking(False)
+        alive = set()
+        
+        def on_readable():
+            while True:
+                try:
+                    data, (address, _) = sock.recvfrom(1024)
+                except (BlockingIOError, InterruptedError):
+                    return
+                offset = (data[0] & 0x0f) * 4
+                if len(data) < offset + 8:
+                    continue
+                icmp_type, _, _, identifier, _ = struct.unpack('!BBHHH', data[offset:offset + 8])
+                if icmp_type == 0 and identifier == self.identifier and address not in alive:
+                    alive.add(address)
+                    if on_alive:
+                        on_alive(address)
+        
+        loop.add_reader(sock.fileno(), on_readable)
+        try:
+            for sequence, host in enumerate(hosts):
+                if ':' in host:
+                    continue
+                packet = self.build_echo(sequence & 0xffff)
+                while True:
+                    try:
+                        sock.sendto(packet, (host, 0))
+                        break
+                    except (BlockingIOError, InterruptedError):
+                        await asyncio.sleep(0.001)
+                    except OSError:
+                        break
+                if sequence % self.batch == 0:
+                    await asyncio.sleep(0)
+            await asyncio.sleep(self.timeout)
+        finally:
+            loop.remove_reader(sock.fileno())
+            sock.close()
+        return alive
+
+class HostDiscovery:
+
+    def __init__(self, ports=(80, 443, 22, 445, 3389), timeout=1.0, engine_options=None, use_icmp=True):
+        self.ports = tuple(ports)
+        self.timeout = timeout
+        self.engine_options = dict(engine_options or {})
+        self.engine_options['max_timeout'] = min(timeout, self.engine_options.get('max_timeout', timeout))
+        self.engine_options['retries'] = 0
+        self.use_icmp = use_icmp and IcmpPinger.available()
+        self.stats = collections.Counter()
+
+    async def discover(self, hosts, on_alive=None):
+        alive = {}
+        
+        def mark(host, method):
+            if host not in alive:
+                alive[host] = method
+                self.stats[method] += 1
+                if on_alive:
+                    on_alive(host)
+        
+        if self.use_icmp:
+            await IcmpPinger(self.timeout).ping(iter(hosts), lambda host: mark(host, 'icmp'))
+        
+        # An RST is as good as a SYN/ACK: either way something answered at that address
+        engine = PortScanEngine(**self.engine_options)
+        items = ((host, port) for port in self.ports for host in hosts if host not in alive)
+        await engine.scan_items(items, on_answer=lambda host, port, state: mark(host, 'tcp'))
+        return list(alive)
+
+def compile_signatures(signatures):
+    # One alternation with a named group per signature: a single regex pass identifies the service
+    parts = []
+    for index, (_, _, pattern) in enumerate(signatures):
+        if not pattern.startswith(b'^'):
+            raise ValueError(f"Service signature {index} is not anchored")
+        pattern = pattern[1:].replace(b'(?P<version>', b'(?P<v%d>' % index)
+        parts.append(b'(?P<s%d>%s)' % (index, pattern))
+    return re.compile(b'|'.join(parts), re.DOTALL)
+
+class ServiceDetector:
+    PROBE = b'GET / HTTP/1.0\r\n\r\n'
+    matcher = None
+
+    def __init__(self, concurrency=500, timeout=3.0, max_bytes=2048, cache=None):
+        self.concurrency = max(1, min(concurrency, fd_budget()))
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.cache = cache
+        self.stats = collections.Counter()
+        if ServiceDetector.matcher is None:
+            ServiceDetector.matcher = compile_signatures(SERVICE_SIGNATURES)
+
+    @classmethod
+    def identify(cls, banner):
+        if cls.matcher is None:
+            cls.matcher = compile_signatures(SERVICE_SIGNATURES)
+        match = cls.matcher.match(banner)
+        if match is None:
+            return None
+        index = int(match.lastgroup[1:])
+        service, product, _ = SERVICE_SIGNATURES[index]
+        version = match.groupdict().get(f'v{index}')
+        return {
+            'service': service,
+            'product': product,
+            'version': version.decode('utf-8', 'replace').strip() if version else None
+        }
+
+    async def read_some(self, reader, timeout):
+        try:
+            return await asyncio.wait_for(reader.read(self.max_bytes), timeout)
+        except asyncio.TimeoutError:
+            return b''
+
+    async def grab(self, host, port):
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), self.timeout)
+        except (asyncio.TimeoutError, OSError):
+            return None
+        try:
+            # Talkative services (SSH, FTP, SMTP...) greet first; the rest get a generic HTTP probe
+            banner = await self.read_some(reader, self.timeout / 2)
+            if not banner:
+                writer.write(self.PROBE)
+                await writer.drain()
+                banner = await self.read_some(reader, self.timeout / 2)
+            while banner and len(banner) < self.max_bytes and banner.startswith(b'HTTP/') \
+                    and b'\r\n\r\n' not in banner:
+                more = await self.read_some(reader, self.timeout / 2)
+                if not more:
+                    break
+                banner += more
+            return banner[:self.max_bytes]
+        except OSError:
+            return None
+        finally:
+            writer.close()
+
+    async def detect(self, endpoints, on_result=None):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results = {}
+        
+        async def run(host, port):
+            banner = self.cache.get('banner', host, port) if self.cache is not None else None
+            if banner is None:
+                async with semaphore:
+                    banner = await self.grab(host, port)
+                if banner and self.cache is not None:
+                    self.cache.put('banner', host, port, banner)
+            else:
+                self.stats['cached'] += 1
+            info = self.identify(banner) if banner else None
+            self.stats['identified' if info else 'unidentified'] += 1
+            info = info or {'service': None, 'product': None, 'version': None}
+            line = banner.split(b'\r\n', 1)[0][:200].decode('utf-8', 'replace') if banner else ''
+            info['banner'] = ''.join(c if c.isprintable() else '.' for c in line)
+            results[(host, port)] = info
+            if on_result:
+                on_result(host, port, info)
+        
+        await asyncio.gather(*(run(host, port) for host, port in endpoints))
+        return results
+
+APP_PORTS = {80: 'http', 443: 'https', 8000: 'http', 8008: 'http', 8080: 'http', 8443: 'https',
+             8888: 'http', 9443: 'https'}
+
+# (header, only for scheme, severity, title, remediation)
+SECURITY_HEADERS = (
+    ('strict-transport-security', 'https', 'medium', 'Missing HSTS header',
+     'Send Strict-Transport-Security with a long max-age'),
+    ('content-security-policy', None, 'low', 'Missing Content-Security-Policy header',
+     'Define a Content-Security-Policy restricting script sources'),
+    ('x-frame-options', None, 'low', 'Missing clickjacking protection',
+     'Send X-Frame-Options or a CSP frame-ancestors directive'),
+    ('x-content-type-options', None, 'low', 'Missing X-Content-Type-Options header',
+     'Send X-Content-Type-Options: nosniff'),
+)
+
+# (path, body marker confirming a real hit, severity, title)
+SENSITIVE_PATHS = (
+    ('/.git/HEAD', rb'^ref: refs/', 'high', 'Exposed Git repository'),
+    ('/.env', rb'(?m)^[A-Z][A-Z0-9_]*=', 'critical', 'Exposed environment file'),
+    ('/server-status', rb'Apache Server Status', 'medium', 'Apache server-status page exposed'),
+    ('/phpinfo.php', rb'phpinfo\(\)', 'medium', 'phpinfo() page exposed'),
+    ('/.DS_Store', rb'^\x00\x00\x00\x01Bud1', 'low', 'Exposed .DS_Store file'),
+    ('/actuator/env', rb'"propertySources"', 'high', 'Spring Boot actuator environment exposed'),
+)
+
+# (library, first safe version, severity, advisory)
+VULNERABLE_LIBRARIES = {
+    'jquery': ((3, 5, 0), 'medium', 'CVE-2020-11022'),
+    'bootstrap': ((3, 4, 1), 'medium', 'CVE-2019-8331'),
+    'angular': ((1, 8, 0), 'medium', 'AngularJS 1.x is end-of-life'),
+    'lodash': ((4, 17, 21), 'high', 'CVE-2021-23337'),
+    'moment': ((2, 29, 4), 'medium', 'CVE-2022-31129')
+}
+
+class StreamingHTMLAnalyzer(html.parser.HTMLParser):
+    LIBRARY_VERSION = re.compile(
+        r'(?:^|/)(?P<name>[a-z][a-z.]*?)[.-]v?(?P<version>\d+\.\d+(?:\.\d+)?)(?:\.min|\.slim)*\.js|'
+        r'(?:^|/)(?P<qname>[a-z][a-z.-]*?)(?:\.min)?\.js\?(?:ver|v)=(?P<qversion>\d+\.\d+(?:\.\d+)?)',
+        re.IGNORECASE)
+    CSRF_FIELD = re.compile(r'csrf|xsrf|token|authenticity|nonce', re.IGNORECASE)
+
+    def __init__(self, scheme='http', charset=None, max_forms=20, max_scripts=50, max_pending=65536):
+        super().__init__(convert_charrefs=True)
+        self.scheme = scheme
+        self.decoder = codecs.getincrementaldecoder(self.codec(charset))(errors='replace')
+        self.max_forms = max_forms
+        self.max_scripts = max_scripts
+        self.max_pending = max_pending
+        self.title = None
+        self.generator = None
+        self.forms = []
+        self.scripts = []
+        self.libraries = {}
+        self.head_done = False
+        self.finished = False
+        self.overflowed = False
+        self.bytes_seen = 0
+        self.in_title = False
+        self.title_parts = []
+        self.form = None
+
+    @staticmethod
+    def codec(charset):
+        try:
+            return codecs.lookup(charset or 'utf-8').name
+        except LookupError:
+            return 'utf-8'
+
+    def feed_bytes(self, chunk):
+        self.bytes_seen += len(chunk)
+        self.feed(self.decoder.decode(chunk))
+        # An unterminated construct (huge inline script, comment) keeps piling up in the parser. Cutting it
+        # would lose its opener and parse the rest as markup, so stop reading the page instead
+        if len(self.rawdata) > self.max_pending:
+            self.overflowed = True
+        return self.decided()
+
+    def decided(self):
+        # Head-only checks are decided at <body>; form and script checks report every instance up to their
+        # caps, so they are decided only at the caps or at </body> or </html>
+        if self.finished or self.overflowed:
+            return True
+        head = self.head_done or (self.title is not None and self.generator is not None)
+        return head and len(self.forms) >= self.max_forms and len(self.scripts) >= self.max_scripts
+
+    def insecure_action(self, action):
+        return action.startswith('http://') or (self.scheme == 'http' and not action.startswith('https://'))
+
+    def vulnerable_library(self, name, version):
+        known = VULNERABLE_LIBRARIES.get(name)
+        return known if known and tuple(int(part) for part in version.split('.')) < known[0] else None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'title' and self.title is None:
+            self.in_title = True
+        elif tag == 'meta' and (attrs.get('name') or '').lower() == 'generator' and self.generator is None:
+            self.generator = (attrs.get('content') or '').strip()[:200] or None
+        elif tag == 'script' and attrs.get('src') and len(self.scripts) < self.max_scripts:
+            src = attrs['src'][:500]
+            self.scripts.append(src)
+            match = self.LIBRARY_VERSION.search(src.split('#', 1)[0])
+            if match:
+                name = (match.group('name') or match.group('qname')).lower().split('.')[0]
+                self.libraries.setdefault(name, match.group('version') or match.group('qversion'))
+        elif tag == 'form' and len(self.forms) < self.max_forms:
+            self.form = {'action': attrs.get('action') or '', 'method': (attrs.get('method') or 'get').lower(),
+                         'password': False, 'csrf': False}
+            self.forms.append(self.form)
+        elif tag == 'input' and self.form is not None:
+            input_type = (attrs.get('type') or 'text').lower()
+            if input_type == 'password':
+                self.form['password'] = True
+            elif input_type == 'hidden' and self.CSRF_FIELD.search(attrs.get('name') or ''):
+                self.form['csrf'] = True
+        elif tag == 'body':
+            self.head_done = True
+
+    def handle_endtag(self, tag):
+        if tag == 'title' and self.in_title:
+            self.in_title = False
+            self.title = ' '.join(''.join(self.title_parts).split())[:200]
+        elif tag == 'head':
+            self.head_done = True
+        elif tag == 'form':
+            self.form = None
+        elif tag in ('body', 'html'):
+            self.finished = True
+
+    def handle_data(self, data):
+        if self.in_title and sum(map(len, self.title_parts)) < 1024:
+            self.title_parts.append(data)
+
+    def findings(self):
+        results = []
+        if self.generator and re.search(r'\d', self.generator):
+            results.append(('Information Disclosure', 'low', f"Generator meta tag discloses '{self.generator}'",
+                            'Remove the generator meta tag'))
+        for form in self.forms:
+            action = form['action']
+            if form['password'] and self.insecure_action(action):
+                results.append(('Insecure Form', 'medium', f"Password form posts over plain HTTP ({action or '/'})",
+                                'Serve login forms and their targets over HTTPS only'))
+            if form['method'] == 'post' and not form['csrf']:
+                results.append(('Missing CSRF Token', 'low', f"POST form without anti-CSRF token ({action or '/'})",
+                                'Add a per-session anti-CSRF token to state-changing forms'))
+        if self.scheme == 'https':
+            for src in self.scripts:
+                if src.startswith('http://'):
+                    results.append(('Mixed Content', 'medium', f"Script loaded over plain HTTP: {src}",
+                                    'Load every script over HTTPS'))
+        for name, version in self.libraries.items():
+            known = self.vulnerable_library(name, version)
+            if known:
+                results.append(('Vulnerable JavaScript Library', known[1], f"{name} {version} ({known[2]})",
+                                f"Upgrade {name} to {'.'.join(map(str, known[0]))} or later"))
+        return results
+
+class AppProbeEngine:
+    DRAIN_LIMIT = 16384
+    CHUNK_SIZE = 8192
+    # Rough peak per in-flight page: one chunk plus the analyzer's bounded pending buffer
+    PAGE_MEMORY = CHUNK_SIZE + 65536 * 4
+
+    def __init__(self, concurrency=100, per_host=4, timeout=10.0, max_body=8 * 1024 * 1024, memory_limit_mb=0,
+                 cache=None):
+        if memory_limit_mb:
+            concurrency = min(concurrency, memory_limit_mb * 1024 * 1024 // self.PAGE_MEMORY)
+        self.concurrency = max(1, min(concurrency, fd_budget()))
+        self.per_host = per_host
+        self.timeout = timeout
+        self.max_body = max_body
+        self.paths = [(path, re.compile(marker), severity, title) for path, marker, severity, title in SENSITIVE_PATHS]
+        self.cache = cache
+        self.stats = collections.Counter()
+
+    async def scan(self, origins, on_finding=None):
+        findings = []
+        fingerprints = {}
+        # One pooled session for every origin: keep-alive connections are reused across checks
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host,
+                                         ttl_dns_cache=300, ssl=False, keepalive_timeout=30)
+        # Per-socket timeouts: time spent queued for a pooled connection must not count
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=self.timeout, sock_read=self.timeout)
+        
+        def report(finding):
+            findings.append(finding)
+            if on_finding:
+                on_finding(finding)
+        
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                         headers={'User-Agent': 'HEAX Scanner'}) as session:
+            semaphore = asyncio.Semaphore(self.concurrency)
+            
+            async def run(origin):
+                url = urllib.parse.urlsplit(origin)
+                key = (url.hostname, url.port or (443 if url.scheme == 'https' else 80))
+                cached = self.cache.get('http', *key) if self.cache is not None else None
+                if cached is not None and cached[0] == origin:
+                    self.stats['cached'] += 1
+                    _, fingerprint, found = cached
+                    for finding in found:
+                        report(finding)
+                else:
+                    found = []
+                    
+                    def collect(finding):
+                        found.append(finding)
+                        report(finding)
+                    
+                    async with semaphore:
+                        fingerprint = await self.probe_origin(session, origin, collect)
+                    if fingerprint is not None and self.cache is not None:
+                        self.cache.put('http', *key, (origin, fingerprint, found))
+                if fingerprint is not None:
+                    fingerprints[origin] = fingerprint
+            
+            await asyncio.gather(*(run(origin) for origin in origins))
+        return findings, fingerprints
+
+    async def request(self, session, method, url, read=0):
+        self.stats[method] += 1
+        try:
+            async with session.request(method, url, allow_redirects=False) as response:
+                body = await response.content.read(read) if read else b''
+                # Drain short leftovers so the keep-alive connection goes back to the pool
+                remaining = (response.content_length or 0) - len(body)
+                if 0 < remaining <= self.DRAIN_LIMIT:
+                    await response.content.read(remaining)
+                return response.status, response.headers, body
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            self.stats['errors'] += 1
+            return None
+
+    async def probe_origin(self, session, origin, report):
+        url = urllib.parse.urlsplit(origin)
+        host, port, scheme = url.hostname, url.port or (443 if url.scheme == 'https' else 80), url.scheme
+        
+        def finding(vulnerability_type, severity, description, remediation=''):
+            report({
+                'target': host, 'port': port, 'service': scheme.upper(),
+                'vulnerability_type': vulnerability_type, 'severity': severity,
+                'description': f"{origin}: {description}", 'remediation': remediation
+            })
+        
+        # HEAD first; the page itself is only fetched (and streamed) when it can hold HTML
+        response = await self.request(session, 'HEAD', origin + '/')
+        if response is None:
+            return None
+        status, headers, _ = response
+        page = None
+        if status in (405, 501) or (status < 300 and 'html' in headers.get('Content-Type', 'text/html')):
+            page = await self.analyze_page(session, origin + '/', scheme)
+            if page is not None and status in (405, 501):
+                status, headers = page[0], page[1]
+        analyzer = page[2] if page else None
+        
+        fingerprint = {
+            'status': status,
+            'server': headers.get('Server'),
+            'powered_by': headers.get('X-Powered-By'),
+            'title': analyzer.title if analyzer else None,
+            'generator': analyzer.generator if analyzer else None,
+            'libraries': dict(analyzer.libraries) if analyzer else {}
+        }
+        if analyzer:
+            for vulnerability_type, severity, description, remediation in analyzer.findings():
+                finding(vulnerability_type, severity, description, remediation)
+        
+        for name in ('Server', 'X-Powered-By', 'X-AspNet-Version'):
+            value = headers.get(name)
+            if value and re.search(r'\d', value):
+                finding('Information Disclosure', 'low', f"{name} header discloses version '{value}'",
+                        f"Remove version details from the {name} header")
+        for header, only_scheme, severity, title_text, remediation in SECURITY_HEADERS:
+            if (only_scheme is None or only_scheme == scheme) and header not in headers:
+                finding('Missing Security Header', severity, title_text, remediation)
+        for cookie in headers.getall('Set-Cookie', []):
+            flags = cookie.lower()
+            name = cookie.split('=', 1)[0].strip()
+            if 'httponly' not in flags or (scheme == 'https' and 'secure' not in flags):
+                finding('Insecure Cookie', 'medium', f"Cookie '{name}' lacks Secure/HttpOnly flags",
+                        'Set the Secure and HttpOnly attributes on session cookies')
+        
+        await asyncio.gather(*(self.probe_path(session, origin, path, marker, severity, title_text, finding)
+                               for path, marker, severity, title_text in self.paths))
+        return fingerprint
+
+    async def analyze_page(self, session, url, scheme):
+        self.stats['GET'] += 1
+        try:
+            async with session.get(url, allow_redirects=False) as response:
+                analyzer = StreamingHTMLAnalyzer(scheme, response.charset)
+                async for chunk in response.content.iter_chunked(self.CHUNK_SIZE):
+                    if analyzer.feed_bytes(chunk) or analyzer.bytes_seen >= self.max_body:
+                        break
+                self.stats['body_bytes'] += analyzer.bytes_seen
+                if analyzer.overflowed:
+                    self.stats['overflowed'] += 1
+                return response.status, response.headers, analyzer
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            self.stats['errors'] += 1
+            return None
+
+    async def probe_path(self, session, origin, path, marker, severity, title_text, finding):
+        response = await self.request(session, 'HEAD', origin + path)
+        if response is None or response[0] != 200:
+            return
+        # Many servers answer 200 to everything; confirm with the first bytes of the body
+        response = await self.request(session, 'GET', origin + path, read=4096)
+        if response is not None and response[0] == 200 and marker.search(response[2]):
+            finding('Sensitive File Exposure', severity, f"{title_text} at {path}",
+                    f"Block public access to {path}")
+
+TLS_PORTS = (443, 465, 636, 853, 989, 990, 992, 993, 994, 995, 5061, 8443, 9443)
+
+# (protocol, severity of still accepting it)
+TLS_PROTOCOLS = tuple((version, severity) for version, severity in (
+    (ssl.TLSVersion.SSLv3, 'critical'), (ssl.TLSVersion.TLSv1, 'high'), (ssl.TLSVersion.TLSv1_1, 'medium'),
+    (ssl.TLSVersion.TLSv1_2, None), (ssl.TLSVersion.TLSv1_3, None)
+) if getattr(ssl, 'HAS_' + version.name, False))
+
+WEAK_CIPHERS = (
+    (re.compile(r'NULL|EXP|ADH|AECDH|anon|RC4|MD5|DES-CBC-'), 'high'),
+    (re.compile(r'3DES|DES-CBC3|IDEA|SEED|RC2'), 'medium')
+)
+FORWARD_SECRECY = re.compile(r'^(?:ECDHE|DHE|EDH|TLS_)')
+MIN_KEY_SIZE = {'RSA': 2048, 'DSA': 2048, 'EC': 224}
+
+class TlsAnalyzer:
+    ALL_CIPHERS = 'ALL:COMPLEMENTOFALL:@SECLEVEL=0'
+    EXPIRY_WARNING = timedelta(days=30)
+    TICKET_WAIT = 1.0
+
+    def __init__(self, concurrency=200, timeout=5.0, enumerate_ciphers=True, cache=None):
+        self.concurrency = max(1, min(concurrency, fd_budget()))
+        self.timeout = timeout
+        self.enumerate_ciphers = enumerate_ciphers
+        self.cache = cache
+        # Kept across scans: certificates are parsed once per fingerprint, sessions resume on revisits
+        self.certificates = {}
+        self.sessions = {}
+        self.contexts = {}
+        self.addresses = {}
+        self.cipher_names = None
+        self.stats = collections.Counter()
+
+    def context(self, version=None, ciphers=None):
+        context = self.contexts.get(version) if ciphers is None else None
+        if context is None:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+            # Security level 0 so legacy handshakes (SHA-1 signatures, tiny keys) can still be observed
+            context.set_ciphers(f"{ciphers}:@SECLEVEL=0" if ciphers else self.ALL_CIPHERS)
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', DeprecationWarning)
+                context.minimum_version = version or TLS_PROTOCOLS[0][0]
+                context.maximum_version = version or ssl.TLSVersion.MAXIMUM_SUPPORTED
+            if ciphers is None:
+                self.contexts[version] = context
+        return context
+
+    async def scan(self, endpoints, on_finding=None):
+        findings = []
+        reports = {}
+        semaphore = asyncio.Semaphore(self.concurrency)
+        if self.cipher_names is None:
+            self.cipher_names = [cipher['name'] for cipher in self.context().get_ciphers()
+                                 if cipher['protocol'] != 'TLSv1.3']
+        
+        async def run(host, port):
+            report = await self.analyze_endpoint(host, port, semaphore)
+            if report is None:
+                return
+            reports[(host, port)] = report
+            for finding in self.findings(host, port, report):
+                findings.append(finding)
+                if on_finding:
+                    on_finding(finding)
+        
+        await asyncio.gather(*(run(host, port) for host, port in endpoints))
+        return findings, reports
+
+    async def resolve(self, host, port):
+        if host not in self.addresses:
+            try:
+                address = str(ipaddress.ip_address(host))
+            except ValueError:
+                address = self.cache.get('dns', host) if self.cache is not None else None
+            if address is None:
+                infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+                address = infos[0][4][0]
+                if self.cache is not None:
+                    self.cache.put('dns', host, 0, address)
+            self.addresses[host] = (socket.AF_INET6 if ':' in address else socket.AF_INET, address)
+        family, address = self.addresses[host]
+        return family, (address, port)
+
+    async def handshake(self, host, port, context, session=None, want_ticket=False):
+        loop = asyncio.get_running_loop()
+        self.stats['handshakes'] += 1
+        sock = None
+        try:
+            family, address = await self.resolve(host, port)
+            incoming, outgoing = ssl.MemoryBIO(), ssl.MemoryBIO()
+            tls = context.wrap_bio(incoming, outgoing, session=session,
+                                   server_hostname=None if host == address[0] else host)
+            sock = socket.socket(family, socket.SOCK_STREAM)
+            sock.setblocking(False)
+            await asyncio.wait_for(loop.sock_connect(sock, address), self.timeout)
+            
+            async def pump(timeout):
+                if outgoing.pending:
+                    await loop.sock_sendall(sock, outgoing.read())
+                data = await asyncio.wait_for(loop.sock_recv(sock, 65536), timeout)
+                if not data:
+                    raise ConnectionResetError('connection closed during handshake')
+                incoming.write(data)
+            
+            while True:
+                try:
+                    tls.do_handshake()
+                    break
+                except ssl.SSLWantReadError:
+                    await pump(self.timeout)
+            if outgoing.pending:
+                await loop.sock_sendall(sock, outgoing.read())
+            if want_ticket and tls.version() == 'TLSv1.3':
+                # TLS 1.3 session tickets only arrive after the handshake has finished
+                try:
+                    await pump(min(self.timeout, self.TICKET_WAIT))
+                    tls.read(1)
+                except (ssl.SSLWantReadError, OSError, asyncio.TimeoutError):
+                    pass
+            return tls
+        except (OSError, asyncio.TimeoutError, ValueError):
+            self.stats['failed_handshakes'] += 1
+            return None
+        finally:
+            if sock is not None:
+                sock.close()
+
+    async def analyze_endpoint(self, host, port, semaphore):
+        async def attempt(context, session=None, want_ticket=False):
+            async with semaphore:
+                return await self.handshake(host, port, context, session, want_ticket)
+        
+        key = (host, port)
+        if self.cache is not None:
+            cached = self.cache.get('tls', host, port)
+            if cached is not None:
+                report, certificates = cached
+                self.certificates.update(certificates)
+                self.stats['cached'] += 1
+                return report
+        session, chain = self.sessions.get(key, (None, []))
+        baseline = await attempt(self.context(), session, want_ticket=True)
+        if baseline is None:
+            return None
+        protocol, cipher = baseline.version(), baseline.cipher()[0]
+        report = {
+            'protocol': protocol, 'cipher': cipher, 'resumption': baseline.session_reused,
+            'protocols': [protocol], 'ciphers': {protocol: [cipher]}
+        }
+        # A resumed handshake carries no certificates; the chain from the full handshake still applies
+        report['chain'] = [self.certificate(der) for der in self.peer_chain(baseline)] or (
+            chain if baseline.session_reused else [])
+        report['certificate'] = report['chain'][0] if report['chain'] else None
+        if baseline.session is not None:
+            self.sessions[key] = (baseline.session, report['chain'])
+        if not report['resumption'] and baseline.session is not None:
+            # An abbreviated handshake on the shared context confirms the server honours resumption
+            resumed = await attempt(self.context(), baseline.session)
+            report['resumption'] = resumed is not None and resumed.session_reused
+        
+        versions = [version for version, _ in TLS_PROTOCOLS if self.protocol_name(version) != protocol]
+        probes = await asyncio.gather(*(attempt(self.context(version)) for version in versions))
+        for version, tls in zip(versions, probes):
+            if tls is not None:
+                report['protocols'].append(tls.version())
+                report['ciphers'][tls.version()] = [tls.cipher()[0]]
+        order = [self.protocol_name(version) for version, _ in TLS_PROTOCOLS]
+        report['protocols'].sort(key=order.index)
+        
+        if self.enumerate_ciphers:
+            legacy = [version for version, _ in TLS_PROTOCOLS
+                      if version != ssl.TLSVersion.TLSv1_3 and self.protocol_name(version) in report['protocols']]
+            accepted = await asyncio.gather(*(self.accepted_ciphers(attempt, version) for version in legacy))
+            for version, names in zip(legacy, accepted):
+                if names:
+                    report['ciphers'][self.protocol_name(version)] = names
+        if self.cache is not None:
+            self.cache.put('tls', host, port, (report, {fingerprint: self.certificates[fingerprint]
+                                                        for fingerprint in report['chain']}))
+        return report
+
+    async def accepted_ciphers(self, attempt, version):
+        # Offer everything and strike out whatever the server picks: one handshake per accepted
+        # suite plus one, instead of one per suite OpenSSL knows about
+        remaining = list(self.cipher_names)
+        accepted = []
+        while remaining:
+            tls = await attempt(self.context(version, ':'.join(remaining)))
+            if tls is None or tls.cipher()[0] not in remaining:
+                break
+            accepted.append(tls.cipher()[0])
+            remaining.remove(accepted[-1])
+        return accepted
+
+    @staticmethod
+    def protocol_name(version):
+        return version.name.replace('_', '.')
+
+    @staticmethod
+    def peer_chain(tls):
+        # SSLObject.get_unverified_chain is public from Python 3.13; older releases only report the leaf
+        chain = getattr(tls, 'get_unverified_chain', None)
+        if chain is not None:
+            return list(chain() or [])
+        leaf = tls.getpeercert(binary_form=True)
+        return [leaf] if leaf else []
+
+    def certificate(self, der):
+        fingerprint = hashlib.sha256(der).hexdigest()
+        if fingerprint in self.certificates:
+            self.stats['certificate_cache_hits'] += 1
+        else:
+            self.stats['certificates_parsed'] += 1
+            self.certificates[fingerprint] = self.parse_certificate(der)
+        return fingerprint
+
+    @staticmethod
+    def parse_certificate(der):
+        cert = x509.load_der_x509_certificate(der)
+        key = cert.public_key()
+        key_type = ('RSA' if isinstance(key, rsa.RSAPublicKey) else 'EC' if isinstance(key, ec.EllipticCurvePublicKey)
+                    else 'DSA' if isinstance(key, dsa.DSAPublicKey) else type(key).__name__)
+        try:
+            names = cert.extensions.get_extension_for_class(x509.SubjectAlternativeName).value.get_values_for_type(
+                x509.DNSName)
+        except x509.ExtensionNotFound:
+            names = [attribute.value for attribute in cert.subject.get_attributes_for_oid(x509.NameOID.COMMON_NAME)]
+        not_after = getattr(cert, 'not_valid_after_utc', None) or cert.not_valid_after.replace(tzinfo=timezone.utc)
+        try:
+            signature_hash = cert.signature_hash_algorithm.name if cert.signature_hash_algorithm else None
+        except Exception:
+            signature_hash = None
+        return {
+            'subject': cert.subject.rfc4514_string(),
+            'issuer': cert.issuer.rfc4514_string(),
+            'names': names,
+            'not_after': not_after,
+            'key_type': key_type,
+            'key_size': getattr(key, 'key_size', 0),
+            'signature_hash': signature_hash,
+            'self_signed': cert.issuer == cert.subject
+        }
+
+    @staticmethod
+    def hostname_matches(host, names):
+        host = host.lower().rstrip('.')
+        for name in names:
+            name = name.lower().rstrip('.')
+            if name == host or (name.startswith('*.') and host.partition('.')[2] == name[2:]):
+                return True
+        return False
+
+    def findings(self, host, port, report):
+        results = []
+        
+        def finding(vulnerability_type, severity, description, remediation=''):
+            results.append({
+                'target': host, 'port': port, 'service': 'TLS',
+                'vulnerability_type': vulnerability_type, 'severity': severity,
+                'description': f"{host}:{port}: {description}", 'remediation': remediation
+            })
+        
+        for version, severity in TLS_PROTOCOLS:
+            if severity and self.protocol_name(version) in report['protocols']:
+                finding('Deprecated TLS Protocol', severity, f"{self.protocol_name(version)} is enabled",
+                        'Disable SSLv3, TLS 1.0 and TLS 1.1')
+        ciphers = sorted({name for names in report['ciphers'].values() for name in names})
+        for pattern, severity in WEAK_CIPHERS:
+            weak = [name for name in ciphers if pattern.search(name)]
+            if weak:
+                finding('Weak Cipher Suite', severity, f"Weak ciphers accepted: {', '.join(weak[:8])}"
+                        f"{' ...' if len(weak) > 8 else ''}", 'Restrict the server to AEAD cipher suites')
+                ciphers = [name for name in ciphers if name not in weak]
+        if not any(FORWARD_SECRECY.match(name) for names in report['ciphers'].values() for name in names):
+            finding('No Forward Secrecy', 'medium', 'No ECDHE/DHE key exchange offered',
+                    'Prefer ECDHE cipher suites')
+        
+        cert = self.certificates.get(report['certificate'])
+        if cert is None:
+            return results
+        now = datetime.now(timezone.utc)
+        if cert['not_after'] < now:
+            finding('Expired Certificate', 'high', f"Certificate expired on {cert['not_after']:%Y-%m-%d}",
+                    'Renew the certificate')
+        elif cert['not_after'] - now < self.EXPIRY_WARNING:
+            finding('Certificate Expiring', 'medium', f"Certificate expires on {cert['not_after']:%Y-%m-%d}",
+                    'Renew the certificate before it expires')
+        if cert['self_signed']:
+            finding('Self-Signed Certificate', 'medium', f"Self-signed certificate for {cert['subject']}",
+                    'Use a certificate issued by a trusted CA')
+        if cert['key_size'] and cert['key_size'] < MIN_KEY_SIZE.get(cert['key_type'], 0):
+            finding('Weak Certificate Key', 'high', f"{cert['key_type']} key of {cert['key_size']} bits",
+                    'Reissue the certificate with a 2048-bit RSA or P-256 key')
+        if cert['signature_hash'] in ('md5', 'sha1'):
+            finding('Weak Certificate Signature', 'medium', f"Certificate signed with {cert['signature_hash'].upper()}",
+                    'Reissue the certificate with a SHA-256 signature')
+        try:
+            ipaddress.ip_address(host)
+        except ValueError:
+            if not self.hostname_matches(host, cert['names']):
+                finding('Certificate Name Mismatch', 'medium', f"Certificate does not cover {host}",
+                        'Issue a certificate whose SAN list includes this host name')
+        return results
+
+class ProbeCache:
+    # Expensive probe outputs keyed by (kind, host, port, probe version); bump a version whenever its
+    # probe changes so stale entries stop matching and age out of the LRU
+    VERSIONS = {'banner': 2, 'tls': 3, 'http': 2, 'dns': 2}
+    # Kinds that go stale faster than the configured TTL
+    MAX_AGE = {'dns': 3600}
+    # Hits whose last-used time is kept in memory before one batched UPDATE
+    TOUCH_BATCH = 1000
+
+    def __init__(self, path, max_bytes=500 * 1024 * 1024, ttl=86400):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.stats = collections.Counter()
+        self.touched = {}
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS probe_cache (
+                kind TEXT, host TEXT, port INTEGER, version INTEGER,
+                value BLOB, size INTEGER, stored REAL, used REAL,
+                PRIMARY KEY (kind, host, port, version)
+            ) WITHOUT ROWID
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_probe_cache_used ON probe_cache (used)')
+        self.size = self.conn.execute('SELECT IFNULL(SUM(size), 0) FROM probe_cache').fetchone()[0]
+
+    def get(self, kind, host, port=0):
+        key = (kind, host, port, self.VERSIONS[kind])
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT value, stored FROM probe_cache WHERE kind = ? AND host = ? AND port = ? AND version = ?', key
+            ).fetchone()
+            if row is None or now - row[1] > min(self.ttl, self.MAX_AGE.get(kind, self.ttl)):
+                self.stats[f'{kind}_misses'] += 1
+                return None
+            self.touched[key] = now
+            if len(self.touched) >= self.TOUCH_BATCH:
+                self.flush_touched()
+        self.stats[f'{kind}_hits'] += 1
+        return json.loads(row[0], object_hook=self.decode)
+
+    def put(self, kind, host, port, value):
+        key = (kind, host, port, self.VERSIONS[kind])
+        # JSON rather than pickle: loading a tampered cache file must not run code
+        blob = json.dumps(value, default=self.encode, separators=(',', ':')).encode('utf-8')
+        now = time.time()
+        with self.lock:
+            self.touched.pop(key, None)
+            old = self.conn.execute(
+                'SELECT size FROM probe_cache WHERE kind = ? AND host = ? AND port = ? AND version = ?', key
+            ).fetchone()
+            self.conn.execute('INSERT OR REPLACE INTO probe_cache VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                              (*key, blob, len(blob), now, now))
+            self.size += len(blob) - (old[0] if old else 0)
+            if self.size > self.max_bytes:
+                self.evict()
+
+    @staticmethod
+    def encode(value):
+        # Tuples come back as lists; callers only unpack them
+        if isinstance(value, bytes):
+            return {'__bytes__': base64.b64encode(value).decode('ascii')}
+        if isinstance(value, datetime):
+            return {'__datetime__': value.isoformat()}
+        if isinstance(value, (set, frozenset)):
+            return sorted(value)
+        raise TypeError(f"{type(value).__name__} values cannot be cached")
+
+    @staticmethod
+    def decode(value):
+        if '__bytes__' in value:
+            return base64.b64decode(value['__bytes__'])
+        if '__datetime__' in value:
+            return datetime.fromisoformat(value['__datetime__'])
+        return value
+
+    def flush_touched(self):
+        # One transaction for a batch of hits instead of a write per get
+        if not self.touched:
+            return
+        self.conn.execute('BEGIN')
+        self.conn.executemany(
+            'UPDATE probe_cache SET used = ? WHERE kind = ? AND host = ? AND port = ? AND version = ?',
+            ((used, *key) for key, used in self.touched.items()))
+        self.conn.execute('COMMIT')
+        self.touched.clear()
+
+    def evict(self, chunk=1000):
+        # Least recently used first; expired entries are never touched again, so they go early too
+        self.flush_touched()
+        target = self.max_bytes * 0.9
+        while self.size > target:
+            rows = self.conn.execute(
+                'SELECT kind, host, port, version, size FROM probe_cache ORDER BY used LIMIT ?', (chunk,)
+            ).fetchall()
+            if not rows:
+                self.size = 0
+                break
+            self.conn.execute('BEGIN')
+            for kind, host, port, version, size in rows:
+                self.conn.execute(
+                    'DELETE FROM probe_cache WHERE kind = ? AND host = ? AND port = ? AND version = ?',
+                    (kind, host, port, version))
+                self.size -= size
+                self.stats['evicted'] += 1
+                if self.size <= target:
+                    break
+            self.conn.execute('COMMIT')
+
+    def clear(self):
+        with self.lock:
+            self.conn.execute('DELETE FROM probe_cache')
+            self.touched.clear()
+            self.size = 0
+
+    def close(self):
+        with self.lock:
+            try:
+                self.flush_touched()
+            except sqlite3.Error:
+                pass
+            self.conn.close()
+
+# The natural key of a finding; without a CVE, its description tells checks of the same type apart
+VULNERABILITY_KEY = "target, IFNULL(port, -1), vulnerability_type, IFNULL(cve_id, description)"
+
+# Adds ({sign}=+) or removes ({sign}=-) one finding's contribution to the dashboard summary tables
+STATS_DELTA = '''
+    INSERT INTO vulnerability_stats (severity, status, count)
+    VALUES (IFNULL({row}.severity, 'unknown'), IFNULL({row}.status, 'open'), {sign}1)
+    ON CONFLICT (severity, status) DO UPDATE SET count = count + excluded.count;
+    INSERT INTO target_stats (target, total, open, critical)
+    VALUES ({row}.target, {sign}1, {sign}(IFNULL({row}.status, 'open') = 'open'),
+            {sign}(IFNULL({row}.status, 'open') = 'open' AND {row}.severity = 'critical'))
+    ON CONFLICT (target) DO UPDATE SET
+        total = total + excluded.total, open = open + excluded.open, critical = critical + excluded.critical;'''
+
+# (version, statements) applied in order at startup; the applied versions are kept in schema_version
+SCHEMA_MIGRATIONS = (
+    (1, (
+        'ALTER TABLE vulnerabilities ADD COLUMN last_seen TIMESTAMP',
+        'ALTER TABLE vulnerabilities ADD COLUMN seen_count INTEGER DEFAULT 1',
+        # Collapse existing duplicates onto their oldest row before the key becomes unique
+        'CREATE TEMP TABLE vulnerability_keys (id INTEGER PRIMARY KEY, last_seen TIMESTAMP, seen_count INTEGER)',
+        f'''INSERT INTO vulnerability_keys
+            SELECT MIN(id), MAX(discovered_date), COUNT(*) FROM vulnerabilities GROUP BY {VULNERABILITY_KEY}''',
+        'DELETE FROM vulnerabilities WHERE id NOT IN (SELECT id FROM vulnerability_keys)',
+        '''UPDATE vulnerabilities SET (last_seen, seen_count) =
+           (SELECT last_seen, seen_count FROM vulnerability_keys WHERE vulnerability_keys.id = vulnerabilities.id)''',
+        'DROP TABLE vulnerability_keys',
+        f'CREATE UNIQUE INDEX idx_vulnerabilities_key ON vulnerabilities ({VULNERABILITY_KEY})',
+        'CREATE INDEX idx_vulnerabilities_severity ON vulnerabilities (severity, status, last_seen)',
+        'CREATE INDEX idx_vulnerabilities_status ON vulnerabilities (status, severity, target)',
+        'CREATE INDEX idx_vulnerabilities_target ON vulnerabilities (target, severity, status, port)',
+        'CREATE INDEX idx_scan_results_start ON scan_results (start_time)'
+    )),
+    (2, (
+        # Summary tables kept current by triggers, so the dashboard never counts the findings table
+        '''CREATE TABLE vulnerability_stats (
+               severity TEXT, status TEXT, count INTEGER, PRIMARY KEY (severity, status)
+           ) WITHOUT ROWID''',
+        '''CREATE TABLE target_stats (
+               target TEXT PRIMARY KEY, total INTEGER, open INTEGER, critical INTEGER
+           ) WITHOUT ROWID''',
+        'CREATE INDEX idx_target_stats_critical ON target_stats (critical, open)',
+        '''CREATE TABLE scan_stats (
+               id INTEGER PRIMARY KEY CHECK (id = 1), total_scans INTEGER, last_scan TIMESTAMP
+           )''',
+        '''INSERT INTO vulnerability_stats
+           SELECT IFNULL(severity, 'unknown'), IFNULL(status, 'open'), COUNT(*) FROM vulnerabilities GROUP BY 1, 2''',
+        '''INSERT INTO target_stats
+           SELECT target, COUNT(*), SUM(IFNULL(status, 'open') = 'open'),
+                  SUM(IFNULL(status, 'open') = 'open' AND severity = 'critical')
+           FROM vulnerabilities GROUP BY target''',
+        'INSERT INTO scan_stats SELECT 1, COUNT(*), MAX(end_time) FROM scan_results',
+        f'''CREATE TRIGGER vulnerabilities_stats_insert AFTER INSERT ON vulnerabilities BEGIN
+            {STATS_DELTA.format(row='NEW', sign='+')}
+            END''',
+        f'''CREATE TRIGGER vulnerabilities_stats_delete AFTER DELETE ON vulnerabilities BEGIN
+            {STATS_DELTA.format(row='OLD', sign='-')}
+            END''',
+        # Upserts rewrite severity on every re-find; only real changes move counts between buckets
+        f'''CREATE TRIGGER vulnerabilities_stats_update AFTER UPDATE OF target, severity, status ON vulnerabilities
+            WHEN OLD.target IS NOT NEW.target OR OLD.severity IS NOT NEW.severity OR OLD.status IS NOT NEW.status
+            BEGIN
+            {STATS_DELTA.format(row='OLD', sign='-')}
+            {STATS_DELTA.format(row='NEW', sign='+')}
+            END''',
+        '''CREATE TRIGGER scan_results_stats_insert AFTER INSERT ON scan_results BEGIN
+               UPDATE scan_stats SET total_scans = total_scans + 1,
+                                     last_scan = MAX(IFNULL(last_scan, ''), IFNULL(NEW.end_time, '')) WHERE id = 1;
+           END''',
+        '''CREATE TRIGGER scan_results_stats_delete AFTER DELETE ON scan_results BEGIN
+               UPDATE scan_stats SET total_scans = total_scans - 1 WHERE id = 1;
+           END'''
+    )),
+    (3, (
+        'CREATE INDEX idx_vulnerabilities_last_seen ON vulnerabilities (last_seen)',
+    )),
+    (4, (
+        '''CREATE TABLE export_state (
+               name TEXT PRIMARY KEY, watermark TEXT, row_count INTEGER DEFAULT 0, exported_at TIMESTAMP
+           )''',
+    )),
+    (5, (
+        '''CREATE TABLE scan_fingerprints (
+               scan_id TEXT PRIMARY KEY, target TEXT, scan_type TEXT, created REAL, items INTEGER,
+               keys BLOB, states BLOB, labels BLOB
+           )''',
+        'CREATE INDEX idx_scan_fingerprints_target ON scan_fingerprints (target, scan_type, created)'
+    )),
+    (6, (
+        # Per-host open ports and last full-scan results, so incremental scans can skip unchanged hosts
+        '''CREATE TABLE host_state (
+               host TEXT, scan_type TEXT, open_ports TEXT, checked REAL, full_scan REAL, results TEXT,
+               PRIMARY KEY (host, scan_type)
+           )''',
+        'CREATE INDEX idx_host_state_full_scan ON host_state (full_scan)'
+    )),
+    (7, (
+        '''CREATE TABLE scheduled_scans (
+               schedule_id TEXT PRIMARY KEY, name TEXT, expression TEXT, request TEXT, jitter INTEGER,
+               enabled INTEGER DEFAULT 1, created REAL, next_run REAL, last_run REAL, last_status TEXT
+           )''',
+        'CREATE INDEX idx_scheduled_scans_due ON scheduled_scans (enabled, next_run)',
+        # One row per firing; rows without finished count against the global concurrency cap
+        '''CREATE TABLE schedule_runs (
+               run_id TEXT PRIMARY KEY, schedule_id TEXT, started REAL, finished REAL, status TEXT,
+               scan_ids TEXT, pid INTEGER
+           )''',
+        'CREATE INDEX idx_schedule_runs_finished ON schedule_runs (finished, started)'
+    )),
+    (8, (
+        '''CREATE TABLE scan_checkpoints (
+               target TEXT, scan_type TEXT, created REAL, updated REAL, layout TEXT, reused TEXT,
+               cursor INTEGER, done BLOB, open_ports TEXT, stats TEXT,
+               PRIMARY KEY (target, scan_type)
+           )''',
+    )),
+    (9, (
+        # The natural keys each scan saw, so a report covers its own scan even while other jobs write findings
+        '''CREATE TABLE scan_findings (
+               scan_id TEXT, target TEXT, port INTEGER, vulnerability_type TEXT, identity TEXT,
+               PRIMARY KEY (scan_id, target, port, vulnerability_type, identity)
+           )''',
+    )),
+    (10, (
+        # The history export follows last_seen; rows without one would never pass its watermark
+        'UPDATE vulnerabilities SET last_seen = IFNULL(discovered_date, CURRENT_TIMESTAMP) WHERE last_seen IS NULL',
+        '''CREATE TRIGGER vulnerabilities_last_seen_default AFTER INSERT ON vulnerabilities
+           WHEN NEW.last_seen IS NULL BEGIN
+               UPDATE vulnerabilities SET last_seen = IFNULL(NEW.discovered_date, CURRENT_TIMESTAMP) WHERE id = NEW.id;
+           END''',
+    )),
+)
+
+def migrate_database(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    applied = []
+    for version, statements in SCHEMA_MIGRATIONS:
+        # IMMEDIATE takes the write lock first, so concurrent startups apply each migration once
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if conn.execute('SELECT 1 FROM schema_version WHERE version = ?', (version,)).fetchone():
+                conn.execute('ROLLBACK')
+                continue
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute('INSERT INTO schema_version (version) VALUES (?)', (version,))
+            conn.execute('COMMIT')
+        except sqlite3.Error:
+            conn.execute('ROLLBACK')
+            raise
+        applied.append(version)
+    return applied
+
+class NullProgress:
+    # Stands in for rich's Progress in headless runs: same calls, no rendering or refresh thread
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def add_task(self, description, **fields):
+        return 0
+
+    def update(self, task, **fields):
+        pass
+
+class JsonLinesSink:
+    # One JSON object per event, flushed as it happens so pipelines can consume results incrementally
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.lock = threading.Lock()
+
+    def __call__(self, kind, record):
+        line = json.dumps({'type': kind, 'time': datetime.now().isoformat(), **record}, default=str)
+        with self.lock:
+            self.stream.write(line + '\n')
+            self.stream.flush()
+
+class ResultWriter(threading.Thread):
+    PRAGMAS = (
+        'PRAGMA journal_mode=WAL',
+        'PRAGMA synchronous=NORMAL',
+        'PRAGMA temp_store=MEMORY',
+        'PRAGMA cache_size=-65536',
+        'PRAGMA busy_timeout=30000'
+    )
+    RETRIES = 5
+    RETRY_DELAY = 0.5
+    STATEMENTS = {
+        # Re-found issues refresh last_seen instead of piling up duplicate rows
+        'vulnerability': f'''INSERT INTO vulnerabilities
+                             (target, port, service, vulnerability_type, severity, description, cve_id, remediation,
+                              last_seen)
+                             VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                             ON CONFLICT ({VULNERABILITY_KEY}) DO UPDATE SET
+                                 service = excluded.service,
+                                 severity = excluded.severity,
+                                 remediation = COALESCE(excluded.remediation, remediation),
+                                 last_seen = excluded.last_seen,
+                                 seen_count = seen_count + 1''',
+        'scan_finding': '''INSERT OR IGNORE INTO scan_findings (scan_id, target, port, vulnerability_type, identity)
+                           VALUES (?, ?, ?, ?, ?)''',
+        'scan': '''INSERT INTO scan_results
+                   (scan_id, target, start_time, end_time, total_vulnerabilities, scan_status, scan_config)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)''',
+        'fingerprint': '''INSERT OR REPLACE INTO scan_fingerprints
+                          (scan_id, target, scan_type, created, items, keys, states, labels)
+                          VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+        'host_state': '''INSERT OR REPLACE INTO host_state (host, scan_type, open_ports, checked, full_scan, results)
+                         VALUES (?, ?, ?, ?, ?, ?)''',
+        'host_checked': 'UPDATE host_state SET checked = ? WHERE host = ? AND scan_type = ?',
+        'checkpoint': '''INSERT OR REPLACE INTO scan_checkpoints
+                         (target, scan_type, created, updated, layout, reused, cursor, done, open_ports, stats)
+                         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+        'checkpoint_progress': '''UPDATE scan_checkpoints
+                                  SET updated = ?, cursor = ?, done = ?, open_ports = ?, stats = ?
+                                  WHERE target = ? AND scan_type = ?''',
+        'checkpoint_clear': 'DELETE FROM scan_checkpoints WHERE target = ? AND scan_type = ?'
+    }
+
+    def __init__(self, db_path, queue_size=50000, batch_size=1000):
+        super().__init__(name='heax-result-writer', daemon=True)
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.stats = collections.Counter()
+        self.logger = logging.getLogger(__name__)
+
+    def connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        for pragma in self.PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def write(self, kind, row):
+        # A full queue blocks the producer: scans slow to the disk's pace instead of buffering without bound
+        if self.queue.full():
+            self.stats['backpressure'] += 1
+        self.queue.put((kind, row))
+
+    def write_many(self, kind, rows):
+        for row in rows:
+            self.write(kind, row)
+
+    def flush(self, timeout=None):
+        done = threading.Event()
+        self.queue.put(('flush', done))
+        return done.wait(timeout)
+
+    def close(self):
+        if self.is_alive():
+            self.queue.put(None)
+            self.join()
+
+    def run(self):
+        conn = self.connect()
+        try:
+            running = True
+            while running:
+                pending = collections.defaultdict(list)
+                waiters = []
+                count = 0
+                item = self.queue.get()
+                # Everything that queued up during the last commit goes into the next transaction
+                while True:
+                    if item is None:
+                        running = False
+                    elif item[0] == 'flush':
+                        waiters.append(item[1])
+                    else:
+                        pending[item[0]].append(item[1])
+                        count += 1
+                    if not running or count >= self.batch_size:
+                        break
+                    try:
+                        item = self.queue.get_nowait()
+                    except queue.Empty:
+                        break
+                if pending:
+                    self.commit(conn, pending, count)
+                for waiter in waiters:
+                    waiter.set()
+        finally:
+            conn.close()
+
+    def commit(self, conn, pending, count):
+        for attempt in range(self.RETRIES + 1):
+            try:
+                with conn:
+                    for kind, rows in pending.items():
+                        conn.executemany(self.STATEMENTS[kind], rows)
+                self.stats['rows'] += count
+                self.stats['batches'] += 1
+                return
+            except sqlite3.OperationalError as e:
+                # Usually a lock held past busy_timeout (e.g. by maintenance); the batch was rolled back whole
+                error = e
+                if attempt < self.RETRIES:
+                    self.stats['retries'] += 1
+                    self.logger.warning(f"Result writer retrying {count} rows: {e}")
+                    time.sleep(min(self.RETRY_DELAY * 2 ** attempt, 5.0))
+            except sqlite3.Error as e:
+                error = e
+                break
+        self.stats['dropped'] += count
+        self.logger.error(f"Result writer dropped {count} rows: {error}")
+
+class DatabaseMaintenance:
+    VACUUM_STEP = 2000
+
+    def __init__(self, db_path, retention_days=90, chunk_size=5000, pause=0.05):
+        self.db_path = db_path
+        self.retention_days = retention_days
+        self.chunk_size = chunk_size
+        self.pause = pause
+        self.logger = logging.getLogger(__name__)
+
+    def connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute('PRAGMA busy_timeout=30000')
+        return conn
+
+    def delete_chunked(self, conn, table, where, params):
+        # Short transactions: the result writer and dashboard get the lock back between chunks
+        deleted = 0
+        while True:
+            count = conn.execute(
+                f'DELETE FROM {table} WHERE rowid IN (SELECT rowid FROM {table} WHERE {where} LIMIT ?)',
+                (*params, self.chunk_size)
+            ).rowcount
+            deleted += count
+            if count < self.chunk_size:
+                return deleted
+            time.sleep(self.pause)
+
+    def run(self):
+        started = time.monotonic()
+        stats = collections.Counter()
+        conn = self.connect()
+        try:
+            if self.retention_days > 0:
+                # One cutoff instant, written the way each column stores time: UTC CURRENT_TIMESTAMP for
+                # last_seen, local isoformat() for scan start times, epoch seconds elsewhere
+                cutoff = datetime.now(timezone.utc) - timedelta(days=self.retention_days)
+                stats['vulnerabilities'] = self.delete_chunked(
+                    conn, 'vulnerabilities', 'last_seen < ?', (cutoff.strftime('%Y-%m-%d %H:%M:%S'),))
+                stats['scan_results'] = self.delete_chunked(
+                    conn, 'scan_results', 'start_time < ?', (cutoff.astimezone().replace(tzinfo=None).isoformat(),))
+                stats['scan_leases'] = self.delete_chunked(
+                    conn, 'scan_leases', "job_id IN (SELECT job_id FROM scan_jobs WHERE state = 'completed' "
+                    "AND created < ?)", (cutoff.timestamp(),))
+                stats['scan_jobs'] = self.delete_chunked(
+                    conn, 'scan_jobs', "state = 'completed' AND created < ?", (cutoff.timestamp(),))
+                stats['host_state'] = self.delete_chunked(
+                    conn, 'host_state', 'full_scan < ?', (cutoff.timestamp(),))
+                stats['schedule_runs'] = self.delete_chunked(
+                    conn, 'schedule_runs', 'finished < ?', (cutoff.timestamp(),))
+                stats['scan_checkpoints'] = self.delete_chunked(
+                    conn, 'scan_checkpoints', 'updated < ?', (cutoff.timestamp(),))
+                stats['scan_findings'] = self.delete_chunked(
+                    conn, 'scan_findings', 'scan_id NOT IN (SELECT scan_id FROM scan_results)', ())
+                conn.execute('DELETE FROM target_stats WHERE total <= 0')
+            stats['pages_freed'] = self.compact(conn)
+            # Bounded sampling keeps ANALYZE cheap on large tables while refreshing planner statistics
+            conn.execute('PRAGMA analysis_limit=1000')
+            conn.execute('ANALYZE')
+            conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        finally:
+            conn.close()
+        stats['seconds'] = round(time.monotonic() - started, 2)
+        self.logger.info(f"Database maintenance: {dict(stats)}")
+        return stats
+
+    def compact(self, conn):
+        if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+            # Databases created before incremental auto-vacuum need one full VACUUM to switch modes
+            conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+            before = conn.execute('PRAGMA page_count').fetchone()[0]
+            conn.execute('VACUUM')
+            return before - conn.execute('PRAGMA page_count').fetchone()[0]
+        freed = 0
+        while True:
+            free = conn.execute('PRAGMA freelist_count').fetchone()[0]
+            if not free:
+                return freed
+            # executescript steps the pragma to completion; execute() would release a single page
+            conn.executescript(f'PRAGMA incremental_vacuum({min(free, self.VACUUM_STEP)});')
+            freed += free - conn.execute('PRAGMA freelist_count').fetchone()[0]
+            time.sleep(self.pause)
+
+# table: (columns with their Arrow types, watermark columns, partition columns). vulnerabilities is a change
+# feed: a finding found again is exported again under its new last_seen date, so readers keep the row with
+# the greatest (last_seen, export_id) per id
+EXPORT_TABLES = {
+    'vulnerabilities': (
+        (('id', 'int64'), ('target', 'string'), ('port', 'int32'), ('service', 'string'),
+         ('vulnerability_type', 'string'), ('severity', 'string'), ('description', 'string'),
+         ('cve_id', 'string'), ('cvss_score', 'float64'), ('discovered_date', 'timestamp'),
+         ('last_seen', 'timestamp'), ('seen_count', 'int32'), ('status', 'string'),
+         ('false_positive', 'bool'), ('remediation', 'string')),
+        ('last_seen', 'id'),
+        ('last_seen', 'severity')
+    ),
+    'scan_results': (
+        (('id', 'int64'), ('scan_id', 'string'), ('target', 'string'), ('start_time', 'timestamp'),
+         ('end_time', 'timestamp'), ('total_vulnerabilities', 'int32'), ('scan_status', 'string'),
+         ('scan_config', 'string')),
+        ('id',),
+        ('start_time',)
+    )
+}
+
+class HistoryExporter:
+
+    def __init__(self, db_path, output_dir, compression='zstd', chunk_size=50000):
+        if pyarrow is None:
+            raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)")
+        self.parquet = importlib.import_module('pyarrow.parquet')
+        self.db_path = db_path
+        self.output_dir = Path(output_dir)
+        self.compression = compression or 'none'
+        self.chunk_size = chunk_size
+        self.export_id = datetime.now().strftime('%Y%m%d%H%M%S')
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def arrow_type(name):
+        if name == 'timestamp':
+            return pyarrow.timestamp('us')
+        return pyarrow.bool_() if name == 'bool' else getattr(pyarrow, name)()
+
+    def schema(self, columns):
+        return pyarrow.schema([(name, self.arrow_type(kind)) for name, kind in columns])
+
+    def column_array(self, values, kind):
+        if kind == 'bool':
+            return pyarrow.array([None if value is None else bool(value) for value in values], pyarrow.bool_())
+        if kind != 'timestamp':
+            return pyarrow.array(values, self.arrow_type(kind))
+        strings = pyarrow.array([None if value is None else str(value) for value in values], pyarrow.string())
+        try:
+            return strings.cast(pyarrow.timestamp('us'))
+        except pyarrow.ArrowInvalid:
+            parsed = []
+            for value in values:
+                try:
+                    parsed.append(datetime.fromisoformat(str(value)) if value is not None else None)
+                except ValueError:
+                    parsed.append(None)
+            return pyarrow.array(parsed, pyarrow.timestamp('us'))
+
+    def load_watermarks(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            return {name: json.loads(watermark) for name, watermark in
+                    conn.execute('SELECT name, watermark FROM export_state')}
+        finally:
+            conn.close()
+
+    def save_watermark(self, table, watermark, rows):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                conn.execute(
+                    '''INSERT INTO export_state (name, watermark, row_count, exported_at)
+                       VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+                       ON CONFLICT (name) DO UPDATE SET watermark = excluded.watermark,
+                           row_count = row_count + excluded.row_count, exported_at = excluded.exported_at''',
+                    (table, json.dumps(watermark), rows)
+                )
+        finally:
+            conn.close()
+
+    def export(self, full=False):
+        watermarks = {} if full else self.load_watermarks()
+        return {table: self.export_table(table, watermarks.get(table)) for table in EXPORT_TABLES}
+
+    def export_table(self, table, watermark):
+        columns, key, partition_by = EXPORT_TABLES[table]
+        names = [name for name, _ in columns]
+        kinds = [kind for _, kind in columns]
+        # Every row also carries the run that exported it
+        schema = self.schema(columns + (('export_id', 'string'),))
+        key_index = [names.index(name) for name in key]
+        part_index = [names.index(name) for name in partition_by]
+        
+        where, params = [], []
+        if watermark is not None:
+            where.append(f"({', '.join(key)}) > ({', '.join('?' * len(key))})")
+            params.extend(watermark)
+        if key[0] == 'last_seen':
+            # Rows still being upserted this second are left for the next export
+            where.append('last_seen < ?')
+            params.append(datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S'))
+        query = (f"SELECT {', '.join(names)} FROM {table}" + (f" WHERE {' AND '.join(where)}" if where else '')
+                 + f" ORDER BY {', '.join(key)}")
+        
+        writers = {}
+        buffers = collections.defaultdict(list)
+        buffered = 0
+        rows = 0
+        last = None
+        
+        def flush():
+            for partition, batch in buffers.items():
+                if partition not in writers:
+                    directory = self.output_dir / table / f"scan_date={partition[0]}"
+                    for name, value in zip(partition_by[1:], partition[1:]):
+                        directory /= f"{name}={value}"
+                    directory.mkdir(parents=True, exist_ok=True)
+                    path = directory / f"part-{self.export_id}.parquet"
+                    temp = path.with_suffix('.parquet.tmp')
+                    writers[partition] = (self.parquet.ParquetWriter(temp, schema, compression=self.compression),
+                                          temp, path)
+                arrays = [self.column_array(values, kind) for values, kind in zip(zip(*batch), kinds)]
+                arrays.append(pyarrow.array([self.export_id] * len(batch), pyarrow.string()))
+                writers[partition][0].write_table(pyarrow.Table.from_arrays(arrays, schema=schema))
+            buffers.clear()
+        
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            # One read transaction: a consistent WAL snapshot while the result writer keeps committing
+            conn.execute('BEGIN')
+            cursor = conn.execute(query, params)
+            while True:
+                chunk = cursor.fetchmany(self.chunk_size)
+                if not chunk:
+                    break
+                for row in chunk:
+                    partition = (str(row[part_index[0]] or 'unknown')[:10],) + tuple(
+                        str(row[index] or 'unknown') for index in part_index[1:])
+                    buffers[partition].append(row)
+                buffered += len(chunk)
+                rows += len(chunk)
+                last = [chunk[-1][index] for index in key_index]
+                if buffered >= self.chunk_size:
+                    flush()
+                    buffered = 0
+            flush()
+            conn.execute('COMMIT')
+        except BaseException:
+            for writer, temp, _ in writers.values():
+                writer.close()
+                temp.unlink(missing_ok=True)
+            raise
+        finally:
+            conn.close()
+        
+        for writer, temp, path in writers.values():
+            writer.close()
+            temp.replace(path)
+        if last is not None:
+            self.save_watermark(table, last, rows)
+        self.logger.info(f"Exported {rows} {table} rows into {len(writers)} partitions")
+        return {'rows': rows, 'files': len(writers)}
+
+SEVERITY_ORDER = ('critical', 'high', 'medium', 'low', 'info')
+REPORT_FIELDS = ('target', 'port', 'service', 'vulnerability_type', 'severity', 'description', 'cve_id',
+                 'status', 'discovered_date', 'last_seen', 'remediation')
+
+class ReportFormat:
+    extension = ''
+    binary = False
+
+    def __init__(self, path, compress=False, title='HEAX Scanner Report'):
+        self.path = path
+        self.title = title
+        self.compress = compress
+        self.count = 0
+        self.severities = collections.Counter()
+        mode = 'wb' if self.binary else 'wt'
+        encoding = None if self.binary else 'utf-8'
+        if compress and not self.binary:
+            self.out = gzip.open(path, mode, compresslevel=6, encoding=encoding, newline='')
+        else:
+            self.out = open(path, mode, encoding=encoding, newline=None if self.binary else '')
+        self.begin()
+
+    def begin(self):
+        pass
+
+    def write(self, finding):
+        self.count += 1
+        self.severities[finding['severity']] += 1
+        self.write_finding(finding)
+
+    def write_finding(self, finding):
+        raise NotImplementedError
+
+    def end(self):
+        pass
+
+    def close(self):
+        self.end()
+        self.out.close()
+
+class JsonLinesReport(ReportFormat):
+    extension = 'jsonl'
+
+    def write_finding(self, finding):
+        self.out.write(json.dumps(finding, default=str) + '\n')
+
+class CsvReport(ReportFormat):
+    extension = 'csv'
+
+    def begin(self):
+        self.writer = csv.writer(self.out)
+        self.writer.writerow(REPORT_FIELDS)
+
+    def write_finding(self, finding):
+        self.writer.writerow([finding[field] for field in REPORT_FIELDS])
+
+class XmlReport(ReportFormat):
+    extension = 'xml'
+    # Characters XML 1.0 cannot carry even escaped, e.g. control bytes from service banners
+    INVALID = re.compile('[^\x09\x0a\x0d\x20-\ud7ff\ue000-\ufffd\U00010000-\U0010ffff]')
+
+    def text(self, value):
+        return saxutils.escape(self.INVALID.sub('', str(value)))
+
+    def attr(self, value):
+        return saxutils.quoteattr(self.INVALID.sub('', str(value)))
+
+    def begin(self):
+        self.out.write('<?xml version="1.0" encoding="utf-8"?>\n'
+                       f"<report title={self.attr(self.title)} "
+                       f"generated={self.attr(datetime.now().isoformat())}>\n")
+
+    def write_finding(self, finding):
+        # One string per finding: a write per element dominates the cost at hundreds of thousands of rows
+        fields = ''.join(f"<{field}>{self.text(finding[field])}</{field}>" for field in REPORT_FIELDS
+                         if field != 'severity' and finding[field] is not None)
+        self.out.write(f"<finding severity={self.attr(finding['severity'])}>{fields}</finding>\n")
+
+    def end(self):
+        severities = ''.join(f"<severity name={self.attr(severity)} count=\"{count}\"/>"
+                             for severity, count in self.severities.items())
+        self.out.write(f"<summary total=\"{self.count}\">{severities}</summary>\n</report>\n")
+
+class HtmlReport(ReportFormat):
+    extension = 'html'
+    COLUMNS = ('severity', 'target', 'port', 'vulnerability_type', 'description', 'remediation', 'last_seen')
+
+    def begin(self):
+        title = html.escape(self.title)
+        self.out.write(
+            f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{title}</title><style>"
+            "body{font-family:sans-serif}table{border-collapse:collapse}td,th{border:1px solid #ccc;padding:4px}"
+            ".critical{color:#b00}.high{color:#d60}.medium{color:#a80}</style></head><body>\n"
+            f"<h1>{title}</h1>\n<table>\n<tr>"
+            + ''.join(f"<th>{column.replace('_', ' ').title()}</th>" for column in self.COLUMNS) + "</tr>\n")
+
+    def write_finding(self, finding):
+        cells = ''.join(f"<td>{html.escape(str(finding[column] if finding[column] is not None else ''))}</td>"
+                        for column in self.COLUMNS)
+        self.out.write(f"<tr class=\"{html.escape(str(finding['severity']))}\">{cells}</tr>\n")
+
+    def end(self):
+        # Totals are only known after the single pass, so the summary closes the page
+        summary = ', '.join(f"{severity}: {count}" for severity, count in self.severities.items())
+        self.out.write(f"</table>\n<p>{self.count} findings ({html.escape(summary)})</p>\n</body></html>\n")
+
+class PdfReport(ReportFormat):
+    extension = 'pdf'
+    binary = True
+    LINES_PER_PAGE = 60
+    LINE_WIDTH = 110
+
+    def begin(self):
+        # Objects 1-3 (catalog, page tree, font) are fixed; pages are appended as they fill up
+        self.offsets = {}
+        self.page_ids = []
+        self.next_id = 4
+        self.lines = []
+        self.out.write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        self.write_object(3, b'<< /Type /Font /Subtype /Type1 /BaseFont /Courier >>')
+        self.add_line(self.title)
+        self.add_line('')
+
+    def write_object(self, object_id, body):
+        self.offsets[object_id] = self.out.tell()
+        self.out.write(f"{object_id} 0 obj\n".encode() + body + b'\nendobj\n')
+
+    def add_line(self, text):
+        while True:
+            self.lines.append(text[:self.LINE_WIDTH])
+            text = text[self.LINE_WIDTH:]
+            if len(self.lines) >= self.LINES_PER_PAGE:
+                self.flush_page()
+            if not text:
+                return
+            text = '    ' + text
+
+    def flush_page(self):
+        if not self.lines:
+            return
+        content = ['BT /F1 9 Tf 11 TL 36 806 Td']
+        for line in self.lines:
+            escaped = line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+            content.append(f"({escaped}) Tj T*")
+        content.append('ET')
+        stream = '\n'.join(content).encode('latin-1', 'replace')
+        options = b''
+        if self.compress:
+            stream = zlib.compress(stream)
+            options = b' /Filter /FlateDecode'
+        content_id, page_id = self.next_id, self.next_id + 1
+        self.next_id += 2
+        self.write_object(content_id, b'<< /Length %d%s >>\nstream\n' % (len(stream), options) + stream
+                          + b'\nendstream')
+        self.write_object(page_id, b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] '
+                                   b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>' % content_id)
+        self.page_ids.append(page_id)
+        self.lines = []
+
+    def write_finding(self, finding):
+        port = f":{finding['port']}" if finding['port'] is not None else ''
+        self.add_line(f"[{str(finding['severity']).upper()}] {finding['target']}{port}  "
+                      f"{finding['vulnerability_type']}")
+        self.add_line(f"    {finding['description'] or ''}")
+        if finding['remediation']:
+            self.add_line(f"    Fix: {finding['remediation']}")
+
+    def end(self):
+        self.add_line('')
+        self.add_line(f"{self.count} findings: " + ', '.join(
+            f"{severity} {count}" for severity, count in self.severities.items()))
+        self.flush_page()
+        kids = ' '.join(f"{page_id} 0 R" for page_id in self.page_ids).encode()
+        self.write_object(2, b'<< /Type /Pages /Kids [%s] /Count %d >>' % (kids, len(self.page_ids)))
+        self.write_object(1, b'<< /Type /Catalog /Pages 2 0 R >>')
+        xref = self.out.tell()
+        self.out.write(b'xref\n0 %d\n0000000000 65535 f \n' % self.next_id)
+        for object_id in range(1, self.next_id):
+            self.out.write(b'%010d 00000 n \n' % self.offsets[object_id])
+        self.out.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (self.next_id, xref))
+
+REPORT_FORMATS = {'json': JsonLinesReport, 'jsonl': JsonLinesReport, 'csv': CsvReport, 'xml': XmlReport,
+                  'html': HtmlReport, 'pdf': PdfReport}
+
+class ReportGenerator:
+
+    def __init__(self, db_path, output_dir, formats, compress=False):
+        unknown = [name for name in formats if name not in REPORT_FORMATS]
+        if unknown:
+            raise ValueError(f"Unsupported report format(s): {', '.join(unknown)}")
+        self.db_path = db_path
+        self.output_dir = Path(output_dir)
+        # json and jsonl share a writer class
+        self.formats = []
+        for name in formats:
+            if REPORT_FORMATS[name] not in self.formats:
+                self.formats.append(REPORT_FORMATS[name])
+        self.compress = compress
+
+    def iter_findings(self, scan_id=None, status='open'):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        source = 'vulnerabilities AS v'
+        if scan_id:
+            # Only the rows this scan saw, since concurrent jobs refresh last_seen on other targets too;
+            # CROSS JOIN keeps the scan's keys as the outer loop, each looked up through idx_vulnerabilities_key
+            source = '''scan_findings AS f CROSS JOIN vulnerabilities AS v ON f.scan_id = ? AND v.target = f.target
+                        AND IFNULL(v.port, -1) = f.port AND v.vulnerability_type = f.vulnerability_type
+                        AND IFNULL(v.cve_id, v.description) = f.identity'''
+        try:
+            # Severity by severity through idx_vulnerabilities_severity: ordered output without a sort
+            for severity in SEVERITY_ORDER + (None,):
+                where = ['v.status = ?']
+                params = [scan_id] if scan_id else []
+                params.append(status)
+                if severity is None:
+                    where.append(f"v.severity NOT IN ({', '.join('?' * len(SEVERITY_ORDER))})")
+                    params.extend(SEVERITY_ORDER)
+                else:
+                    where.append('v.severity = ?')
+                    params.append(severity)
+                columns = ', '.join(f'v.{field}' for field in REPORT_FIELDS)
+                cursor = conn.execute(f"SELECT {columns} FROM {source} WHERE {' AND '.join(where)}", params)
+                for row in cursor:
+                    yield dict(row)
+        finally:
+            conn.close()
+
+    def generate(self, findings, name=None, title='HEAX Scanner Report'):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        name = name or f"heax_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        writers = []
+        try:
+            for writer_class in self.formats:
+                suffix = '.gz' if self.compress and not writer_class.binary else ''
+                path = self.output_dir / f"{name}.{writer_class.extension}{suffix}"
+                writers.append(writer_class(path, self.compress, title))
+            # One pass over the findings, fanned out to every format
+            for finding in findings:
+                for writer in writers:
+                    writer.write(finding)
+        finally:
+            for writer in writers:
+                writer.close()
+        return [writer.path for writer in writers], (writers[0].count if writers else 0)
+
+def fingerprint_hash(text):
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8', 'replace'), digest_size=8).digest(), 'little')
+
+class ScanFingerprint:
+    # Parallel arrays sorted by key: 16 bytes per port or finding, plus a compressed label kept for reporting
+    __slots__ = ('keys', 'states', 'packed_labels', '_labels')
+
+    def __init__(self, keys, states, packed_labels=None, labels=None):
+        self.keys = keys
+        self.states = states
+        self.packed_labels = packed_labels
+        self._labels = labels
+
+    @classmethod
+    def from_scan(cls, results, findings):
+        # One 64-bit blake2b per key; the state only needs a cheap checksum since it is compared per key
+        items = {}
+        for r in results:
+            service = f"{r['service']} {r.get('product') or ''} {r.get('version') or ''}".rstrip()
+            items[fingerprint_hash(f"port\0{r['target']}\0{r['port']}")] = (
+                zlib.crc32(service.encode('utf-8', 'replace')),
+                f"port\t{r['risk'].lower()}\t{r['target']}:{r['port']} {service}")
+        for f in findings:
+            key = (f"vuln\0{f['target']}\0{f['port']}\0{f['vulnerability_type']}\0"
+                   f"{f.get('cve_id') or f['description']}")
+            items[fingerprint_hash(key)] = (
+                zlib.crc32(f['severity'].encode('utf-8')),
+                f"vuln\t{f['severity']}\t{f['target']}:{f['port']} {f['vulnerability_type']}: {f['description']}")
+        order = sorted(items.items())
+        return cls(array.array('Q', [key for key, _ in order]), array.array('Q', [value[0] for _, value in order]),
+                   labels=[value[1].replace('\n', ' ') for _, value in order])
+
+    @classmethod
+    def from_blobs(cls, keys, states, labels):
+        return cls(array.array('Q', zlib.decompress(keys)), array.array('Q', zlib.decompress(states)), labels)
+
+    def to_blobs(self):
+        return (zlib.compress(self.keys.tobytes()), zlib.compress(self.states.tobytes()),
+                self.packed_labels or zlib.compress('\n'.join(self._labels).encode('utf-8')))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def label(self, key):
+        # (kind, severity, text); labels are only unpacked when a delta needs describing
+        if self._labels is None:
+            self._labels = zlib.decompress(self.packed_labels).decode('utf-8').split('\n') if len(self.keys) else []
+        return tuple(self._labels[bisect.bisect_left(self.keys, key)].split('\t', 2))
+
+def diff_fingerprints(old, new, chunk=4096):
+    if old.keys == new.keys:
+        # Same ports and findings on both sides: compare state slices in C and only walk the chunks that differ
+        changed = set()
+        for start in range(0, len(new.keys), chunk):
+            end = start + chunk
+            if old.states[start:end] != new.states[start:end]:
+                changed.update(new.keys[i] for i in range(start, min(end, len(new.keys)))
+                               if old.states[i] != new.states[i])
+        added = removed = changed
+    else:
+        # Set differences on (key, state) pairs run in C; a key on both sides of the difference changed
+        old_pairs = set(zip(old.keys, old.states))
+        new_pairs = set(zip(new.keys, new.states))
+        removed = {key for key, _ in old_pairs - new_pairs}
+        added = {key for key, _ in new_pairs - old_pairs}
+        changed = removed & added
+    return {
+        'new': [new.label(key) for key in sorted(added - changed)],
+        'resolved': [old.label(key) for key in sorted(removed - changed)],
+        'changed': [(old.label(key), new.label(key)) for key in sorted(changed)]
+    }
+
+class AlertDispatcher:
+
+    def __init__(self, config, logger=None):
+        self.config = config
+        self.logger = logger or logging.getLogger(__name__)
+
+    def enabled(self, name):
+        return self.config.getboolean('NOTIFICATIONS', name, fallback=False)
+
+    def send(self, title, lines):
+        text = '\n'.join([title] + list(lines))
+        self.logger.warning(f"Alert: {text}")
+        integration = 'INTEGRATION'
+        try:
+            if self.config.getboolean(integration, 'slack_enabled', fallback=False):
+                self.post(self.config.get(integration, 'slack_webhook_url'), {
+                    'text': text,
+                    'channel': self.config.get(integration, 'slack_channel', fallback='') or None,
+                    'username': self.config.get(integration, 'slack_username', fallback='HEAX Scanner')
+                })
+            if self.config.getboolean(integration, 'teams_enabled', fallback=False):
+                self.post(self.config.get(integration, 'teams_webhook_url'), {'title': title, 'text': text})
+            if self.config.getboolean(integration, 'email_enabled', fallback=False):
+                self.send_email(title, text)
+        except (OSError, ValueError, smtplib.SMTPException) as e:
+            self.logger.error(f"Alert delivery failed: {e}")
+
+    @staticmethod
+    def post(url, payload):
+        request = urllib.request.Request(url, data=json.dumps(payload).encode('utf-8'),
+                                         headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request, timeout=10) as response:
+            response.read()
+
+    def send_email(self, title, text):
+        section = self.config['INTEGRATION']
+        message = EmailMessage()
+        message['Subject'] = title
+        message['From'] = section.get('email_from')
+        message['To'] = section.get('email_to')
+        message.set_content(text)
+        with smtplib.SMTP(section.get('smtp_server'), section.getint('smtp_port', fallback=587), timeout=10) as smtp:
+            smtp.starttls()
+            if section.get('smtp_username'):
+                smtp.login(section.get('smtp_username'), section.get('smtp_password'))
+            smtp.send_message(message)
+
+    def scan_delta(self, target, diff):
+        # Only what changed is announced; an unchanged rescan stays silent
+        alerting = [label for label in diff['new'] + [new for _, new in diff['changed']]
+                    if label[0] == 'vuln' and self.enabled(f"{label[1]}_vuln_alert")]
+        if alerting:
+            self.send(f"HEAX Scanner: {len(alerting)} new or changed findings on {target}",
+                      [f"[{severity.upper()}] {text}" for _, severity, text in alerting[:50]])
+        if self.enabled('scan_completion_alert') and any(diff.values()):
+            self.send(f"HEAX Scanner: scan of {target} changed",
+                      [f"{len(diff['new'])} new, {len(diff['resolved'])} resolved, {len(diff['changed'])} changed"])
+
+_shard_queue = None
+
+def init_shard_worker(results_queue):
+    global _shard_queue
+    _shard_queue = results_queue
+
+def iter_shard(space, ports, shard_index, shard_count, owners=None):
+    # owners, when given, maps each yielded (host, port) to the spec indices of its probes still in flight;
+    # a host listed in two specs (e.g. by name and by address) is probed once per spec
+    slots = space.slots
+    for index in range(shard_index, slots * len(ports), shard_count):
+        port_index, slot = divmod(index, slots)
+        host, spec_index = space.locate(slot)
+        if host is not None:
+            if owners is not None:
+                owners[(host, ports[port_index])].append(spec_index)
+            yield host, ports[port_index]
+
+def run_scan_shard(targets, space_options, ports, shard_index, shard_count, engine_options):
+    space = TargetSpace(targets, **space_options)
+    engine = PortScanEngine(**engine_options)
+    batch = []
+    owners = collections.defaultdict(collections.deque)
+    spec_stats = collections.defaultdict(collections.Counter)
+    last_flush = [time.monotonic(), 0]
+    
+    def flush(force=False):
+        now = time.monotonic()
+        if force or batch or now - last_flush[0] > 0.2:
+            _shard_queue.put(('progress', shard_index, engine.completed - last_flush[1], batch[:]))
+            last_flush[:] = [now, engine.completed]
+            batch.clear()
+    
+    def on_done(host, port, state):
+        # The spec index travels with the host: only this process resolved the target's names
+        pending = owners[(host, port)]
+        spec_index = pending.popleft() if pending else None
+        if not pending:
+            del owners[(host, port)]
+        spec_stats[spec_index]['filtered' if state == 'error' else state] += 1
+        if state == 'open':
+            batch.append((host, port, spec_index))
+            if len(batch) >= 256:
+                flush()
+    
+    async def run():
+        async def ticker():
+            while True:
+                await asyncio.sleep(0.2)
+                flush()
+        tick = asyncio.ensure_future(ticker())
+        try:
+            await engine.scan_items(iter_shard(space, ports, shard_index, shard_count, owners), on_done=on_done)
+        finally:
+            tick.cancel()
+    
+    asyncio.run(run())
+    flush(force=True)
+    _shard_queue.put(('done', shard_index, {spec: dict(counts) for spec, counts in spec_stats.items()}))
+    return shard_index
+
+def iter_lease_targets(targets, max_prefix=24):
+    items = (item for target in targets for item in TargetSpace.iter_spec_items(target))
+    for target in items:
+        try:
+            network = ipaddress.ip_network(target, strict=False)
+        except ValueError:
+            yield target
+            continue
+        if network.version == 4 and network.prefixlen < max_prefix:
+            for subnet in network.subnets(new_prefix=max_prefix):
+                yield str(subnet)
+        else:
+            yield str(network)
+
+def sign_request(secret, timestamp, body):
+    return hmac.new(secret.encode('utf-8'), f"{timestamp}.".encode('ascii') + body, hashlib.sha256).hexdigest()
+
+class JSONRequestHandler(http.server.BaseHTTPRequestHandler):
+    routes = {}
+    # Signed requests older or newer than this are refused, which bounds replays
+    SIGNATURE_WINDOW = 300
+
+    def do_POST(self):
+        handler = self.routes.get(self.path)
+        if handler is None:
+            self.send_json(404, {'error': 'not found'})
+            return
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            data = self.rfile.read(length)
+            if not self.authorized(data):
+                self.send_json(401, {'error': 'missing or invalid signature'})
+                return
+            payload = json.loads(data or b'{}')
+            status, body = handler(self.server.owner, payload)
+        except Exception as e:
+            self.server.owner.logger.error(f"{self.path} failed: {e}")
+            status, body = 500, {'error': str(e)}
+        self.send_json(status, body)
+
+    def authorized(self, data):
+        # Owners with a shared secret only accept bodies signed with HMAC-SHA256 over "<timestamp>.<body>"
+        secret = getattr(self.server.owner, 'secret', None)
+        if not secret:
+            return True
+        timestamp = self.headers.get('X-Heax-Timestamp', '')
+        try:
+            fresh = abs(time.time() - float(timestamp)) <= self.SIGNATURE_WINDOW
+        except ValueError:
+            return False
+        return fresh and hmac.compare_digest(self.headers.get('X-Heax-Signature', ''),
+                                             sign_request(secret, timestamp, data))
+
+    def send_json(self, status, body):
+        data = json.dumps(body, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+def is_loopback(address):
+    try:
+        return ipaddress.ip_address(address).is_loopback
+    except ValueError:
+        return address == 'localhost'
+
+def post_json(url, payload, timeout=30, secret=None):
+    data = json.dumps(payload).encode('utf-8')
+    headers = {'Content-Type': 'application/json'}
+    if secret:
+        timestamp = str(int(time.time()))
+        headers['X-Heax-Timestamp'] = timestamp
+        headers['X-Heax-Signature'] = sign_request(secret, timestamp, data)
+    request = urllib.request.Request(url, data=data, headers=headers)
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read() or b'{}')
+
+class CoordinatorHandler(JSONRequestHandler):
+    routes = {
+        '/lease': lambda owner, payload: owner.handle_lease(payload),
+        '/heartbeat': lambda owner, payload: owner.handle_heartbeat(payload),
+        '/complete': lambda owner, payload: owner.handle_complete(payload)
+    }
+
+class ScanCoordinator:
+
+    def __init__(self, scanner, bind='127.0.0.1', port=8765, lease_seconds=60, secret=None):
+        self.scanner = scanner
+        self.logger = scanner.logger
+        self.bind = bind
+        self.port = port
+        self.lease_seconds = lease_seconds
+        self.secret = secret
+        self.queue_size = scanner.config.getint('PERFORMANCE', 'scan_queue_size', fallback=100)
+        self.lock = threading.Lock()
+        self.job_id = None
+        self.server = None
+        self.chunks = None
+        self.chunks_cursor = None
+
+    def connect(self):
+        conn = sqlite3.connect(self.scanner.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def submit(self, targets, ports):
+        self.job_id = str(uuid.uuid4())
+        conn = self.connect()
+        try:
+            with conn:
+                conn.execute(
+                    '''INSERT INTO scan_jobs (job_id, targets, ports, cursor, state, created)
+                       VALUES (?, ?, ?, 0, 'running', ?)''',
+                    (self.job_id, json.dumps(targets), json.dumps(list(ports)), time.time())
+                )
+        finally:
+            conn.close()
+        self.fill_queue()
+        return self.job_id
+
+    def resume(self):
+        conn = self.connect()
+        try:
+            row = conn.execute(
+                "SELECT job_id FROM scan_jobs WHERE state = 'running' ORDER BY created DESC LIMIT 1"
+            ).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        self.job_id = row['job_id']
+        self.fill_queue()
+        return self.job_id
+
+    def fill_queue(self):
+        # Leases are cut lazily so scan_queue_size bounds the durable backlog, not the target list
+        with self.lock:
+            conn = self.connect()
+            try:
+                with conn:
+                    job = conn.execute("SELECT * FROM scan_jobs WHERE job_id = ?", (self.job_id,)).fetchone()
+                    outstanding = conn.execute(
+                        "SELECT COUNT(*) FROM scan_leases WHERE job_id = ? AND state != 'done'",
+                        (self.job_id,)
+                    ).fetchone()[0]
+                    room = self.queue_size - outstanding
+                    if room <= 0:
+                        return
+                    if self.chunks_cursor != job['cursor']:
+                        # Only on start or resume: skip the leases cut by earlier runs once, then keep walking
+                        self.chunks = itertools.islice(iter_lease_targets(json.loads(job['targets'])),
+                                                       job['cursor'], None)
+                        self.chunks_cursor = job['cursor']
+                    rows = [(str(uuid.uuid4()), self.job_id, chunk, time.time())
+                            for chunk in itertools.islice(self.chunks, room)]
+                    conn.executemany(
+                        '''INSERT INTO scan_leases (lease_id, job_id, target, state, attempts, created)
+                           VALUES (?, ?, ?, 'pending', 0, ?)''',
+                        rows
+                    )
+                    conn.execute("UPDATE scan_jobs SET cursor = cursor + ? WHERE job_id = ?",
+                                 (len(rows), self.job_id))
+                    if not rows and not outstanding:
+                        conn.execute("UPDATE scan_jobs SET state = 'completed' WHERE job_id = ?",
+                                     (self.job_id,))
+                self.chunks_cursor += len(rows)
+            except BaseException:
+                # The chunks taken for a rolled-back batch are gone; rebuild from the stored cursor
+                self.chunks_cursor = None
+                raise
+            finally:
+                conn.close()
+
+    def handle_lease(self, payload):
+        worker = payload.get('worker', 'unknown')
+        now = time.time()
+        with self.lock:
+            conn = self.connect()
+            try:
+                with conn:
+                    # Leases held by workers that stopped heartbeating go back to the queue
+                    conn.execute(
+                        '''UPDATE scan_leases SET state = 'pending', worker = NULL
+                           WHERE job_id = ? AND state = 'leased' AND expires_at < ?''',
+                        (self.job_id, now)
+                    )
+                    lease = conn.execute(
+                        '''SELECT lease_id, target FROM scan_leases
+                           WHERE job_id = ? AND state = 'pending' ORDER BY created LIMIT 1''',
+                        (self.job_id,)
+                    ).fetchone()
+                    if lease is not None:
+                        conn.execute(
+                            '''UPDATE scan_leases SET state = 'leased', worker = ?, expires_at = ?,
+                               attempts = attempts + 1 WHERE lease_id = ?''',
+                            (worker, now + self.lease_seconds, lease['lease_id'])
+                        )
+                    job = conn.execute("SELECT ports, state FROM scan_jobs WHERE job_id = ?",
+                                       (self.job_id,)).fetchone()
+            finally:
+                conn.close()
+        
+        if lease is None:
+            return 200, {'status': 'done' if job['state'] == 'completed' else 'wait'}
+        self.logger.info(f"Lease {lease['lease_id']} ({lease['target']}) issued to {worker}")
+        return 200, {
+            'status': 'lease',
+            'lease_id': lease['lease_id'],
+            'target': lease['target'],
+            'ports': json.loads(job['ports']),
+            'lease_seconds': self.lease_seconds
+        }
+
+    def handle_heartbeat(self, payload):
+        conn = self.connect()
+        try:
+            with conn:
+                updated = conn.execute(
+                    '''UPDATE scan_leases SET expires_at = ?
+                       WHERE state = 'leased' AND lease_id = ? AND worker = ?''',
+                    (time.time() + self.lease_seconds, payload.get('lease_id'), payload.get('worker'))
+                ).rowcount
+        finally:
+            conn.close()
+        return (200, {'status': 'ok'}) if updated else (409, {'error': 'lease lost'})
+
+    def handle_complete(self, payload):
+        with self.lock:
+            conn = self.connect()
+            try:
+                with conn:
+                    # Only the current holder completes: a worker whose lease expired and was re-issued
+                    # no longer matches the stored worker
+                    lease = conn.execute(
+                        "SELECT target FROM scan_leases WHERE lease_id = ? AND state = 'leased' AND worker = ?",
+                        (payload.get('lease_id'), payload.get('worker'))
+                    ).fetchone()
+                    conn.execute("UPDATE scan_leases SET state = 'done' WHERE lease_id = ? AND worker = ?",
+                                 (payload.get('lease_id'), payload.get('worker')))
+            finally:
+                conn.close()
+            if lease is None:
+                return 409, {'error': 'lease completed or held by another worker'}
+            open_ports = [(host, int(port)) for host, port in payload.get('open_ports', [])]
+            start_time = datetime.fromtimestamp(payload.get('started', time.time()))
+            self.scanner.record_scan(lease['target'], 'distributed', start_time,
+                                     payload.get('stats', {}), open_ports)
+        self.fill_queue()
+        return 200, {'status': 'ok'}
+
+    def is_finished(self):
+        conn = self.connect()
+        try:
+            row = conn.execute("SELECT state FROM scan_jobs WHERE job_id = ?", (self.job_id,)).fetchone()
+        finally:
+            conn.close()
+        return row is not None and row['state'] == 'completed'
+
+    def progress(self):
+        conn = self.connect()
+        try:
+            return dict(conn.execute(
+                "SELECT state, COUNT(*) FROM scan_leases WHERE job_id = ? GROUP BY state",
+                (self.job_id,)
+            ).fetchall())
+        finally:
+            conn.close()
+
+    def start(self):
+        self.server = http.server.ThreadingHTTPServer((self.bind, self.port), CoordinatorHandler)
+        self.server.owner = self
+        self.port = self.server.server_address[1]
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+class ScanWorker:
+
+    def __init__(self, scanner, url, worker_id=None, secret=None):
+        self.scanner = scanner
+        self.logger = scanner.logger
+        self.url = url.rstrip('/')
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.secret = secret
+
+    def run(self, poll_interval=2.0):
+        completed = 0
+        while True:
+            try:
+                lease = post_json(f"{self.url}/lease", {'worker': self.worker_id}, secret=self.secret)
+            except urllib.error.HTTPError as e:
+                if e.code != 401:
+                    raise
+                self.logger.error("Coordinator rejected our signature; check the shared secret")
+                return completed
+            except (urllib.error.URLError, OSError) as e:
+                self.logger.warning(f"Coordinator unreachable: {e}")
+                time.sleep(poll_interval)
+                continue
+            if lease['status'] == 'done':
+                return completed
+            if lease['status'] == 'wait':
+                time.sleep(poll_interval)
+                continue
+            self.run_lease(lease)
+            completed += 1
+
+    def run_lease(self, lease):
+        started = time.time()
+        engine = self.scanner.create_port_engine()
+        hosts = TargetSpace([lease['target']])
+        
+        async def heartbeat():
+            loop = asyncio.get_running_loop()
+            while True:
+                await asyncio.sleep(lease['lease_seconds'] / 3)
+                try:
+                    await loop.run_in_executor(None, functools.partial(
+                        post_json, f"{self.url}/heartbeat", {'lease_id': lease['lease_id'], 'worker': self.worker_id},
+                        secret=self.secret))
+                except (urllib.error.URLError, OSError) as e:
+                    self.logger.warning(f"Heartbeat for {lease['lease_id']} failed: {e}")
+        
+        async def run():
+            beat = asyncio.ensure_future(heartbeat())
+            try:
+                return await engine.scan(hosts, lease['ports'])
+            finally:
+                beat.cancel()
+        
+        open_ports = asyncio.run(run())
+        self.logger.info(f"Lease {lease['lease_id']} ({lease['target']}): {len(open_ports)} open ports")
+        try:
+            post_json(f"{self.url}/complete", {
+                'lease_id': lease['lease_id'],
+                'worker': self.worker_id,
+                'started': started,
+                'stats': dict(engine.stats),
+                'open_ports': open_ports
+            }, secret=self.secret)
+        except urllib.error.HTTPError as e:
+            self.logger.warning(f"Lease {lease['lease_id']} rejected by coordinator: {e.code}")
+
+class ScanJob:
+    # One queued scan request; doubles as the event sink its scan reports to
+    EVENT_HISTORY = 10000
+
+    def __init__(self, request, priority=5):
+        self.job_id = str(uuid.uuid4())
+        self.request = request
+        self.priority = priority
+        self.state = 'queued'
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.sequence = 0
+        self.events = collections.deque(maxlen=self.EVENT_HISTORY)
+        self.counts = collections.Counter()
+        self.scan_ids = []
+        self.condition = threading.Condition()
+
+    def __call__(self, kind, record):
+        with self.condition:
+            self.sequence += 1
+            self.events.append({'type': kind, 'seq': self.sequence, 'time': datetime.now().isoformat(), **record})
+            self.counts[kind] += 1
+            if kind == 'scan':
+                self.scan_ids.append(record['scan_id'])
+            self.condition.notify_all()
+
+    def start(self):
+        with self.condition:
+            self.state = 'running'
+            self.started = time.time()
+            self.condition.notify_all()
+
+    def finish(self, state, error=None):
+        with self.condition:
+            self.state = state
+            self.error = error
+            self.finished = time.time()
+            self.condition.notify_all()
+
+    @property
+    def done(self):
+        return self.state in ('completed', 'failed', 'cancelled')
+
+    def events_since(self, sequence):
+        return [event for event in self.events if event['seq'] > sequence]
+
+    def wait(self, sequence, timeout):
+        with self.condition:
+            self.condition.wait_for(lambda: self.sequence > sequence or self.done, timeout)
+            return self.events_since(sequence), self.done
+
+    def summary(self):
+        return {
+            'job_id': self.job_id, 'state': self.state, 'priority': self.priority, 'request': self.request,
+            'created': self.created, 'started': self.started, 'finished': self.finished, 'error': self.error,
+            'events': dict(self.counts), 'last_seq': self.sequence, 'scan_ids': list(self.scan_ids)
+        }
+
+class DaemonHandler(JSONRequestHandler):
+    routes = {
+        '/scans': lambda owner, payload: owner.handle_submit(payload),
+        '/cancel': lambda owner, payload: owner.handle_cancel(payload)
+    }
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        parts = [part for part in url.path.split('/') if part]
+        owner = self.server.owner
+        if parts == ['health']:
+            self.send_json(200, owner.health())
+            return
+        # Job listings carry targets, so reads are signed too (over an empty body)
+        if not self.authorized(b''):
+            self.send_json(401, {'error': 'missing or invalid signature'})
+            return
+        if parts == ['scans']:
+            self.send_json(200, {'jobs': [job.summary() for job in list(owner.jobs.values())]})
+            return
+        job = owner.jobs.get(parts[1]) if len(parts) in (2, 3) and parts[0] == 'scans' else None
+        if job is None or (len(parts) == 3 and parts[2] != 'events'):
+            self.send_json(404, {'error': 'not found'})
+            return
+        try:
+            since = int(urllib.parse.parse_qs(url.query).get('since', ['0'])[0])
+        except ValueError:
+            self.send_json(400, {'error': 'since must be an integer'})
+            return
+        if len(parts) == 2:
+            self.send_json(200, dict(job.summary(), progress=job.events_since(since)))
+        else:
+            self.stream_events(job, since)
+
+    def stream_events(self, job, since):
+        # JSON Lines until the job finishes; the connection closes at the end (HTTP/1.0)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.end_headers()
+        try:
+            while True:
+                events, done = job.wait(since, timeout=15)
+                for event in events:
+                    self.wfile.write(json.dumps(event, default=str).encode('utf-8') + b'\n')
+                    since = event['seq']
+                self.wfile.flush()
+                if done and not events:
+                    break
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+class ScanDaemon:
+    SCAN_TYPES = ('fast', 'normal', 'deep', 'crypto', 'app')
+    JOB_HISTORY = 1000
+
+    def __init__(self, scanner, bind='127.0.0.1', port=8766, socket_path=None, secret=None):
+        self.scanner = scanner
+        self.logger = scanner.logger
+        self.bind = bind
+        self.port = port
+        self.socket_path = socket_path
+        self.secret = secret
+        self.parallel = max(1, scanner.config.getint('PERFORMANCE', 'parallel_scans', fallback=5))
+        self.queue = queue.PriorityQueue(
+            maxsize=scanner.config.getint('PERFORMANCE', 'scan_queue_size', fallback=100))
+        self.jobs = collections.OrderedDict()
+        self.sequence = itertools.count()
+        self.lock = threading.Lock()
+        self.running = 0
+        self.started = time.time()
+        self.server = None
+        self.workers = []
+
+    def handle_submit(self, payload):
+        targets = payload.get('targets')
+        if isinstance(targets, str):
+            targets = [targets]
+        if not targets or not all(isinstance(target, str) and target for target in targets):
+            return 400, {'error': 'targets must be a non-empty list of strings'}
+        scan_type = payload.get('type', 'normal')
+        if scan_type not in self.SCAN_TYPES:
+            return 400, {'error': f"type must be one of {', '.join(self.SCAN_TYPES)}"}
+        profile = payload.get('profile')
+        if profile is not None:
+            self.scanner.get_scan_profile(profile)
+            if profile not in self.scanner.scan_profiles:
+                return 400, {'error': f"unknown scan profile {profile}"}
+        try:
+            priority = int(payload.get('priority', 5))
+        except (TypeError, ValueError):
+            return 400, {'error': 'priority must be an integer'}
+        
+        job = ScanJob({'targets': targets, 'type': scan_type, 'profile': profile, 'ports': payload.get('ports')},
+                      priority)
+        with self.lock:
+            try:
+                # Lower priority values run first; the sequence keeps submission order within a priority
+                self.queue.put_nowait((priority, next(self.sequence), job))
+            except queue.Full:
+                return 503, {'error': 'scan queue is full'}
+            self.jobs[job.job_id] = job
+            while len(self.jobs) > self.JOB_HISTORY:
+                oldest = next(iter(self.jobs.values()))
+                if not oldest.done:
+                    break
+                self.jobs.popitem(last=False)
+        self.logger.info(f"Queued scan job {job.job_id} ({scan_type}, priority {priority}): {' '.join(targets)}")
+        return 202, {'job_id': job.job_id, 'state': job.state, 'queued': self.queue.qsize()}
+
+    def handle_cancel(self, payload):
+        job = self.jobs.get(payload.get('job_id'))
+        if job is None:
+            return 404, {'error': 'not found'}
+        with job.condition:
+            if job.state != 'queued':
+                return 409, {'error': f"job is {job.state}"}
+            job.state = 'cancelled'
+            job.finished = time.time()
+            job.condition.notify_all()
+        return 200, {'job_id': job.job_id, 'state': job.state}
+
+    def health(self):
+        return {
+            'status': 'ok', 'uptime': round(time.time() - self.started, 1), 'queued': self.queue.qsize(),
+            'running': self.running, 'parallel_scans': self.parallel, 'scan_queue_size': self.queue.maxsize,
+            'ai_models': sorted(self.scanner.ai_models)
+        }
+
+    def work(self):
+        while True:
+            _, _, job = self.queue.get()
+            if job is None:
+                return
+            if job.state == 'cancelled':
+                continue
+            with self.lock:
+                self.running += 1
+            job.start()
+            # Events from this thread's scan go to the job; other workers keep their own sinks
+            self.scanner.local.event_sink = job
+            try:
+                request = job.request
+                self.scanner.run_batch_scan(request['targets'], request['type'], request['profile'], request['ports'])
+                job.finish('completed' if job.scan_ids else 'failed',
+                           None if job.scan_ids else 'no scan was recorded; see the daemon log')
+            except Exception as e:
+                self.logger.error(f"Scan job {job.job_id} failed: {e}")
+                job.finish('failed', str(e))
+            finally:
+                self.scanner.local.event_sink = None
+                with self.lock:
+                    self.running -= 1
+
+    def warm_up(self):
+        # Pay one-off costs at startup instead of on the first job
+        self.scanner.get_result_writer()
+        self.scanner.get_probe_cache()
+        self.scanner.get_tls_analyzer()
+        self.scanner.get_scan_profile('normal')
+        if aiohttp is not None:
+            # aiohttp is a lazy module; importing a submodule runs its package body now rather than in the first job
+            importlib.import_module('aiohttp.client')
+
+    def start(self):
+        self.warm_up()
+        if self.socket_path:
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            self.server = UnixHTTPServer(self.socket_path, DaemonHandler)
+            # Only the daemon's own user may connect
+            os.chmod(self.socket_path, 0o600)
+            address = f"unix:{self.socket_path}"
+        else:
+            self.server = http.server.ThreadingHTTPServer((self.bind, self.port), DaemonHandler)
+            self.port = self.server.server_address[1]
+            address = f"http://{self.bind}:{self.port}"
+        self.server.owner = self
+        threading.Thread(target=self.server.serve_forever, name='heax-daemon-http', daemon=True).start()
+        for index in range(self.parallel):
+            worker = threading.Thread(target=self.work, name=f'heax-daemon-{index}', daemon=True)
+            worker.start()
+            self.workers.append(worker)
+        return address
+
+    def stop(self):
+        for _ in self.workers:
+            self.queue.put((float('inf'), next(self.sequence), None))
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            if self.socket_path and os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+class CronSchedule:
+    # Five-field cron expression (minute hour day-of-month month day-of-week) in local time
+    FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+    MONTHS = {name: index for index, name in enumerate(
+        ('jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'), 1)}
+    WEEKDAYS = {name: index for index, name in enumerate(('sun', 'mon', 'tue', 'wed', 'thu', 'fri', 'sat'))}
+
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields, got {expression!r}")
+        self.expression = ' '.join(fields)
+        names = ({}, {}, {}, self.MONTHS, self.WEEKDAYS)
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            self.parse_field(field, bounds, field_names)
+            for field, bounds, field_names in zip(fields, self.FIELDS, names)
+        )
+        self.weekdays = frozenset(day % 7 for day in weekdays)
+        self.any_day = fields[2] == '*'
+        self.any_weekday = fields[4] == '*'
+
+    @staticmethod
+    def parse_field(field, bounds, names):
+        low, high = bounds
+        values = set()
+        for part in field.lower().split(','):
+            part, _, step = part.partition('/')
+            step = int(step) if step else 1
+            if part == '*':
+                start, end = low, high
+            else:
+                first, _, last = part.partition('-')
+                start = names[first] if first in names else int(first)
+                if last:
+                    end = names[last] if last in names else int(last)
+                else:
+                    end = high if step > 1 else start
+            if step < 1 or not low <= start <= end <= high:
+                raise ValueError(f"Cron field {field!r} is outside {low}-{high}")
+            values.update(range(start, end + 1, step))
+        return frozenset(values)
+
+    def day_matches(self, moment):
+        day = moment.day in self.days
+        weekday = moment.isoweekday() % 7 in self.weekdays
+        # As in cron, a restricted day-of-month and day-of-week match when either does
+        if self.any_day or self.any_weekday:
+            return day and weekday
+        return day or weekday
+
+    def next_after(self, moment):
+        moment = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + timedelta(days=366 * 5)
+        while moment < limit:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self.day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment
+        raise ValueError(f"Cron expression {self.expression!r} never fires")
+
+def schedule_expression(every, at='00:00', day=None):
+    # Daily, weekly and monthly schedules are stored as the equivalent cron expression
+    if every == 'cron':
+        return CronSchedule(at).expression
+    hour, _, minute = at.partition(':')
+    if every == 'daily':
+        expression = f"{int(minute or 0)} {int(hour)} * * *"
+    elif every == 'weekly':
+        expression = f"{int(minute or 0)} {int(hour)} * * {day or 'sun'}"
+    elif every == 'monthly':
+        expression = f"{int(minute or 0)} {int(hour)} {day or 1} * *"
+    else:
+        raise ValueError(f"Unknown schedule {every!r}")
+    return CronSchedule(expression).expression
+
+class ScanScheduler:
+    # Runs without a finish time stop counting against the cap this long after max_scan_duration
+    STALE_GRACE = 300
+
+    def __init__(self, scanner):
+        self.scanner = scanner
+        self.logger = scanner.logger
+        config = scanner.config
+        self.max_concurrent = max(1, config.getint('SCHEDULER', 'max_concurrent_scans', fallback=2))
+        self.max_duration = config.getint('SCANNER', 'max_scan_duration', fallback=3600)
+        self.default_jitter = config.getint('SCHEDULER', 'jitter_minutes', fallback=15) * 60
+        self.poll_interval = config.getfloat('SCHEDULER', 'poll_seconds', fallback=30)
+        self.stopping = threading.Event()
+        self.wakeup = threading.Event()
+        self.thread = None
+
+    def connect(self):
+        conn = sqlite3.connect(self.scanner.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def jitter_offset(schedule_id, jitter):
+        # Stable per schedule, so jobs sharing a start time are spread the same way on every run
+        if jitter <= 0:
+            return 0
+        digest = hashlib.blake2b(schedule_id.encode(), digest_size=4).digest()
+        return int.from_bytes(digest, 'little') % jitter
+
+    def next_run(self, schedule_id, expression, jitter, after=None):
+        moment = CronSchedule(expression).next_after(after or datetime.now())
+        return moment.timestamp() + self.jitter_offset(schedule_id, jitter)
+
+    def add(self, targets, expression, scan_type='normal', profile=None, ports=None, jitter=None, name=None):
+        expression = CronSchedule(expression).expression
+        schedule_id = str(uuid.uuid4())
+        jitter = self.default_jitter if jitter is None else max(0, int(jitter))
+        next_run = self.next_run(schedule_id, expression, jitter)
+        request = {'targets': list(targets), 'type': scan_type, 'profile': profile, 'ports': ports}
+        conn = self.connect()
+        try:
+            with conn:
+                conn.execute(
+                    '''INSERT INTO scheduled_scans (schedule_id, name, expression, request, jitter, created, next_run)
+                       VALUES (?, ?, ?, ?, ?, ?, ?)''',
+                    (schedule_id, name or ' '.join(targets), expression, json.dumps(request), jitter, time.time(),
+                     next_run)
+                )
+        finally:
+            conn.close()
+        self.wakeup.set()
+        return schedule_id, next_run
+
+    def remove(self, schedule_id):
+        conn = self.connect()
+        try:
+            rows = conn.execute('SELECT schedule_id FROM scheduled_scans WHERE schedule_id LIKE ?',
+                                (f"{schedule_id}%",)).fetchall()
+            if len(rows) != 1:
+                return len(rows)
+            with conn:
+                conn.execute('DELETE FROM scheduled_scans WHERE schedule_id = ?', (rows[0][0],))
+            return 1
+        finally:
+            conn.close()
+
+    def schedules(self):
+        conn = self.connect()
+        try:
+            return conn.execute('SELECT * FROM scheduled_scans ORDER BY next_run').fetchall()
+        finally:
+            conn.close()
+
+    def claim_due(self):
+        now = time.time()
+        claimed = []
+        conn = self.connect()
+        try:
+            # IMMEDIATE serialises claims, so the cap holds across every process sharing the database
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                running = conn.execute(
+                    'SELECT COUNT(*) FROM schedule_runs WHERE finished IS NULL AND started > ?',
+                    (now - self.max_duration - self.STALE_GRACE,)
+                ).fetchone()[0]
+                room = self.max_concurrent - running
+                if room > 0:
+                    due = conn.execute(
+                        '''SELECT * FROM scheduled_scans WHERE enabled = 1 AND next_run <= ?
+                           ORDER BY next_run LIMIT ?''', (now, room)
+                    ).fetchall()
+                    for schedule in due:
+                        # Missed occurrences are skipped rather than replayed back to back
+                        run_id = str(uuid.uuid4())
+                        conn.execute(
+                            'UPDATE scheduled_scans SET next_run = ?, last_run = ? WHERE schedule_id = ?',
+                            (self.next_run(schedule['schedule_id'], schedule['expression'], schedule['jitter']),
+                             now, schedule['schedule_id'])
+                        )
+                        conn.execute(
+                            'INSERT INTO schedule_runs (run_id, schedule_id, started, pid) VALUES (?, ?, ?, ?)',
+                            (run_id, schedule['schedule_id'], now, os.getpid())
+                        )
+                        claimed.append((run_id, schedule))
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+        finally:
+            conn.close()
+        return claimed
+
+    def execute(self, run_id, schedule):
+        request = json.loads(schedule['request'])
+        command = [sys.executable, os.path.abspath(__file__), 'scan', *request['targets'],
+                   '--type', request.get('type') or 'normal', '--output', 'jsonl']
+        if request.get('profile'):
+            command += ['--profile', request['profile']]
+        if request.get('ports'):
+            command += ['--ports', request['ports']]
+        self.logger.info(f"Scheduled scan {schedule['name']} starting (run {run_id})")
+        
+        scan_ids = []
+        timed_out = threading.Event()
+        try:
+            # A child process can be killed at max_scan_duration; a scan running in this process could not
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        except OSError as e:
+            self.logger.error(f"Scheduled scan {schedule['name']} could not start: {e}")
+            self.finish(run_id, schedule, f"failed: {e}", scan_ids)
+            return
+        
+        def kill():
+            timed_out.set()
+            process.kill()
+        
+        timer = threading.Timer(self.max_duration, kill)
+        timer.daemon = True
+        timer.start()
+        try:
+            for line in process.stdout:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if event.get('type') == 'scan':
+                    scan_ids.append(event['scan_id'])
+            returncode = process.wait()
+        finally:
+            timer.cancel()
+            process.stdout.close()
+        
+        if timed_out.is_set():
+            status = 'timeout'
+            self.logger.warning(f"Scheduled scan {schedule['name']} killed after max_scan_duration "
+                                f"({self.max_duration}s)")
+        elif returncode == 0:
+            status = 'completed'
+        else:
+            status = f"failed (exit {returncode})"
+        self.finish(run_id, schedule, status, scan_ids)
+
+    def finish(self, run_id, schedule, status, scan_ids):
+        conn = self.connect()
+        try:
+            with conn:
+                conn.execute('UPDATE schedule_runs SET finished = ?, status = ?, scan_ids = ? WHERE run_id = ?',
+                             (time.time(), status, json.dumps(scan_ids), run_id))
+                conn.execute('UPDATE scheduled_scans SET last_status = ? WHERE schedule_id = ?',
+                             (status, schedule['schedule_id']))
+        except sqlite3.Error as e:
+            self.logger.error(f"Could not record scheduled run {run_id}: {e}")
+        finally:
+            conn.close()
+        self.logger.info(f"Scheduled scan {schedule['name']} {status} ({len(scan_ids)} scans recorded)")
+        # A finished run frees a slot; look for waiting jobs now instead of at the next poll
+        self.wakeup.set()
+
+    def run(self):
+        while not self.stopping.is_set():
+            try:
+                for run_id, schedule in self.claim_due():
+                    threading.Thread(target=self.execute, args=(run_id, schedule),
+                                     name=f'heax-schedule-{run_id[:8]}', daemon=True).start()
+            except sqlite3.Error as e:
+                self.logger.error(f"Scheduler could not claim due scans: {e}")
+            self.wakeup.wait(self.poll_interval)
+            self.wakeup.clear()
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name='heax-scheduler', daemon=True)
+        self.thread.start()
+        return self.thread
+
+    def stop(self):
+        self.stopping.set()
+        self.wakeup.set()
 
 class HeaxScanner:
     
-    def __init__(self):
-        self.console = Console()
+    def __init__(self, headless=False):
+        self.headless = headless
+        # Headless runs stream events instead of rendering; stdout is left to the event sink
+        self.console = Console(stderr=True, quiet=True) if headless else Console()
+        self.event_sink = None
+        self.local = threading.local()
         self.scan_results = {}
+        self.scan_profiles = None
+        self.last_scan_id = None
+        self.tls_analyzer = None
+        self.tls_lock = threading.Lock()
+        self.result_writer = None
+        self.probe_cache = None
+        self.scheduler = None
         self.vulnerability_database = {}
         self.ai_models = {}
         self.config = self.load_config()
         self.setup_logging()
+        self.alerts = AlertDispatcher(self.config, self.logger)
         self.setup_database()
         self.load_ai_models()
         
@@ -92,7 +3856,7 @@ class HeaxScanner:
             format='%(asctime)s - %(levelname)s - %(message)s',
             handlers=[
                 logging.FileHandler('heax_scanner.log', encoding='utf-8'),
-                logging.StreamHandler(sys.stdout)
+                logging.StreamHandler(sys.stderr if self.headless else sys.stdout)
             ]
         )
         self.logger = logging.getLogger(__name__)
@@ -144,9 +3908,12 @@ class HeaxScanner:
         self.init_database()
         
     def init_database(self):
-        import sqlite3
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
+        # Only takes effect on a new file; maintenance converts older databases with one VACUUM
+        cursor.execute('PRAGMA auto_vacuum=INCREMENTAL')
+        # WAL is persistent: readers (dashboard, coordinator) no longer block the result writer
+        cursor.execute('PRAGMA journal_mode=WAL')
         
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS vulnerabilities (
@@ -180,6 +3947,34 @@ class HeaxScanner:
             )
         ''')
         
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS scan_jobs (
+                job_id TEXT PRIMARY KEY,
+                targets TEXT,
+                ports TEXT,
+                cursor INTEGER DEFAULT 0,
+                state TEXT,
+                created REAL
+            )
+        ''')
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS scan_leases (
+                lease_id TEXT PRIMARY KEY,
+                job_id TEXT,
+                target TEXT,
+                state TEXT,
+                worker TEXT,
+                expires_at REAL,
+                attempts INTEGER DEFAULT 0,
+                created REAL
+            )
+        ''')
+        
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_scan_leases_job_state ON scan_leases (job_id, state)
+        ''')
+        
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS ai_models (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -192,7 +3987,12 @@ class HeaxScanner:
         ''')
         
         conn.commit()
-        conn.close()
+        conn.isolation_level = None
+        try:
+            for version in migrate_database(conn):
+                self.logger.info(f"Applied database schema migration {version}")
+        finally:
+            conn.close()
         
     def load_ai_models(self):
         self.ai_models = {
@@ -214,12 +4014,19 @@ class HeaxScanner:
     def load_false_positive_reducer(self):
         return {'loaded': True, 'accuracy': 0.94}
 
+    @functools.cached_property
+    def banner(self):
+        # Rendered once per session rather than on every pass through the menu loop; plain text without pyfiglet
+        if pyfiglet is None:
+            return 'HEAX SCANNER'
+        try:
+            return pyfiglet.Figlet(font='slant').renderText('HEAX SCANNER')
+        except ImportError:
+            return 'HEAX SCANNER'
+
     def display_banner(self):
-        f = Figlet(font='slant')
-        banner = f.renderText('HEAX SCANNER')
-        
         self.console.print(Panel(
-            Align.center(Text(banner, style="bold blue")),
+            Align.center(Text(self.banner, style="bold blue")),
             title="[bold red]Heax Scanner[/bold red]",
             subtitle="[bold green]HeaxScanner By : AymanCsharp[/bold green]",
             border_style="blue"
@@ -345,8 +4152,13 @@ class HeaxScanner:
             networks.append(network)
         
         if networks:
+            scan_type = Prompt.ask(
+                "[cyan]Scan type[/cyan]",
+                choices=["fast", "normal", "deep"],
+                default="normal"
+            )
             self.console.print(f"\n[green]Starting scan for {len(networks)} networks[/green]")
-            self.perform_multi_network_scan(networks)
+            self.perform_multi_network_scan(networks, scan_type)
 
     def targeted_scan(self):
         self.console.print("\n[bold green]Targeted Scan[/bold green]")
@@ -458,45 +4270,701 @@ class HeaxScanner:
         self.console.print("[yellow]Goodbye![/yellow]")
         sys.exit(0)
 
-    def perform_network_scan(self, target, scan_type):
-        with Progress(
+    def perform_network_scan(self, target, scan_type, profile=None):
+        profile = profile or self.get_scan_profile(scan_type)
+        reused = None
+        checkpoint = self.load_checkpoint(target, scan_type, profile)
+        if checkpoint is not None:
+            hosts, reused = checkpoint.hosts, checkpoint.reused
+            start_time = datetime.fromtimestamp(checkpoint.created)
+            self.console.print(f"[cyan]Resuming {scan_type} scan of {target}: {checkpoint.progress()} of "
+                               f"{checkpoint.total} probes already done[/cyan]")
+            self.logger.info(f"Resuming {scan_type} scan of {target} at {checkpoint.progress()}/{checkpoint.total}")
+        else:
+            try:
+                hosts = self.create_target_space([target])
+            except (ValueError, OSError) as e:
+                self.console.print(f"[red]Invalid target {target}: {e}[/red]")
+                self.logger.error(f"Invalid target {target}: {e}")
+                return
+            hosts = self.discover_hosts(hosts, profile)
+            start_time = datetime.now()
+            if self.config.getboolean('SCANNER', 'incremental_scan', fallback=False):
+                hosts, reused = self.check_unchanged_hosts(hosts, scan_type, profile)
+            checkpoint = self.start_checkpoint(target, scan_type, hosts, profile, reused)
+        ports = checkpoint.ports if checkpoint is not None else profile.ports
+        engine = self.create_port_engine(profile)
+        
+        total = len(hosts) * len(ports)
+        
+        open_ports = []
+        if total:
+            with self.create_progress() as progress:
+            
+                task = progress.add_task("[cyan]Network scanning...",
+                                         total=checkpoint.total if checkpoint is not None else total)
+            
+                async def refresh():
+                    while True:
+                        progress.update(task, completed=checkpoint.progress() if checkpoint is not None
+                                        else engine.completed)
+                        await asyncio.sleep(0.1)
+            
+                async def save_progress(interval):
+                    while True:
+                        await asyncio.sleep(interval)
+                        self.save_checkpoint(checkpoint, engine)
+            
+                async def run_scan():
+                    tasks = [asyncio.ensure_future(refresh())]
+                    try:
+                        if checkpoint is None:
+                            return await engine.scan(hosts, ports, self.open_port_callback(),
+                                                     host_major=profile.host_major)
+                        tasks.append(asyncio.ensure_future(save_progress(
+                            self.config.getfloat('SCANNER', 'checkpoint_interval', fallback=60))))
+                        await engine.scan_items(checkpoint.iter_work(), self.open_port_callback(),
+                                                on_done=checkpoint.complete)
+                        return list(checkpoint.open_ports)
+                    finally:
+                        for pending in tasks:
+                            pending.cancel()
+            
+                try:
+                    open_ports = asyncio.run(run_scan())
+                except KeyboardInterrupt:
+                    if checkpoint is not None:
+                        self.save_checkpoint(checkpoint, engine)
+                        self.result_writer.flush()
+                        self.console.print(f"\n[yellow]Scan stopped after {checkpoint.progress()} of "
+                                           f"{checkpoint.total} probes; run it again to resume[/yellow]")
+                        self.logger.info(f"Checkpointed {scan_type} scan of {target} at "
+                                         f"{checkpoint.progress()}/{checkpoint.total}")
+                    raise
+                progress.update(task, completed=checkpoint.total if checkpoint is not None else total,
+                                description="[green]Scan completed!")
+        elif checkpoint is not None:
+            open_ports = list(checkpoint.open_ports)
+            
+        services, findings = self.analyze_endpoints(open_ports, profile)
+        stats = dict(engine.stats)
+        if checkpoint is not None:
+            stats = dict(checkpoint.stats + engine.stats)
+        if reused is not None:
+            self.save_host_states(scan_type, hosts, open_ports, services, findings)
+            stats['hosts_rescanned'] = len(hosts)
+            stats['hosts_unchanged'] = len(reused)
+            for host, state in reused.items():
+                for port, detected in state['services']:
+                    open_ports.append((host, port))
+                    self.emit('open_port', {'target': host, 'port': port, 'unchanged': True})
+                    if detected:
+                        services[(host, port)] = detected
+                        self.emit('service', dict(detected, target=host, port=port, unchanged=True))
+                findings.extend(state['findings'])
+                for finding in state['findings']:
+                    self.emit('finding', dict(finding, unchanged=True))
+        scan_id = self.record_scan(target, scan_type, start_time, stats, open_ports, services, findings)
+        if checkpoint is not None:
+            self.get_result_writer().write('checkpoint_clear', (target, scan_type))
+        
+        self.logger.info(f"Network scan {scan_id} on {target}: {total} probes, {len(open_ports)} open ports"
+                         + (f", {len(reused)} unchanged hosts skipped" if reused else ''))
+        self.console.print(f"\n[green]Network scan completed: {target}[/green]")
+        self.show_scan_results(scan_id)
+        if findings:
+            self.show_findings(scan_id, "Vulnerability Findings")
+
+    def analyze_endpoints(self, open_ports, profile):
+        # The expensive per-port stages; incremental scans only run them on hosts that changed
+        services = self.detect_services(open_ports, profile)
+        findings = []
+        if open_ports and profile.options.get('vulnerabilities', False):
+            endpoints = [(host, port) for host, port in open_ports
+                         if port in TLS_PORTS or (services.get((host, port)) or {}).get('service') == 'HTTPS']
+            if endpoints:
+                findings.extend(self.analyze_tls(endpoints)[0])
+            origins = [f"{APP_PORTS[port]}://{host}:{port}" for host, port in open_ports if port in APP_PORTS]
+            if origins:
+                findings.extend(self.probe_origins(origins)[1])
+        return services, findings
+
+    def load_host_states(self, hosts, scan_type, chunk=500):
+        if self.result_writer is not None:
+            self.result_writer.flush()
+        states = {}
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        hosts = iter(hosts)
+        try:
+            # Chunks off an iterator, so a large target space is never listed in full
+            for batch in iter(lambda: list(itertools.islice(hosts, chunk)), []):
+                rows = conn.execute(
+                    f"""SELECT host, open_ports, full_scan, results FROM host_state
+                        WHERE scan_type = ? AND host IN ({','.join('?' * len(batch))})""",
+                    (scan_type, *batch)
+                )
+                for host, ports, full_scan, results in rows:
+                    states[host] = ({int(port) for port in ports.split(',') if port}, full_scan, results)
+        finally:
+            conn.close()
+        return states
+
+    def check_unchanged_hosts(self, hosts, scan_type, profile):
+        # Cheap pass over live hosts: re-probe last known open ports plus the quick set, and keep the
+        # stored results of hosts whose open ports match and whose last full scan is within the TTL
+        ttl = self.config.getfloat('SCANNER', 'incremental_ttl_hours', fallback=24) * 3600
+        now = time.time()
+        live = collections.Counter()
+
+        def iter_live():
+            for host in hosts.iter_canonical():
+                live['hosts'] += 1
+                yield host
+
+        candidates = {host: state for host, state in self.load_host_states(iter_live(), scan_type).items()
+                      if now - state[1] < ttl}
+        reused = {}
+        if candidates:
+            quick = {port for port in self.get_scan_profile('fast').ports if port in profile.ports}
+            check_ports = quick.union(*(state[0] for state in candidates.values()))
+            observed = collections.defaultdict(set)
+            if check_ports:
+                plan = PortPlan(((port, port) for port in sorted(check_ports)), order='sequential')
+                engine = self.create_port_engine(profile)
+                with self.create_progress() as progress:
+                    task = progress.add_task(f"[cyan]Checking {len(candidates)} known hosts for changes...",
+                                             total=None)
+                    for host, port in asyncio.run(engine.scan(TargetSpace(list(candidates), literal=True), plan)):
+                        observed[host].add(port)
+                    progress.update(task, description="[green]Change check completed!")
+            for host, (ports, _, results) in candidates.items():
+                if observed[host] & (quick | ports) == ports:
+                    reused[host] = json.loads(results)
+            if reused:
+                self.get_result_writer().write_many('host_checked', ((now, host, scan_type) for host in reused))
+        
+        total = live['hosts']
+        self.logger.info(f"Incremental scan: {len(reused)} of {total} hosts unchanged")
+        self.console.print(f"[green]{len(reused)} of {total} hosts unchanged since their last full scan[/green]")
+        return (hosts.without(reused) if reused else hosts), reused
+
+    def save_host_states(self, scan_type, hosts, open_ports, services, findings):
+        now = time.time()
+        states = {host: {'services': [], 'findings': []} for host in hosts if host}
+        for host, port in sorted(open_ports):
+            states[host]['services'].append((port, services.get((host, port))))
+        for finding in findings:
+            if finding['target'] in states:
+                states[finding['target']]['findings'].append(finding)
+        self.get_result_writer().write_many('host_state', (
+            (host, scan_type, ','.join(str(port) for port, _ in state['services']), now, now,
+             json.dumps(state, default=str))
+            for host, state in states.items()
+        ))
+
+    def start_checkpoint(self, target, scan_type, hosts, profile, reused=None):
+        min_probes = self.config.getint('SCANNER', 'checkpoint_min_probes', fallback=50000)
+        if (self.config.getfloat('SCANNER', 'checkpoint_interval', fallback=60) <= 0
+                or len(hosts) * len(profile.ports) < min_probes):
+            return None
+        checkpoint = ScanCheckpoint.start(target, scan_type, hosts, profile, reused)
+        self.get_result_writer().write('checkpoint', checkpoint.to_row())
+        return checkpoint
+
+    def save_checkpoint(self, checkpoint, engine):
+        self.get_result_writer().write('checkpoint_progress', checkpoint.progress_row(engine.stats))
+
+    def load_checkpoint(self, target, scan_type, profile):
+        if self.config.getfloat('SCANNER', 'checkpoint_interval', fallback=60) <= 0:
+            return None
+        if self.result_writer is not None:
+            self.result_writer.flush()
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            row = conn.execute('SELECT * FROM scan_checkpoints WHERE target = ? AND scan_type = ?',
+                               (target, scan_type)).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        max_age = self.config.getfloat('SCANNER', 'checkpoint_max_age_hours', fallback=72) * 3600
+        try:
+            checkpoint = ScanCheckpoint.from_row(row)
+        except (ValueError, KeyError, zlib.error) as e:
+            self.logger.warning(f"Ignoring unreadable checkpoint for {scan_type} scan of {target}: {e}")
+            checkpoint = None
+        if checkpoint is None or not checkpoint.matches(profile) or time.time() - row['updated'] > max_age:
+            # The profile changed or the checkpoint is too old to trust; start over
+            self.get_result_writer().write('checkpoint_clear', (target, scan_type))
+            return None
+        checkpoint.hosts.cache = self.get_probe_cache()
+        return checkpoint
+
+    def get_target_space_options(self):
+        return {
+            'max_hosts': self.config.getint('NETWORK', 'max_hosts_per_scan', fallback=0),
+            'permute': self.config.getboolean('NETWORK', 'randomize_hosts', fallback=False),
+            'seed': random.randrange(1 << 32)
+        }
+
+    def create_target_space(self, specs):
+        space = TargetSpace(specs, **self.get_target_space_options())
+        space.cache = self.get_probe_cache()
+        if space.truncated:
+            self.warn_truncated(space)
+        return space
+
+    def discover_hosts(self, space, profile):
+        if (len(space) <= 1 or not profile.options.get('discovery', True)
+                or not self.config.getboolean('NETWORK', 'host_discovery', fallback=True)):
+            return space
+        ports = PortPlan.parse(self.config.get('NETWORK', 'discovery_ports', fallback='80,443,22,445,3389'),
+                               order='sequential')
+        discovery = HostDiscovery(
+            ports=ports,
+            timeout=self.config.getfloat('NETWORK', 'discovery_timeout', fallback=1.0),
+            engine_options=self.get_port_engine_options(profile)
+        )
+        
+        with self.create_progress() as progress:
+            task = progress.add_task(f"[cyan]Discovering live hosts among {len(space)}...", total=None)
+            live = asyncio.run(discovery.discover(space, lambda host: progress.update(task, advance=1)))
+            progress.update(task, description=f"[green]{len(live)} hosts up")
+        
+        self.logger.info(f"Host discovery: {len(live)} of {len(space)} hosts up {dict(discovery.stats)}")
+        self.console.print(f"[green]{len(live)} of {len(space)} hosts are up[/green]")
+        # Keep randomize_hosts: the live hosts are walked in the same seeded pseudo-random order
+        live_space = TargetSpace(live, permute=space.prime is not None, seed=space.seed, literal=True)
+        live_space.cache = space.cache
+        live_space.resolved.update(space.resolved)
+        return live_space
+
+    def warn_truncated(self, space):
+        self.console.print(f"[yellow]Target has {space.total} hosts; scanning the first {space.size} "
+                           f"([NETWORK] max_hosts_per_scan)[/yellow]")
+        self.logger.warning(f"Target truncated from {space.total} to {space.size} hosts")
+
+    def create_progress(self):
+        if self.headless:
+            return NullProgress()
+        return Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
             BarColumn(),
             TaskProgressColumn(),
             console=self.console
-        ) as progress:
-            
-            task = progress.add_task("[cyan]Network scanning...", total=100)
+        )
+
+    def current_sink(self):
+        # Daemon workers scan in parallel, each reporting to its own job
+        return getattr(self.local, 'event_sink', None) or self.event_sink
+
+    def emit(self, kind, record):
+        sink = self.current_sink()
+        if sink is not None:
+            sink(kind, record)
+
+    def open_port_callback(self):
+        if self.current_sink() is None:
+            return None
+        return lambda host, port: self.emit('open_port', {'target': host, 'port': port})
+
+    def finding_callback(self, progress, task):
+        def on_finding(finding):
+            progress.update(task, advance=1)
+            self.emit('finding', finding)
+        return on_finding
+
+    def detect_services(self, open_ports, profile):
+        if (not open_ports or not profile.options.get('services', True)
+                or not self.config.getboolean('SCANNER', 'service_detection', fallback=True)):
+            return {}
+        detector = ServiceDetector(
+            concurrency=profile.threads * 10,
+            timeout=self.config.getfloat('SCANNER', 'banner_timeout', fallback=3.0),
+            max_bytes=self.config.getint('SCANNER', 'banner_max_bytes', fallback=2048),
+            cache=self.get_probe_cache()
+        )
+        
+        with self.create_progress() as progress:
+            task = progress.add_task("[cyan]Fingerprinting services...", total=len(open_ports))
             
-            for i in range(100):
-                time.sleep(0.1)
+            def on_result(host, port, info):
                 progress.update(task, advance=1)
-                
-            progress.update(task, description="[green]Scan completed!")
+                self.emit('service', dict(info, target=host, port=port))
             
-        self.console.print(f"\n[green]Network scan completed: {target}[/green]")
-        self.show_scan_results()
+            services = asyncio.run(detector.detect(open_ports, on_result))
+            progress.update(task, description="[green]Fingerprinting completed!")
+        
+        self.logger.info(f"Service detection on {len(open_ports)} ports: {dict(detector.stats)}")
+        return services
+
+    def record_scan(self, target, scan_type, start_time, stats, open_ports, services=None, findings=None):
+        scan_id = str(uuid.uuid4())
+        services = services or {}
+        results = [self.build_port_result(host, port, services.get((host, port))) for host, port in sorted(
+            open_ports, key=lambda item: (ipaddress_sort_key(item[0]), item[1]))]
+        self.scan_results[scan_id] = {
+            'target': target,
+            'scan_type': scan_type,
+            'start_time': start_time,
+            'end_time': datetime.now(),
+            'stats': dict(stats),
+            'results': results,
+            'findings': list(findings or [])
+        }
+        self.save_scan_results(scan_id)
+        # The thread-local copy tells a daemon worker which scans are its own
+        self.last_scan_id = self.local.last_scan_id = scan_id
+        diff = self.diff_scan(scan_id)
+        self.emit('scan', {
+            'scan_id': scan_id, 'target': target, 'scan_type': scan_type,
+            'start_time': start_time, 'end_time': self.scan_results[scan_id]['end_time'],
+            'open_ports': len(results), 'findings': len(self.scan_results[scan_id]['findings']),
+            'changes': {kind: len(items) for kind, items in diff.items()} if diff else None
+        })
+        if scan_type != 'distributed' and self.config.getboolean('REPORTING', 'auto_export', fallback=False):
+            self.generate_report(scan_id)
+        return scan_id
+
+    def diff_scan(self, scan_id):
+        scan = self.scan_results[scan_id]
+        fingerprint = ScanFingerprint.from_scan(scan['results'], scan['findings'])
+        previous = self.load_fingerprint(target=scan['target'], scan_type=scan['scan_type'])
+        self.get_result_writer().write('fingerprint', (
+            scan_id, scan['target'], scan['scan_type'], time.time(), len(fingerprint), *fingerprint.to_blobs()))
+        if previous is None:
+            scan['diff'] = None
+            return None
+        
+        diff = diff_fingerprints(previous[1], fingerprint)
+        scan['diff'] = dict(diff, previous_scan_id=previous[0])
+        if any(diff.values()):
+            self.alerts.scan_delta(scan['target'], diff)
+            self.console.print(f"[cyan]Changes since scan {previous[0][:8]}: {len(diff['new'])} new, "
+                               f"{len(diff['resolved'])} resolved, {len(diff['changed'])} changed[/cyan]")
+        else:
+            self.console.print(f"[cyan]No changes since scan {previous[0][:8]}[/cyan]")
+        return diff
+
+    def load_fingerprint(self, scan_id=None, target=None, scan_type=None):
+        if self.result_writer is not None:
+            self.result_writer.flush()
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            if scan_id is not None:
+                row = conn.execute(
+                    'SELECT scan_id, keys, states, labels FROM scan_fingerprints WHERE scan_id = ?', (scan_id,)
+                ).fetchone()
+            else:
+                row = conn.execute(
+                    """SELECT scan_id, keys, states, labels FROM scan_fingerprints
+                       WHERE target = ? AND scan_type = ? ORDER BY created DESC LIMIT 1""",
+                    (target, scan_type)
+                ).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        return row[0], ScanFingerprint.from_blobs(*row[1:])
+
+    def show_scan_diff(self, scan_id, previous_id=None):
+        current = self.load_fingerprint(scan_id)
+        if current is None:
+            self.console.print(f"[red]No fingerprint stored for scan {scan_id}[/red]")
+            return None
+        if previous_id is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            try:
+                row = conn.execute(
+                    """SELECT previous.scan_id FROM scan_fingerprints AS current
+                       JOIN scan_fingerprints AS previous
+                         ON previous.target = current.target AND previous.scan_type = current.scan_type
+                        AND previous.created < current.created
+                       WHERE current.scan_id = ? ORDER BY previous.created DESC LIMIT 1""",
+                    (scan_id,)
+                ).fetchone()
+            finally:
+                conn.close()
+            if row is None:
+                self.console.print("[yellow]No earlier scan of the same target to compare with[/yellow]")
+                return None
+            previous_id = row[0]
+        previous = self.load_fingerprint(previous_id)
+        if previous is None:
+            self.console.print(f"[red]No fingerprint stored for scan {previous_id}[/red]")
+            return None
+        
+        diff = diff_fingerprints(previous[1], current[1])
+        table = Table(title=f"Changes from {previous_id[:8]} to {scan_id[:8]}")
+        table.add_column("Change", style="cyan")
+        table.add_column("Kind", style="magenta")
+        table.add_column("Severity", style="red")
+        table.add_column("Details", style="yellow")
+        for change, rows in (('New', diff['new']), ('Resolved', diff['resolved'])):
+            for kind, severity, text in rows[:200]:
+                table.add_row(change, kind, severity.capitalize(), text)
+        for (_, old_severity, old_text), (kind, severity, text) in diff['changed'][:200]:
+            table.add_row('Changed', kind, f"{old_severity.capitalize()} -> {severity.capitalize()}",
+                          text if text == old_text else f"{old_text} -> {text}")
+        self.console.print(table)
+        self.console.print(f"[cyan]{len(diff['new'])} new, {len(diff['resolved'])} resolved, "
+                           f"{len(diff['changed'])} changed[/cyan]")
+        return diff
+
+    def create_port_engine(self, profile=None):
+        return PortScanEngine(**self.get_port_engine_options(profile))
+
+    def get_port_engine_options(self, profile=None):
+        max_threads = self.config.getint('SCANNER', 'max_threads', fallback=100)
+        scan_timeout = self.config.getint('SCANNER', 'scan_timeout', fallback=30)
+        if profile is not None:
+            max_threads, scan_timeout = profile.threads, profile.timeout
+        return {
+            'concurrency': max_threads * scan_timeout,
+            'speed': self.config.get('NETWORK', 'scan_speed', fallback='fast'),
+            'max_timeout': self.config.getfloat('NETWORK', 'network_timeout', fallback=10.0),
+            'retries': self.config.getint('NETWORK', 'retry_attempts', fallback=0)
+        }
+
+    def get_shard_workers(self):
+        parallel_scans = self.config.getint('PERFORMANCE', 'parallel_scans', fallback=5)
+        cpu_limit = self.config.getint('PERFORMANCE', 'cpu_usage_limit', fallback=80)
+        cores = int((os.cpu_count() or 1) * cpu_limit / 100)
+        return max(1, min(parallel_scans, cores))
+
+    def get_default_ports(self):
+        ports = self.config.get('NETWORK', 'default_ports', fallback='')
+        custom = self.config.get('NETWORK', 'custom_ports', fallback='')
+        return PortPlan.parse(f"{ports},{custom}")
+
+    def load_scan_profiles(self):
+        profiles = {}
+        if self.config.has_section('SCAN_PROFILES'):
+            for name, spec in self.config.items('SCAN_PROFILES'):
+                try:
+                    profiles[name] = compile_scan_profile(name, spec)
+                except ValueError as e:
+                    self.logger.warning(f"Ignoring scan profile {name}: {e}")
+        return profiles
+
+    def get_scan_profile(self, scan_type):
+        if self.scan_profiles is None:
+            self.scan_profiles = self.load_scan_profiles()
+        profile = self.scan_profiles.get(SCAN_TYPE_PROFILES.get(scan_type, scan_type))
+        if profile is None:
+            profile = ScanProfile(
+                name='default',
+                ports=self.get_default_ports(),
+                timeout=self.config.getint('SCANNER', 'scan_timeout', fallback=30),
+                threads=self.config.getint('SCANNER', 'max_threads', fallback=100),
+                host_major=False,
+                options=types.MappingProxyType({})
+            )
+        return profile
+
+    def build_port_result(self, host, port, detected=None):
+        detected = detected or {}
+        service = detected.get('service') or COMMON_SERVICES.get(port, 'Unknown')
+        return {
+            'target': host,
+            'port': port,
+            'service': service,
+            'product': detected.get('product'),
+            'version': detected.get('version'),
+            'banner': detected.get('banner', ''),
+            'status': 'Open',
+            'risk': SERVICE_RISK.get(service, PORT_RISK.get(port, 'Low')) if detected.get('service')
+                    else PORT_RISK.get(port, 'Low')
+        }
+
+    def save_scan_results(self, scan_id):
+        scan = self.scan_results[scan_id]
+        writer = self.get_result_writer()
+        # The description is part of the natural key, so product details go in the service column
+        writer.write_many('vulnerability', (
+            (r['target'], r['port'], ' '.join(filter(None, (r['service'], r.get('product'), r.get('version')))),
+             'Open Port', r['risk'].lower(), f"{r['service']} service exposed on {r['port']}/tcp", None, None)
+            for r in scan['results']
+        ))
+        writer.write_many('vulnerability', (
+            (f['target'], f['port'], f['service'], f['vulnerability_type'], f['severity'],
+             f['description'], f.get('cve_id'), f.get('remediation'))
+            for f in scan['findings']
+        ))
+        # Same key expression as VULNERABILITY_KEY, so the report joins back through idx_vulnerabilities_key
+        writer.write_many('scan_finding', (
+            (scan_id, r['target'], r['port'], 'Open Port', f"{r['service']} service exposed on {r['port']}/tcp")
+            for r in scan['results']
+        ))
+        writer.write_many('scan_finding', (
+            (scan_id, f['target'], -1 if f['port'] is None else f['port'], f['vulnerability_type'],
+             f.get('cve_id') or f['description'])
+            for f in scan['findings']
+        ))
+        writer.write('scan', (
+            scan_id, scan['target'], scan['start_time'].isoformat(), scan['end_time'].isoformat(),
+            len(scan['results']) + len(scan['findings']), 'completed', json.dumps({'scan_type': scan['scan_type']})
+        ))
+
+    def get_result_writer(self):
+        if self.result_writer is None:
+            self.result_writer = ResultWriter(
+                self.db_path,
+                queue_size=self.config.getint('PERFORMANCE', 'db_queue_size', fallback=50000),
+                batch_size=self.config.getint('PERFORMANCE', 'db_batch_size', fallback=1000)
+            )
+            self.result_writer.start()
+            atexit.register(self.result_writer.close)
+        return self.result_writer
+
+    def get_probe_cache(self):
+        if self.probe_cache is None and self.config.getboolean('PERFORMANCE', 'disk_cache_enabled', fallback=False):
+            self.probe_cache = ProbeCache(
+                self.config.get('PERFORMANCE', 'cache_path', fallback='heax_cache.db'),
+                max_bytes=self.config.getint('PERFORMANCE', 'cache_size_mb', fallback=500) * 1024 * 1024,
+                ttl=self.config.getfloat('PERFORMANCE', 'cache_ttl_hours', fallback=24) * 3600
+            )
+            atexit.register(self.probe_cache.close)
+        return self.probe_cache
+
+    def get_scheduler(self):
+        if self.scheduler is None:
+            self.scheduler = ScanScheduler(self)
+        return self.scheduler
+
+    def start_scheduler(self):
+        if not self.config.getboolean('SCHEDULER', 'enabled', fallback=True):
+            return None
+        return self.get_scheduler().start()
+
+    def run_batch_scan(self, targets, scan_type='normal', profile=None, ports=None):
+        # Network scans take every target in one spec; crypto and app scans take URLs one at a time
+        self.local.last_scan_id = None
+        if profile is not None:
+            self.get_scan_profile(profile)
+            if profile not in self.scan_profiles:
+                self.logger.error(f"Unknown scan profile {profile}; configured: {', '.join(self.scan_profiles)}")
+                return False
+            scan_type = profile
+        if ports:
+            self.perform_targeted_scan(' '.join(targets), ports)
+        elif scan_type in ('crypto', 'app'):
+            urls = [target for target in targets if '://' in target]
+            hosts = [target for target in targets if '://' not in target]
+            scan = self.perform_crypto_scan if scan_type == 'crypto' else self.perform_app_service_scan
+            for target in urls + ([' '.join(hosts)] if hosts else []):
+                scan(target)
+        else:
+            self.perform_network_scan(' '.join(targets), scan_type)
+        return self.local.last_scan_id is not None
 
-    def perform_multi_network_scan(self, networks):
+    def perform_multi_network_scan(self, networks, scan_type='normal', profile=None):
         self.console.print(f"\n[green]Starting scan for {len(networks)} networks...[/green]")
         
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            futures = [executor.submit(self.perform_network_scan, network, "normal") 
-                      for network in networks]
+        profile = profile or self.get_scan_profile(scan_type)
+        space_options = self.get_target_space_options()
+        try:
+            space = TargetSpace(networks, **space_options)
+        except (ValueError, OSError) as e:
+            self.console.print(f"[red]Invalid target: {e}[/red]")
+            self.logger.error(f"Invalid target: {e}")
+            return
+        space.cache = self.get_probe_cache()
+        if space.truncated:
+            self.warn_truncated(space)
+        live = self.discover_hosts(space, profile)
+        spec_map = None
+        if live is not space:
+            space_options = dict(space_options, max_hosts=0, literal=True)
+            targets = list(live.iter_items())
+            # Shards see each live host as its own spec; map those back to the network it came from
+            spec_map = [space.spec_of(host) for host in targets]
+        else:
+            targets = networks
+        ports = profile.ports
+        workers = self.get_shard_workers()
+        engine_options = self.get_port_engine_options(profile)
+        engine_options['concurrency'] = max(1, engine_options['concurrency'] // workers)
+        
+        # One event loop per worker process; a single worker runs on a thread instead
+        if workers > 1:
+            results_queue = multiprocessing.Queue()
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=init_shard_worker,
+                                           initargs=(results_queue,))
+        else:
+            results_queue = queue.Queue()
+            executor = ThreadPoolExecutor(max_workers=1, initializer=init_shard_worker,
+                                          initargs=(results_queue,))
+        
+        
+        def network_of(host, spec_index):
+            if spec_map is not None and spec_index is not None:
+                spec_index = spec_map[spec_index]
+            return space.spec_of(host) if spec_index is None else spec_index
+        
+        start_time = datetime.now()
+        total = len(live) * len(ports)
+        open_ports = [[] for _ in networks]
+        stats = [collections.Counter() for _ in networks]
+        
+        with executor, self.create_progress() as progress:
+            task = progress.add_task(f"[cyan]Scanning {len(networks)} networks on {workers} workers...", total=total)
+            futures = [executor.submit(run_scan_shard, targets, space_options, ports, shard, workers,
+                                       engine_options)
+                       for shard in range(workers)]
+            
+            finished = 0
+            while finished < workers:
+                try:
+                    message = results_queue.get(timeout=0.5)
+                except queue.Empty:
+                    for future in futures:
+                        if future.done() and future.exception():
+                            raise future.exception()
+                    continue
+                
+                if message[0] == 'progress':
+                    _, _, completed, found = message
+                    progress.update(task, advance=completed)
+                    for host, port, spec_index in found:
+                        spec_index = network_of(host, spec_index)
+                        if spec_index is None:
+                            self.logger.warning(f"Open port {host}:{port} matches none of the scanned networks")
+                            continue
+                        open_ports[spec_index].append((host, port))
+                        self.emit('open_port', {'target': host, 'port': port})
+                else:
+                    for spec_index, counts in message[2].items():
+                        if spec_map is not None and spec_index is not None:
+                            spec_index = spec_map[spec_index]
+                        if spec_index is not None:
+                            stats[spec_index].update(counts)
+                    finished += 1
             
-            for future in futures:
-                future.result()
+            progress.update(task, completed=total, description="[green]Scan completed!")
+        
+        services = self.detect_services([item for found in open_ports for item in found], profile)
+        for network, found, network_stats in zip(networks, open_ports, stats):
+            scan_id = self.record_scan(network, scan_type, start_time, network_stats, found, services)
+            self.console.print(f"\n[green]Network scan completed: {network}[/green]")
+            self.show_scan_results(scan_id)
                 
+        self.logger.info(f"Multi-network scan of {len(networks)} networks: {total} probes on {workers} workers")
         self.console.print("\n[green]All network scans completed[/green]")
 
     def perform_targeted_scan(self, target, ports):
         self.console.print(f"\n[green]Starting targeted scan: {target}:{ports}[/green]")
         
-        time.sleep(2)
-        
-        self.console.print(f"\n[green]Targeted scan completed: {target}[/green]")
-        self.show_scan_results()
+        try:
+            plan = PortPlan.parse(ports, order='sequential')
+        except ValueError as e:
+            self.console.print(f"[red]Invalid ports {ports}: {e}[/red]")
+            self.logger.error(f"Invalid ports {ports}: {e}")
+            return
+        profile = self.get_scan_profile('normal')._replace(name='targeted', ports=plan)
+        self.perform_network_scan(target, 'targeted', profile)
 
     def perform_ai_scan(self, target):
         self.console.print(f"\n[green]Starting AI scan: {target}[/green]")
@@ -508,19 +4976,11 @@ class HeaxScanner:
 
     def perform_quick_scan(self, target):
         self.console.print(f"\n[green]Starting quick scan: {target}[/green]")
-        
-        time.sleep(1)
-        
-        self.console.print(f"\n[green]Quick scan completed: {target}[/green]")
-        self.show_scan_results()
+        self.perform_network_scan(target, 'fast')
 
     def perform_deep_scan(self, target):
         self.console.print(f"\n[green]Starting deep scan: {target}[/green]")
-        
-        time.sleep(5)
-        
-        self.console.print(f"\n[green]Deep scan completed: {target}[/green]")
-        self.show_detailed_results()
+        self.perform_network_scan(target, 'deep')
 
     def perform_critical_scan(self, target):
         self.console.print(f"\n[green]Starting critical vulnerabilities scan: {target}[/green]")
@@ -541,20 +5001,118 @@ class HeaxScanner:
     def perform_crypto_scan(self, target):
         self.console.print(f"\n[green]Starting crypto scan: {target}[/green]")
         
-        time.sleep(3)
+        start_time = datetime.now()
+        open_ports = []
+        if target.startswith(('https://', 'tls://')):
+            url = urllib.parse.urlsplit(target)
+            endpoints = [(url.hostname, url.port or 443)]
+        else:
+            profile = self.get_scan_profile('normal')._replace(
+                name='crypto', ports=PortPlan(((port, port) for port in TLS_PORTS), order='sequential'))
+            try:
+                hosts = self.create_target_space([target])
+            except (ValueError, OSError) as e:
+                self.console.print(f"[red]Invalid target {target}: {e}[/red]")
+                self.logger.error(f"Invalid target {target}: {e}")
+                return
+            hosts = self.discover_hosts(hosts, profile)
+            open_ports = asyncio.run(self.create_port_engine(profile).scan(hosts, profile.ports,
+                                                                           self.open_port_callback()))
+            endpoints = open_ports
+        
+        engine = self.get_tls_analyzer()
+        findings, reports, stats = self.analyze_tls(endpoints)
+        
+        services = {}
+        for endpoint, report in reports.items():
+            cert = engine.certificates.get(report['certificate']) or {}
+            services[endpoint] = {
+                'service': None, 'product': report['protocol'], 'version': report['cipher'],
+                'banner': cert.get('subject', '')
+            }
+        open_ports = sorted(set(open_ports) | set(reports))
+        scan_id = self.record_scan(target, 'crypto', start_time, stats, open_ports, services, findings)
         
+        self.logger.info(f"Crypto scan {scan_id} on {target}: {len(reports)} TLS endpoints, "
+                         f"{len(findings)} findings, {stats}")
         self.console.print(f"\n[green]Crypto scan completed: {target}[/green]")
-        self.show_crypto_results()
+        self.show_crypto_results(scan_id)
+
+    def analyze_tls(self, endpoints):
+        engine = self.get_tls_analyzer()
+        # The resident analyzer's stats and session caches are shared, so daemon workers take turns with it
+        with self.tls_lock, self.create_progress() as progress:
+            engine.stats.clear()
+            task = progress.add_task(f"[cyan]Analyzing TLS on {len(endpoints)} endpoints...", total=None)
+            findings, reports = asyncio.run(engine.scan(endpoints, self.finding_callback(progress, task)))
+            progress.update(task, description="[green]TLS analysis completed!")
+            stats = dict(engine.stats)
+        return findings, reports, stats
+
+    def get_tls_analyzer(self):
+        # Resident for the scanner's lifetime so certificates and TLS sessions carry over between scans
+        if self.tls_analyzer is None:
+            self.tls_analyzer = TlsAnalyzer(
+                concurrency=self.config.getint('SCANNER', 'max_threads', fallback=100),
+                timeout=self.config.getfloat('SCANNER', 'banner_timeout', fallback=5.0),
+                enumerate_ciphers=self.config.getboolean('SCANNER', 'tls_cipher_enumeration', fallback=True),
+                cache=self.get_probe_cache()
+            )
+        return self.tls_analyzer
 
     def perform_app_service_scan(self, target):
         self.console.print(f"\n[green]Starting application scan: {target}[/green]")
         
-        time.sleep(2)
+        start_time = datetime.now()
+        open_ports = []
+        if target.startswith(('http://', 'https://')):
+            origins = [target.rstrip('/')]
+        else:
+            profile = self.get_scan_profile('normal')._replace(
+                name='app', ports=PortPlan(((port, port) for port in APP_PORTS), order='sequential'))
+            try:
+                hosts = self.create_target_space([target])
+            except (ValueError, OSError) as e:
+                self.console.print(f"[red]Invalid target {target}: {e}[/red]")
+                self.logger.error(f"Invalid target {target}: {e}")
+                return
+            hosts = self.discover_hosts(hosts, profile)
+            open_ports = asyncio.run(self.create_port_engine(profile).scan(hosts, profile.ports,
+                                                                           self.open_port_callback()))
+            origins = [f"{APP_PORTS[port]}://{host}:{port}" for host, port in open_ports]
+        
+        engine, findings, fingerprints = self.probe_origins(origins)
+        
+        services = {}
+        for origin, fingerprint in fingerprints.items():
+            url = urllib.parse.urlsplit(origin)
+            services[(url.hostname, url.port)] = {
+                'service': url.scheme.upper(), 'product': fingerprint['server'], 'version': None,
+                'banner': fingerprint['title'] or ''
+            }
+        scan_id = self.record_scan(target, 'app', start_time, engine.stats, open_ports, services, findings)
         
+        self.logger.info(f"Application scan {scan_id} on {target}: {len(origins)} origins, "
+                         f"{len(findings)} findings, requests {dict(engine.stats)}")
         self.console.print(f"\n[green]Application scan completed: {target}[/green]")
-        self.show_app_service_results()
+        self.show_app_service_results(scan_id)
 
-    def show_scan_results(self):
+    def probe_origins(self, origins):
+        engine = AppProbeEngine(
+            concurrency=self.config.getint('SCANNER', 'max_threads', fallback=100),
+            per_host=self.config.getint('SCANNER', 'http_connections_per_host', fallback=4),
+            timeout=self.config.getfloat('NETWORK', 'network_timeout', fallback=10.0),
+            memory_limit_mb=self.config.getint('PERFORMANCE', 'memory_limit_mb', fallback=0),
+            cache=self.get_probe_cache()
+        )
+        
+        with self.create_progress() as progress:
+            task = progress.add_task(f"[cyan]Probing {len(origins)} web origins...", total=None)
+            findings, fingerprints = asyncio.run(engine.scan(origins, self.finding_callback(progress, task)))
+            progress.update(task, description="[green]Application probes completed!")
+        return engine, findings, fingerprints
+
+    def show_scan_results(self, scan_id=None):
         table = Table(title="Scan Results")
         table.add_column("Target", style="cyan")
         table.add_column("Port", style="magenta")
@@ -562,9 +5120,16 @@ class HeaxScanner:
         table.add_column("Status", style="yellow")
         table.add_column("Risk", style="red")
         
-        table.add_row("192.168.1.1", "80", "HTTP", "Open", "Low")
-        table.add_row("192.168.1.1", "443", "HTTPS", "Open", "Low")
-        table.add_row("192.168.1.1", "22", "SSH", "Open", "Medium")
+        scan = self.scan_results.get(scan_id or self.last_scan_id)
+        if not scan or not scan['results']:
+            self.console.print("[yellow]No open ports found[/yellow]")
+            return
+        
+        for result in scan['results']:
+            service = ' '.join(part for part in (result['service'], result.get('product'),
+                                                 result.get('version')) if part)
+            table.add_row(result['target'], str(result['port']), service,
+                          result['status'], result['risk'])
         
         self.console.print(table)
 
@@ -587,23 +5152,79 @@ class HeaxScanner:
     def show_critical_results(self):
         self.console.print("\n[bold red]Critical Vulnerabilities Results[/bold red]")
         self.show_scan_results()
+        
+        if self.result_writer is not None:
+            self.result_writer.flush()
+        conn = sqlite3.connect(self.db_path)
+        try:
+            rows = conn.execute(
+                """SELECT target, port, vulnerability_type, description, last_seen FROM vulnerabilities
+                   WHERE severity = 'critical' AND status = 'open' ORDER BY last_seen DESC LIMIT 50"""
+            ).fetchall()
+        finally:
+            conn.close()
+        if not rows:
+            self.console.print("[yellow]No open critical vulnerabilities[/yellow]")
+            return
+        
+        table = Table(title="Open Critical Vulnerabilities")
+        table.add_column("Target", style="cyan")
+        table.add_column("Port", style="magenta")
+        table.add_column("Type", style="green")
+        table.add_column("Description", style="yellow")
+        table.add_column("Last Seen", style="red")
+        
+        for target, port, vulnerability_type, description, last_seen in rows:
+            table.add_row(target, str(port or ''), vulnerability_type, description, str(last_seen))
+        
+        self.console.print(table)
 
     def show_zero_day_results(self):
         self.console.print("\n[bold magenta]Zero-Day Results[/bold magenta]")
         self.show_scan_results()
 
-    def show_crypto_results(self):
+    def show_crypto_results(self, scan_id=None):
         self.console.print("\n[bold blue]Crypto Scan Results[/bold blue]")
-        self.show_scan_results()
+        self.show_scan_results(scan_id)
+        self.show_findings(scan_id)
 
-    def show_app_service_results(self):
+    def show_app_service_results(self, scan_id=None):
         self.console.print("\n[bold cyan]Application Scan Results[/bold cyan]")
-        self.show_scan_results()
+        self.show_scan_results(scan_id)
+        self.show_findings(scan_id)
+
+    def show_findings(self, scan_id=None, title="Findings"):
+        scan = self.scan_results.get(scan_id or self.last_scan_id)
+        if not scan or not scan['findings']:
+            self.console.print("[yellow]No findings[/yellow]")
+            return
+        
+        table = Table(title=title)
+        table.add_column("Target", style="cyan")
+        table.add_column("Port", style="magenta")
+        table.add_column("Type", style="green")
+        table.add_column("Severity", style="red")
+        table.add_column("Description", style="yellow")
+        
+        for finding in scan['findings']:
+            table.add_row(finding['target'], str(finding['port']), finding['vulnerability_type'],
+                          finding['severity'].capitalize(), finding['description'])
+        
+        self.console.print(table)
 
     def load_and_display_reports(self):
         self.console.print("\n[green]Loading reports...[/green]")
         
-        time.sleep(1)
+        if self.result_writer is not None:
+            self.result_writer.flush()
+        conn = sqlite3.connect(self.db_path)
+        try:
+            rows = conn.execute(
+                """SELECT start_time, target, total_vulnerabilities, scan_status FROM scan_results
+                   ORDER BY start_time DESC LIMIT 20"""
+            ).fetchall()
+        finally:
+            conn.close()
         
         table = Table(title="Previous Reports")
         table.add_column("Date", style="cyan")
@@ -611,10 +5232,56 @@ class HeaxScanner:
         table.add_column("Vulnerabilities", style="green")
         table.add_column("Status", style="yellow")
         
-        table.add_row("2024-01-15", "192.168.1.0/24", "5", "Completed")
-        table.add_row("2024-01-14", "10.0.0.0/24", "3", "Completed")
+        for start_time, target, total, status in rows:
+            table.add_row(str(start_time)[:19].replace('T', ' '), target, str(total), (status or '').capitalize())
         
         self.console.print(table)
+        
+        if rows and Confirm.ask("[cyan]Generate a report of open findings?[/cyan]", default=False):
+            self.generate_report()
+        if rows and Confirm.ask("[cyan]Export scan history to Parquet?[/cyan]", default=False):
+            self.export_history()
+
+    def generate_report(self, scan_id=None, formats=None):
+        if self.result_writer is not None:
+            self.result_writer.flush()
+        formats = formats or [name.strip().lower() for name in self.config.get(
+            'REPORTING', 'report_format', fallback='html,json').split(',') if name.strip()]
+        name = None
+        scan = self.scan_results.get(scan_id)
+        if scan is not None:
+            name = f"heax_report_{scan['start_time'].strftime('%Y%m%d_%H%M%S')}_{scan_id[:8]}"
+        try:
+            generator = ReportGenerator(
+                self.db_path, self.config.get('REPORTING', 'export_path', fallback='reports/'), formats,
+                compress=self.config.getboolean('ADVANCED', 'compression_enabled', fallback=False))
+            paths, count = generator.generate(
+                generator.iter_findings(scan_id if scan else None), name,
+                title=f"HEAX Scanner Report - {scan['target']}" if scan else 'HEAX Scanner Report')
+        except (ValueError, OSError, sqlite3.Error) as e:
+            self.console.print(f"[red]Report generation failed: {e}[/red]")
+            return None
+        self.logger.info(f"Report with {count} findings written to {', '.join(map(str, paths))}")
+        for path in paths:
+            self.console.print(f"[green]Report written: {path}[/green]")
+        return paths
+
+    def export_history(self, full=False, output_dir=None):
+        if self.result_writer is not None:
+            self.result_writer.flush()
+        output_dir = output_dir or os.path.join(
+            self.config.get('REPORTING', 'export_path', fallback='reports/'), 'history')
+        compression = 'zstd' if self.config.getboolean('ADVANCED', 'compression_enabled', fallback=False) else None
+        try:
+            exporter = HistoryExporter(self.db_path, output_dir, compression)
+            results = exporter.export(full)
+        except (RuntimeError, OSError, sqlite3.Error) as e:
+            self.console.print(f"[red]Export failed: {e}[/red]")
+            return None
+        for table, result in results.items():
+            self.console.print(f"[green]{table}: {result['rows']} rows in {result['files']} partitions "
+                               f"under {output_dir}[/green]")
+        return results
 
     def show_settings_menu(self):
         self.console.print("\n[bold green]Scanner Settings[/bold green]")
@@ -656,14 +5323,76 @@ class HeaxScanner:
         for i, integration in enumerate(integrations, 1):
             self.console.print(f"{i}. {integration}")
 
+    def run_maintenance(self):
+        if self.result_writer is not None:
+            self.result_writer.flush()
+        maintenance = DatabaseMaintenance(
+            self.db_path, retention_days=self.config.getint('SECURITY', 'data_retention_days', fallback=90))
+        try:
+            return maintenance.run()
+        except sqlite3.Error as e:
+            self.logger.error(f"Database maintenance failed: {e}")
+            return None
+
+    def start_maintenance(self):
+        if not self.config.getboolean('ADVANCED', 'auto_cleanup', fallback=False):
+            return None
+        interval = self.config.getfloat('ADVANCED', 'cleanup_interval_hours', fallback=24) * 3600
+        
+        def loop():
+            # First pass shortly after startup, then every cleanup_interval_hours
+            delay = 60
+            while True:
+                time.sleep(delay)
+                self.run_maintenance()
+                delay = interval
+        
+        thread = threading.Thread(target=loop, name='heax-maintenance', daemon=True)
+        thread.start()
+        return thread
+
+    def load_dashboard_stats(self):
+        if self.result_writer is not None:
+            self.result_writer.flush()
+        conn = sqlite3.connect(self.db_path)
+        try:
+            # Every read is a primary-key or index lookup on the trigger-maintained summary tables
+            by_severity = collections.Counter()
+            by_status = collections.Counter()
+            for severity, status, count in conn.execute('SELECT severity, status, count FROM vulnerability_stats'):
+                if status == 'open':
+                    by_severity[severity] += count
+                by_status[status] += count
+            total_scans, last_scan = conn.execute(
+                'SELECT total_scans, last_scan FROM scan_stats WHERE id = 1').fetchone() or (0, None)
+            targets = conn.execute(
+                '''SELECT target, critical, open, total FROM target_stats
+                   WHERE open > 0 ORDER BY critical DESC, open DESC LIMIT 10'''
+            ).fetchall()
+        finally:
+            conn.close()
+        return {
+            'total_scans': total_scans,
+            'last_scan': last_scan,
+            'total': sum(by_status.values()),
+            'by_status': dict(by_status),
+            'open_by_severity': dict(by_severity),
+            'top_targets': targets
+        }
+
     def display_dashboard(self):
         self.console.print("\n[bold green]Dashboard[/bold green]")
         
+        data = self.load_dashboard_stats()
+        open_count = data['by_status'].get('open', 0)
+        fixed = data['by_status'].get('fixed', 0)
         stats = {
-            "Total Scans": "156",
-            "Vulnerabilities Found": "23",
-            "Critical Vulnerabilities": "5",
-            "Security Level": "85%"
+            "Total Scans": str(data['total_scans']),
+            "Last Scan": str(data['last_scan'] or '-'),
+            "Vulnerabilities Found": str(data['total']),
+            "Open / Fixed": f"{open_count} / {fixed}",
+            "Critical Vulnerabilities": str(data['open_by_severity'].get('critical', 0)),
+            "Remediated": f"{fixed * 100 // data['total']}%" if data['total'] else "-"
         }
         
         table = Table(title="Quick Stats")
@@ -674,6 +5403,23 @@ class HeaxScanner:
             table.add_row(metric, value)
             
         self.console.print(table)
+        
+        severity_table = Table(title="Open Findings by Severity")
+        severity_table.add_column("Severity", style="cyan")
+        severity_table.add_column("Count", style="red")
+        for severity in ('critical', 'high', 'medium', 'low', 'info', 'unknown'):
+            if data['open_by_severity'].get(severity):
+                severity_table.add_row(severity.capitalize(), str(data['open_by_severity'][severity]))
+        
+        target_table = Table(title="Most Exposed Targets")
+        target_table.add_column("Target", style="cyan")
+        target_table.add_column("Critical", style="red")
+        target_table.add_column("Open", style="yellow")
+        target_table.add_column("Total", style="green")
+        for target, critical, open_findings, total in data['top_targets']:
+            target_table.add_row(target, str(critical), str(open_findings), str(total))
+        
+        self.console.print(Columns([severity_table, target_table]))
 
     def show_schedule_menu(self):
         self.console.print("\n[bold green]Schedule Scans[/bold green]")
@@ -684,9 +5430,95 @@ class HeaxScanner:
 3. Schedule Monthly Scan
 4. Custom Schedule
 5. View Current Schedules
+6. Remove Schedule
         """
         
         self.console.print(schedule_menu)
+        choice = Prompt.ask("[cyan]Choose an option[/cyan]", choices=['1', '2', '3', '4', '5', '6'], default='5')
+        if choice == '5':
+            self.show_schedules()
+            return
+        if choice == '6':
+            self.remove_schedule(Prompt.ask("[cyan]Schedule ID[/cyan]"))
+            return
+        
+        targets = Prompt.ask("[cyan]Targets (separated by spaces)[/cyan]").split()
+        scan_type = Prompt.ask("[cyan]Scan type[/cyan]", choices=list(ScanDaemon.SCAN_TYPES), default='normal')
+        try:
+            if choice == '4':
+                expression = schedule_expression(
+                    'cron', Prompt.ask("[cyan]Cron expression (minute hour day month weekday)[/cyan]"))
+            else:
+                every = {'1': 'daily', '2': 'weekly', '3': 'monthly'}[choice]
+                day = None
+                if every == 'weekly':
+                    day = Prompt.ask("[cyan]Day of week[/cyan]", choices=list(CronSchedule.WEEKDAYS), default='sun')
+                elif every == 'monthly':
+                    day = Prompt.ask("[cyan]Day of month (1-28)[/cyan]", default='1')
+                expression = schedule_expression(every, Prompt.ask("[cyan]Start time (HH:MM)[/cyan]", default='02:00'),
+                                                 day)
+        except ValueError as e:
+            self.console.print(f"[red]Invalid schedule: {e}[/red]")
+            return
+        self.add_schedule(targets, expression, scan_type)
+
+    def add_schedule(self, targets, expression, scan_type='normal', profile=None, ports=None, jitter=None, name=None):
+        if not targets:
+            self.console.print("[red]A schedule needs at least one target[/red]")
+            return None
+        if profile is not None:
+            self.get_scan_profile(profile)
+            if profile not in self.scan_profiles:
+                self.console.print(f"[red]Unknown scan profile {profile}[/red]")
+                return None
+        try:
+            schedule_id, next_run = self.get_scheduler().add(targets, expression, scan_type, profile, ports, jitter,
+                                                             name)
+        except ValueError as e:
+            self.console.print(f"[red]Invalid schedule: {e}[/red]")
+            return None
+        self.console.print(f"[green]Scheduled {schedule_id} ({expression}), next run "
+                           f"{datetime.fromtimestamp(next_run):%Y-%m-%d %H:%M}[/green]")
+        return schedule_id
+
+    def remove_schedule(self, schedule_id):
+        removed = self.get_scheduler().remove(schedule_id)
+        if removed == 1:
+            self.console.print(f"[green]Removed schedule {schedule_id}[/green]")
+        elif removed:
+            self.console.print(f"[yellow]{schedule_id} matches {removed} schedules; give more of the ID[/yellow]")
+        else:
+            self.console.print(f"[red]No schedule {schedule_id}[/red]")
+        return removed == 1
+
+    def show_schedules(self):
+        table = Table(title="Scheduled Scans")
+        table.add_column("ID", style="cyan")
+        table.add_column("Name", style="green")
+        table.add_column("Schedule", style="yellow")
+        table.add_column("Type", style="magenta")
+        table.add_column("Next Run", style="blue")
+        table.add_column("Last Status", style="red")
+        for schedule in self.get_scheduler().schedules():
+            request = json.loads(schedule['request'])
+            table.add_row(schedule['schedule_id'][:8], schedule['name'],
+                          f"{schedule['expression']} (+{schedule['jitter'] // 60}m jitter)",
+                          request.get('profile') or request.get('type') or 'normal',
+                          datetime.fromtimestamp(schedule['next_run']).strftime('%Y-%m-%d %H:%M'),
+                          schedule['last_status'] or '-')
+        self.console.print(table)
+
+    def run_scheduler(self):
+        scheduler = self.get_scheduler()
+        self.start_maintenance()
+        self.logger.info(f"Scheduler running ({scheduler.max_concurrent} concurrent scans, "
+                         f"max_scan_duration {scheduler.max_duration}s)")
+        try:
+            scheduler.run()
+        except KeyboardInterrupt:
+            self.logger.info("Scheduler stopping")
+        finally:
+            scheduler.stop()
 
     def show_alert_menu(self):
         self.console.print("\n[bold green]Alert Settings[/bold green]")
@@ -742,7 +5574,102 @@ class HeaxScanner:
         
         self.console.print(help_menu)
 
+    def get_secret_file(self, secret_file=None):
+        return secret_file or self.config.get('SECURITY', 'coordinator_secret_file', fallback='heax_coordinator.key')
+
+    def get_coordinator_secret(self, secret_file=None):
+        # Read from the config or a key file, never the command line, where the process list shows it
+        secret = self.config.get('SECURITY', 'coordinator_secret', fallback='').strip()
+        if secret and secret_file is None:
+            return secret
+        path = self.get_secret_file(secret_file)
+        try:
+            with open(path, encoding='utf-8') as f:
+                secret = f.read().strip()
+            if os.name == 'posix' and os.stat(path).st_mode & 0o077:
+                self.logger.warning(f"Secret file {path} is readable by other users; chmod 600 it")
+        except FileNotFoundError:
+            return None
+        return secret or None
+
+    def create_coordinator_secret(self, secret_file=None):
+        path = self.get_secret_file(secret_file)
+        secret = base64.urlsafe_b64encode(os.urandom(24)).decode('ascii')
+        # Created 0600, so the key is never readable by other users, not even briefly
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(secret + '\n')
+        self.console.print(f"[yellow]No coordinator secret configured; wrote a new one to {path}. "
+                           f"Copy it to each worker and pass --secret-file.[/yellow]")
+        return secret
+
+    def run_coordinator(self, targets, bind, port, lease_seconds, resume=False, secret_file=None):
+        secret = self.get_coordinator_secret(secret_file)
+        if secret is None:
+            try:
+                secret = self.create_coordinator_secret(secret_file)
+            except OSError as e:
+                self.console.print(f"[red]Cannot create a coordinator secret: {e}[/red]")
+                return
+        coordinator = ScanCoordinator(self, bind, port, lease_seconds, secret)
+        job_id = coordinator.resume() if resume else None
+        if job_id is None:
+            if not targets:
+                self.console.print("[red]No targets given and no unfinished job to resume[/red]")
+                return
+            job_id = coordinator.submit(targets, self.get_default_ports())
+        
+        coordinator.start()
+        self.start_maintenance()
+        self.console.print(f"[green]Coordinator for job {job_id} listening on "
+                           f"http://{bind}:{coordinator.port}[/green]")
+        try:
+            while not coordinator.is_finished():
+                time.sleep(1)
+            # Give polling workers a chance to see the job is done before shutting down
+            time.sleep(3)
+        finally:
+            coordinator.stop()
+        self.console.print(f"[green]Job {job_id} completed: {coordinator.progress()}[/green]")
+
+    def run_daemon(self, bind, port, socket_path=None, secret_file=None):
+        # Shares the coordinator's secret; without one the API is unauthenticated, so keep it local
+        secret = self.get_coordinator_secret(secret_file)
+        if secret is None and not socket_path and not is_loopback(bind):
+            self.console.print(f"[red]Refusing to listen on {bind} without a secret: set [SECURITY] "
+                               f"coordinator_secret or pass --secret-file, or use --socket[/red]")
+            self.logger.error(f"Scan daemon not started: {bind} is not a loopback address and no secret is set")
+            return False
+        daemon = ScanDaemon(self, bind, port, socket_path, secret)
+        address = daemon.start()
+        self.start_maintenance()
+        self.start_scheduler()
+        self.logger.info(f"Scan daemon listening on {address} ({daemon.parallel} parallel scans, "
+                         f"queue of {daemon.queue.maxsize})")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            self.logger.info("Scan daemon stopping")
+        finally:
+            daemon.stop()
+        return True
+
+    def run_worker(self, url, worker_id=None, secret_file=None):
+        secret = self.get_coordinator_secret(secret_file)
+        if secret is None:
+            self.console.print(f"[red]No coordinator secret: set [SECURITY] coordinator_secret or copy the "
+                               f"coordinator's {self.get_secret_file(secret_file)}[/red]")
+            return
+        worker = ScanWorker(self, url, worker_id, secret)
+        self.console.print(f"[green]Worker {worker.worker_id} polling {url}[/green]")
+        completed = worker.run()
+        self.console.print(f"[green]Worker finished after {completed} leases[/green]")
+
     def run(self):
+        from rich.traceback import install
+        install()
+        # Scheduled scans and maintenance belong to the resident modes (daemon, schedule run), not a menu session
         try:
             while True:
                 self.display_banner()
@@ -762,12 +5689,187 @@ class HeaxScanner:
             self.logger.error(f"Unexpected error: {e}")
             self.exit_scanner()
 
+def measure_imports(statement, cwd=None):
+    # Per-module cumulative import cost in microseconds, from a fresh interpreter's -X importtime trace
+    output = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement], cwd=cwd,
+                            capture_output=True, text=True, check=True).stderr
+    costs = {}
+    children = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        fields = line[len('import time:'):].split('|')
+        if not fields[1].strip().isdigit():
+            continue
+        depth = (len(fields[2]) - len(fields[2].lstrip()) - 1) // 2
+        name = fields[2].strip()
+        if depth == 0:
+            costs[name] = (int(fields[1]), children)
+            children = {}
+        elif depth == 1:
+            children[name] = int(fields[1])
+    return costs
+
+def startup_benchmark(runs=5, budget_ms=500):
+    console = Console()
+    module = os.path.splitext(os.path.basename(__file__))[0]
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    totals = []
+    modules = collections.defaultdict(list)
+    for _ in range(runs):
+        total, children = measure_imports(f'import {module}', cwd).get(module, (0, {}))
+        totals.append(total)
+        for name, cost in children.items():
+            modules[name].append(cost)
+    deferred = {name: measure_imports(f'import {name}').get(name, (0, {}))[0] for name in LAZY_MODULES}
+    
+    table = Table(title=f"Import cost of {module} (median of {runs} runs)")
+    table.add_column("Module", style="cyan")
+    table.add_column("ms", style="magenta", justify="right")
+    table.add_column("Loaded", style="green")
+    for name, costs in sorted(modules.items(), key=lambda item: -sorted(item[1])[len(item[1]) // 2])[:15]:
+        table.add_row(name, f"{sorted(costs)[len(costs) // 2] / 1000:.1f}", "at startup")
+    for name, cost in sorted(deferred.items(), key=lambda item: -item[1]):
+        table.add_row(name, f"{cost / 1000:.1f}", "on first use")
+    console.print(table)
+    
+    median = sorted(totals)[len(totals) // 2] / 1000
+    within = median <= budget_ms
+    console.print(f"[{'green' if within else 'red'}]Startup import: {median:.1f} ms "
+                  f"(budget {budget_ms} ms)[/{'green' if within else 'red'}]")
+    return within
+
 def main():
+    parser = argparse.ArgumentParser(description="HEAX Scanner")
+    parser.add_argument('--stats', action='store_true', help='Print dashboard statistics and exit')
+    parser.add_argument('--cleanup', action='store_true', help='Run retention cleanup and compaction, then exit')
+    parser.add_argument('--quick', metavar='TARGET', help='Run a quick scan of TARGET without the menu, then exit')
+    subparsers = parser.add_subparsers(dest='command')
+    
+    coordinator = subparsers.add_parser('coordinator', help='Hand out scan leases to remote workers')
+    coordinator.add_argument('targets', nargs='*', help='Networks or hosts to scan')
+    coordinator.add_argument('--bind', default='127.0.0.1', help='Address to listen on')
+    coordinator.add_argument('--port', type=int, default=8765, help='Port to listen on')
+    coordinator.add_argument('--lease-seconds', type=int, default=60, help='Lease lifetime without heartbeat')
+    coordinator.add_argument('--resume', action='store_true', help='Resume the last unfinished job')
+    coordinator.add_argument('--secret-file', help='File holding the shared secret workers sign requests with, '
+                                                   'created 0600 if missing (default: [SECURITY] coordinator_secret '
+                                                   'or coordinator_secret_file)')
+    
+    worker = subparsers.add_parser('worker', help='Scan leases handed out by a coordinator')
+    worker.add_argument('url', help='Coordinator URL, e.g. http://127.0.0.1:8765')
+    worker.add_argument('--worker-id', help='Name reported to the coordinator')
+    worker.add_argument('--secret-file', help="File holding the coordinator's shared secret "
+                                              "(default: [SECURITY] coordinator_secret or coordinator_secret_file)")
+    
+    export = subparsers.add_parser('export', help='Export scan history to partitioned Parquet files')
+    export.add_argument('--full', action='store_true', help='Ignore the watermark and export everything')
+    export.add_argument('--output', help='Output directory (default: <export_path>/history)')
+    
+    diff = subparsers.add_parser('diff', help='Show what changed between two scans')
+    diff.add_argument('scan_id', help='Scan to inspect')
+    diff.add_argument('previous_id', nargs='?', help='Scan to compare with (default: previous scan of the target)')
+    
+    scan = subparsers.add_parser('scan', help='Scan without the menu and stream results as JSON Lines')
+    scan.add_argument('targets', nargs='*', help='Addresses, networks, host names or URLs')
+    scan.add_argument('--targets', dest='target_file', metavar='FILE', help='File with one target per line')
+    scan.add_argument('--type', dest='scan_type', default='normal', choices=['fast', 'normal', 'deep', 'crypto', 'app'],
+                      help='Kind of scan (default: normal)')
+    scan.add_argument('--profile', help='Network scan with a [SCAN_PROFILES] entry, e.g. deep_scan')
+    scan.add_argument('--ports', help='Network scan of only these ports, e.g. 22,80,8000-8100')
+    scan.add_argument('--output', choices=['jsonl', 'table'], default='jsonl',
+                      help='jsonl streams events to stdout; table prints the usual tables')
+    
+    daemon = subparsers.add_parser('daemon', help='Stay resident and run scan jobs submitted over a local API')
+    daemon.add_argument('--bind', default='127.0.0.1', help='Address to listen on')
+    daemon.add_argument('--port', type=int, default=8766, help='Port to listen on')
+    daemon.add_argument('--socket', help='Listen on this Unix socket instead of TCP')
+    daemon.add_argument('--secret-file', help='File holding the shared secret clients sign requests with; required '
+                                              'for a non-loopback --bind (default: [SECURITY] coordinator_secret '
+                                              'or coordinator_secret_file)')
+    
+    schedule = subparsers.add_parser('schedule', help='Manage recurring scans')
+    schedule_actions = schedule.add_subparsers(dest='action', required=True)
+    schedule_add = schedule_actions.add_parser('add', help='Add a recurring scan')
+    schedule_add.add_argument('targets', nargs='+', help='Addresses, networks, host names, URLs or @FILE')
+    schedule_add.add_argument('--every', choices=['daily', 'weekly', 'monthly'], default='daily', help='How often')
+    schedule_add.add_argument('--at', default='00:00', help='Local start time HH:MM (default: 00:00)')
+    schedule_add.add_argument('--day', help='Weekday (sun-sat) for weekly, day of the month for monthly')
+    schedule_add.add_argument('--cron', help='Cron expression instead of --every/--at/--day, e.g. "30 2 * * 1-5"')
+    schedule_add.add_argument('--type', dest='scan_type', default='normal',
+                              choices=['fast', 'normal', 'deep', 'crypto', 'app'],
+                              help='Kind of scan (default: normal)')
+    schedule_add.add_argument('--profile', help='Network scan with a [SCAN_PROFILES] entry, e.g. deep_scan')
+    schedule_add.add_argument('--ports', help='Network scan of only these ports, e.g. 22,80,8000-8100')
+    schedule_add.add_argument('--jitter', type=int, metavar='MINUTES',
+                              help='Spread the start over this many minutes (default: [SCHEDULER] jitter_minutes)')
+    schedule_add.add_argument('--name', help='Label shown in the schedule list')
+    schedule_actions.add_parser('list', help='Show recurring scans')
+    schedule_remove = schedule_actions.add_parser('remove', help='Remove a recurring scan')
+    schedule_remove.add_argument('schedule_id', help='Schedule ID or a unique prefix of it')
+    schedule_actions.add_parser('run', help='Run due scans in the foreground until interrupted')
+    
+    benchmark = subparsers.add_parser('benchmark-startup', help='Measure import cost per module')
+    benchmark.add_argument('--runs', type=int, default=5, help='Fresh interpreters to time')
+    benchmark.add_argument('--budget-ms', type=int, default=500, help='Fail when the median import exceeds this')
+    
+    args = parser.parse_args()
+    if args.command == 'benchmark-startup':
+        sys.exit(0 if startup_benchmark(args.runs, args.budget_ms) else 1)
+    
     try:
-        scanner = HeaxScanner()
-        scanner.run()
+        headless = args.command == 'daemon' or (args.command == 'scan' and args.output == 'jsonl')
+        scanner = HeaxScanner(headless=headless)
+        if args.command == 'scan':
+            targets = args.targets + ([f"@{args.target_file}"] if args.target_file else [])
+            if not targets:
+                parser.error('scan needs targets or --targets FILE')
+            if scanner.headless:
+                scanner.event_sink = JsonLinesSink(sys.stdout)
+            completed = scanner.run_batch_scan(targets, args.scan_type, args.profile, args.ports)
+            if scanner.result_writer is not None:
+                scanner.result_writer.flush()
+            sys.exit(0 if completed else 1)
+        elif args.command == 'daemon':
+            if not scanner.run_daemon(args.bind, args.port, args.socket, args.secret_file):
+                sys.exit(1)
+        elif args.command == 'schedule':
+            if args.action == 'add':
+                try:
+                    expression = schedule_expression('cron', args.cron) if args.cron else \
+                        schedule_expression(args.every, args.at, args.day)
+                except ValueError as e:
+                    parser.error(f"invalid schedule: {e}")
+                jitter = None if args.jitter is None else args.jitter * 60
+                if not scanner.add_schedule(args.targets, expression, args.scan_type, args.profile, args.ports,
+                                            jitter, args.name):
+                    sys.exit(1)
+            elif args.action == 'list':
+                scanner.show_schedules()
+            elif args.action == 'remove':
+                sys.exit(0 if scanner.remove_schedule(args.schedule_id) else 1)
+            else:
+                scanner.run_scheduler()
+        elif args.command == 'coordinator':
+            scanner.run_coordinator(args.targets, args.bind, args.port, args.lease_seconds, args.resume,
+                                    args.secret_file)
+        elif args.command == 'worker':
+            scanner.run_worker(args.url, args.worker_id, args.secret_file)
+        elif args.command == 'diff':
+            scanner.show_scan_diff(args.scan_id, args.previous_id)
+        elif args.command == 'export':
+            scanner.export_history(args.full, args.output)
+        elif args.cleanup:
+            stats = scanner.run_maintenance()
+            scanner.console.print(f"[green]Database maintenance: {dict(stats or {})}[/green]")
+        elif args.stats:
+            scanner.display_dashboard()
+        elif args.quick:
+            scanner.perform_quick_scan(args.quick)
+        else:
+            scanner.run()
     except Exception as e:
-        print(f"Error running tool: {e}")
+        print(f"Error running tool: {e}", file=sys.stderr)
         sys.exit(1)
 
 if __name__ == "__main__":
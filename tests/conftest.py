@@ -0,0 +1,24 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+# heax_scanner is a single module at the repository root, not an installed package
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def scanner(tmp_path, monkeypatch):
+    # The scanner keeps its config, database and log in the working directory
+    import heax_scanner
+    shutil.copy(os.path.join(ROOT, 'heax_config.ini'), tmp_path)
+    monkeypatch.chdir(tmp_path)
+    instance = heax_scanner.HeaxScanner(headless=True)
+    instance.config.set('NETWORK', 'host_discovery', 'false')
+    yield instance
+    if instance.result_writer is not None:
+        instance.result_writer.close()
+    if instance.probe_cache is not None:
+        instance.probe_cache.close()
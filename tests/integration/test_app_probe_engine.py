@@ -0,0 +1,109 @@
+import asyncio
+import http.server
+import threading
+
+import pytest
+
+from heax_scanner import AppProbeEngine, ProbeCache
+
+pytest.importorskip('aiohttp')
+
+PAGE = b'''<html><head><title>Staff  Portal</title><meta name="generator" content="WordPress 6.1">
+<script src="/static/jquery-1.12.4.min.js"></script></head><body>
+<form method="post" action="/login"><input type="text" name="user"><input type="password" name="pass"></form>
+</body></html>'''
+
+FILES = {
+    '/.git/HEAD': b'ref: refs/heads/main\n',
+    # Answers 200 but is not an environment file, so it must not be reported
+    '/.env': b'<html>Not here</html>'
+}
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    requests = []
+
+    def respond(self, body):
+        self.requests.append((self.command, self.path))
+        if self.path == '/':
+            status, content_type = 200, 'text/html; charset=utf-8'
+        elif self.path in FILES:
+            status, content_type, body = 200, 'text/plain', FILES[self.path]
+        else:
+            status, content_type, body = 404, 'text/plain', b'missing'
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('X-Powered-By', 'PHP/7.4.3')
+        if self.path == '/':
+            self.send_header('Set-Cookie', 'session=abc; Path=/')
+        self.end_headers()
+        return body
+
+    def do_HEAD(self):
+        self.respond(b'' if self.path != '/' else PAGE)
+
+    def do_GET(self):
+        self.wfile.write(self.respond(FILES.get(self.path, PAGE)))
+
+    def version_string(self):
+        return 'Apache/2.4.41'
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def origin():
+    Handler.requests = []
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def summarize(findings):
+    return sorted((finding['vulnerability_type'], finding['description'].split(': ', 1)[1]) for finding in findings)
+
+
+def test_origin_probe_reports_page_header_cookie_and_path_findings(origin):
+    engine = AppProbeEngine(concurrency=4, timeout=5)
+    findings, fingerprints = asyncio.run(engine.scan([origin]))
+    assert fingerprints[origin] == {
+        'status': 200, 'server': 'Apache/2.4.41', 'powered_by': 'PHP/7.4.3', 'title': 'Staff Portal',
+        'generator': 'WordPress 6.1', 'libraries': {'jquery': '1.12.4'}
+    }
+    found = summarize(findings)
+    assert ('Insecure Form', 'Password form posts over plain HTTP (/login)') in found
+    assert ('Missing CSRF Token', 'POST form without anti-CSRF token (/login)') in found
+    assert ('Vulnerable JavaScript Library', 'jquery 1.12.4 (CVE-2020-11022)') in found
+    assert ('Information Disclosure', "Server header discloses version 'Apache/2.4.41'") in found
+    assert ('Insecure Cookie', "Cookie 'session' lacks Secure/HttpOnly flags") in found
+    assert ('Sensitive File Exposure', 'Exposed Git repository at /.git/HEAD') in found
+    assert not any('/.env' in description for _, description in found)
+    assert ('Missing Security Header', 'Missing clickjacking protection') in found
+    assert all(finding['target'] == '127.0.0.1' and finding['service'] == 'HTTP' for finding in findings)
+    # Paths are confirmed with a body read only when HEAD says they exist
+    assert ('GET', '/server-status') not in Handler.requests
+    assert ('GET', '/.git/HEAD') in Handler.requests
+
+
+def test_cached_origin_replays_its_findings_without_requests(origin, tmp_path):
+    cache = ProbeCache(str(tmp_path / 'cache.db'))
+    first = asyncio.run(AppProbeEngine(timeout=5, cache=cache).scan([origin]))
+    sent = len(Handler.requests)
+    engine = AppProbeEngine(timeout=5, cache=cache)
+    second = asyncio.run(engine.scan([origin]))
+    cache.close()
+    assert summarize(second[0]) == summarize(first[0]) and second[1] == first[1]
+    assert len(Handler.requests) == sent
+    assert engine.stats['cached'] == 1
+
+
+def test_unreachable_origin_has_no_fingerprint():
+    engine = AppProbeEngine(timeout=1)
+    findings, fingerprints = asyncio.run(engine.scan(['http://127.0.0.1:1']))
+    assert findings == [] and fingerprints == {}
+    assert engine.stats['errors'] == 1
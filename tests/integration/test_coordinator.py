@@ -0,0 +1,141 @@
+import json
+import os
+import socket
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from heax_scanner import ScanCoordinator, ScanWorker, post_json, sign_request
+
+SECRET = 'test-secret'
+
+
+@pytest.fixture
+def coordinator(scanner):
+    instance = ScanCoordinator(scanner, port=0, lease_seconds=0.5, secret=SECRET)
+    yield instance
+    instance.stop()
+
+
+def url(coordinator, path):
+    return f"http://127.0.0.1:{coordinator.port}{path}"
+
+
+def lease(coordinator, worker):
+    return post_json(url(coordinator, '/lease'), {'worker': worker}, secret=SECRET)
+
+
+def complete(coordinator, lease_id, worker):
+    return post_json(url(coordinator, '/complete'), {'lease_id': lease_id, 'worker': worker, 'open_ports': []},
+                     secret=SECRET)
+
+
+def post_raw(coordinator, body, headers):
+    request = urllib.request.Request(url(coordinator, '/lease'), data=body,
+                                     headers=dict(headers, **{'Content-Type': 'application/json'}))
+    with pytest.raises(urllib.error.HTTPError) as error:
+        urllib.request.urlopen(request, timeout=5)
+    return error.value.code
+
+
+def test_unsigned_and_forged_requests_are_rejected(coordinator):
+    coordinator.submit(['10.0.0.0/30'], [80])
+    coordinator.start()
+    body = json.dumps({'worker': 'w'}).encode('utf-8')
+    now = str(int(time.time()))
+    stale = str(int(time.time()) - 3600)
+    assert post_raw(coordinator, body, {}) == 401
+    assert post_raw(coordinator, body, {'X-Heax-Timestamp': now,
+                                        'X-Heax-Signature': sign_request('wrong', now, body)}) == 401
+    assert post_raw(coordinator, body, {'X-Heax-Timestamp': stale,
+                                        'X-Heax-Signature': sign_request(SECRET, stale, body)}) == 401
+    # A signature covers the body it was made for
+    assert post_raw(coordinator, b'{"worker": "x"}', {'X-Heax-Timestamp': now,
+                                                      'X-Heax-Signature': sign_request(SECRET, now, body)}) == 401
+    assert lease(coordinator, 'w')['status'] == 'lease'
+
+
+def test_expired_lease_is_reissued_and_only_the_new_holder_completes(coordinator):
+    coordinator.submit(['10.0.0.1'], [80])
+    coordinator.start()
+    first = lease(coordinator, 'slow')
+    assert first['status'] == 'lease'
+    assert lease(coordinator, 'fast')['status'] == 'wait'
+    time.sleep(0.6)
+    second = lease(coordinator, 'fast')
+    assert second['lease_id'] == first['lease_id']
+    with pytest.raises(urllib.error.HTTPError) as error:
+        complete(coordinator, first['lease_id'], 'slow')
+    assert error.value.code == 409
+    assert complete(coordinator, second['lease_id'], 'fast') == {'status': 'ok'}
+    assert coordinator.is_finished()
+    assert [scan['target'] for scan in coordinator.scanner.scan_results.values()] == ['10.0.0.1/32']
+
+
+def test_heartbeat_keeps_the_lease(coordinator):
+    coordinator.submit(['10.0.0.1'], [80])
+    coordinator.start()
+    held = lease(coordinator, 'w1')
+    for _ in range(3):
+        time.sleep(0.3)
+        post_json(url(coordinator, '/heartbeat'), {'lease_id': held['lease_id'], 'worker': 'w1'}, secret=SECRET)
+    assert lease(coordinator, 'w2')['status'] == 'wait'
+
+
+def test_resume_continues_the_unfinished_job(scanner):
+    first = ScanCoordinator(scanner, port=0, lease_seconds=60, secret=SECRET)
+    first.queue_size = 2
+    job_id = first.submit(['10.0.0.1', '10.0.0.2', '10.0.0.3', '10.0.0.4', '10.0.0.5'], [80])
+    first.start()
+    taken = [lease(first, 'w') for _ in range(2)]
+    complete(first, taken[0]['lease_id'], 'w')
+    first.stop()
+
+    resumed = ScanCoordinator(scanner, port=0, lease_seconds=60, secret=SECRET)
+    resumed.queue_size = 2
+    assert resumed.resume() == job_id
+    resumed.start()
+    try:
+        targets = [taken[0]['target']]
+        complete(resumed, taken[1]['lease_id'], 'w')
+        targets.append(taken[1]['target'])
+        while True:
+            item = lease(resumed, 'w')
+            if item['status'] != 'lease':
+                break
+            targets.append(item['target'])
+            complete(resumed, item['lease_id'], 'w')
+        assert item['status'] == 'done'
+        assert sorted(targets) == [f'10.0.0.{i}/32' for i in range(1, 6)]
+        assert resumed.is_finished()
+    finally:
+        resumed.stop()
+
+
+def test_worker_scans_leases_against_a_listener(coordinator):
+    listener = socket.socket()
+    listener.bind(('127.0.0.1', 0))
+    listener.listen(8)
+    port = listener.getsockname()[1]
+    try:
+        coordinator.submit(['127.0.0.1', '127.0.0.2'], [port, port + 1])
+        coordinator.start()
+        worker = ScanWorker(coordinator.scanner, url(coordinator, ''), 'w', SECRET)
+        assert worker.run(poll_interval=0.1) == 2
+        results = {scan['target']: [(r['target'], r['port']) for r in scan['results']]
+                   for scan in coordinator.scanner.scan_results.values()}
+        assert results == {'127.0.0.1/32': [('127.0.0.1', port)], '127.0.0.2/32': []}
+        assert ScanWorker(coordinator.scanner, url(coordinator, ''), 'bad', 'wrong').run(poll_interval=0.1) == 0
+    finally:
+        listener.close()
+
+
+def test_coordinator_secret_file_is_private(scanner, tmp_path):
+    path = str(tmp_path / 'coordinator.key')
+    secret = scanner.create_coordinator_secret(path)
+    assert scanner.get_coordinator_secret(path) == secret
+    if os.name == 'posix':
+        assert os.stat(path).st_mode & 0o777 == 0o600
+    assert scanner.get_coordinator_secret(str(tmp_path / 'missing.key')) is None
@@ -0,0 +1,53 @@
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+from heax_scanner import DatabaseMaintenance
+
+
+def connect(scanner):
+    return sqlite3.connect(scanner.db_path, isolation_level=None)
+
+
+def utc(days_ago):
+    return (datetime.now(timezone.utc) - timedelta(days=days_ago)).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def add_findings(conn, target, count, last_seen, padding=''):
+    conn.executemany(
+        '''INSERT INTO vulnerabilities (target, port, vulnerability_type, severity, description, last_seen)
+           VALUES (?, ?, 'Open Port', 'critical', ?, ?)''',
+        [(target, port, f"finding {port} {padding}", last_seen) for port in range(count)])
+
+
+def test_retention_deletes_in_chunks_and_keeps_the_stats_tables_in_step(scanner):
+    conn = connect(scanner)
+    add_findings(conn, '10.0.0.1', 23, utc(40))
+    add_findings(conn, '10.0.0.2', 3, utc(5))
+    # Scan start times are stored in local time; both sides of the cutoff must be judged against the same instant
+    for scan_id, days_ago in (('old', 31), ('recent', 29)):
+        conn.execute("INSERT INTO scan_results (scan_id, target, start_time, scan_status) VALUES (?, '10.0.0.1', ?, "
+                     "'completed')", (scan_id, (datetime.now() - timedelta(days=days_ago)).isoformat()))
+    
+    stats = DatabaseMaintenance(scanner.db_path, retention_days=30, chunk_size=5, pause=0).run()
+    assert stats['vulnerabilities'] == 23 and stats['scan_results'] == 1
+    assert conn.execute('SELECT target, COUNT(*) FROM vulnerabilities GROUP BY target').fetchall() == [('10.0.0.2', 3)]
+    assert [row[0] for row in conn.execute('SELECT scan_id FROM scan_results')] == ['recent']
+    assert conn.execute('SELECT target, total, open, critical FROM target_stats').fetchall() == [('10.0.0.2', 3, 3, 3)]
+    assert conn.execute("SELECT count FROM vulnerability_stats WHERE severity = 'critical'").fetchone() == (3,)
+    conn.close()
+
+
+def test_compaction_returns_freed_pages_incrementally(scanner):
+    conn = connect(scanner)
+    assert conn.execute('PRAGMA auto_vacuum').fetchone() == (2,)
+    add_findings(conn, '10.0.0.3', 200, utc(40), padding='x' * 2000)
+    pages = conn.execute('PRAGMA page_count').fetchone()[0]
+    
+    maintenance = DatabaseMaintenance(scanner.db_path, retention_days=30, chunk_size=50, pause=0)
+    maintenance.VACUUM_STEP = 16
+    stats = maintenance.run()
+    assert stats['vulnerabilities'] == 200
+    assert stats['pages_freed'] > 0
+    assert conn.execute('PRAGMA freelist_count').fetchone() == (0,)
+    assert conn.execute('PRAGMA page_count').fetchone()[0] < pages
+    conn.close()
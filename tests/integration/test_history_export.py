@@ -0,0 +1,52 @@
+import sqlite3
+
+import pytest
+
+from heax_scanner import HistoryExporter
+
+parquet = pytest.importorskip('pyarrow.parquet')
+
+
+def read_rows(directory):
+    tables = [parquet.read_table(path) for path in sorted(directory.rglob('*.parquet'))]
+    return [row for table in tables for row in table.to_pylist()]
+
+
+def insert(db_path, statement, params=()):
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute(statement, params)
+    conn.close()
+
+
+def test_rows_without_last_seen_are_exported(scanner, tmp_path):
+    # Written by something other than the result writer, so last_seen is left out
+    insert(scanner.db_path, '''INSERT INTO vulnerabilities (target, port, vulnerability_type, severity, description,
+                                                            discovered_date)
+                               VALUES ('10.0.0.1', 22, 'Open Port', 'low', 'ssh', '2026-01-02 03:04:05')''')
+    output = tmp_path / 'history'
+    HistoryExporter(scanner.db_path, output).export()
+    rows = read_rows(output / 'vulnerabilities')
+    assert [(row['target'], str(row['last_seen'])) for row in rows] == [('10.0.0.1', '2026-01-02 03:04:05')]
+    assert (output / 'vulnerabilities' / 'scan_date=2026-01-02').is_dir()
+
+
+def test_refound_rows_are_exported_again_and_dedupe_by_export_id(scanner, tmp_path):
+    insert(scanner.db_path, '''INSERT INTO vulnerabilities (target, port, vulnerability_type, severity, description,
+                                                            last_seen)
+                               VALUES ('10.0.0.1', 80, 'Open Port', 'low', 'http', '2026-01-02 00:00:00')''')
+    output = tmp_path / 'history'
+    first = HistoryExporter(scanner.db_path, output)
+    first.export_id = '20260102000000'
+    assert first.export()['vulnerabilities']['rows'] == 1
+    insert(scanner.db_path, "UPDATE vulnerabilities SET last_seen = '2026-01-05 00:00:00', severity = 'high'")
+    second = HistoryExporter(scanner.db_path, output)
+    second.export_id = '20260105000000'
+    assert second.export()['vulnerabilities']['rows'] == 1
+    
+    rows = read_rows(output / 'vulnerabilities')
+    assert len(rows) == 2 and len({row['id'] for row in rows}) == 1
+    latest = max(rows, key=lambda row: (row['last_seen'], row['export_id']))
+    assert (latest['severity'], latest['export_id']) == ('high', '20260105000000')
+    # Nothing new since the watermark
+    assert HistoryExporter(scanner.db_path, output).export()['vulnerabilities']['rows'] == 0
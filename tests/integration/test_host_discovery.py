@@ -0,0 +1,70 @@
+import asyncio
+import socket
+import time
+
+import pytest
+
+from heax_scanner import HostDiscovery, IcmpPinger, TargetSpace
+
+SILENT = '127.0.0.99'
+
+
+@pytest.fixture
+def listener():
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    sock.listen(16)
+    yield sock.getsockname()[1]
+    sock.close()
+
+
+@pytest.fixture
+def silent_host(listener):
+    # A listener whose accept queue is full drops further SYNs, so the host neither accepts nor resets
+    sock = socket.socket()
+    sock.bind((SILENT, listener))
+    sock.listen(0)
+    fillers = []
+    for _ in range(4):
+        filler = socket.socket()
+        filler.setblocking(False)
+        filler.connect_ex((SILENT, listener))
+        fillers.append(filler)
+    time.sleep(0.1)
+    yield SILENT
+    for filler in fillers:
+        filler.close()
+    sock.close()
+
+
+def discover(hosts, ports):
+    discovery = HostDiscovery(ports=ports, timeout=0.5, engine_options={'concurrency': 64}, use_icmp=False)
+    return discovery, asyncio.run(discovery.discover(hosts))
+
+
+def test_tcp_ping_finds_listeners_and_closed_ports_and_drops_silent_hosts(listener, silent_host):
+    # 127.0.0.1 accepts on the port; 127.0.0.2 refuses it, and an RST still proves the host is up
+    discovery, live = discover(['127.0.0.1', '127.0.0.2', silent_host], [listener])
+    assert sorted(live) == ['127.0.0.1', '127.0.0.2']
+    assert discovery.stats['tcp'] == 2
+
+
+def test_each_live_host_is_reported_once(listener):
+    seen = []
+    discovery = HostDiscovery(ports=[listener, listener + 1], timeout=0.5, use_icmp=False)
+    live = asyncio.run(discovery.discover(TargetSpace(['127.0.0.1-127.0.0.5']), seen.append))
+    assert sorted(live) == sorted(seen) == [f'127.0.0.{i}' for i in range(1, 6)]
+
+
+def test_discover_hosts_keeps_the_randomized_order(scanner, listener, silent_host, monkeypatch):
+    # Loopback answers ICMP for every address, so stick to the TCP ping
+    monkeypatch.setattr(IcmpPinger, 'available', staticmethod(lambda: False))
+    scanner.config.set('NETWORK', 'host_discovery', 'true')
+    scanner.config.set('NETWORK', 'discovery_ports', str(listener))
+    scanner.config.set('NETWORK', 'discovery_timeout', '0.5')
+    space = TargetSpace(['127.0.0.1-127.0.0.40', silent_host], permute=True, seed=1234)
+    live = scanner.discover_hosts(space, scanner.get_scan_profile('fast'))
+    hosts = list(live)
+    assert sorted(hosts) == sorted(f'127.0.0.{i}' for i in range(1, 41))
+    assert live.prime is not None and live.seed == 1234
+    assert hosts != sorted(hosts, key=lambda host: int(host.rsplit('.', 1)[1]))
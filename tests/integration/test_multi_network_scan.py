@@ -0,0 +1,41 @@
+import socket
+
+import pytest
+
+from heax_scanner import PortPlan
+
+
+@pytest.fixture
+def listeners():
+    sockets = []
+    first = socket.socket()
+    first.bind(('127.0.0.1', 0))
+    port = first.getsockname()[1]
+    sockets.append(first)
+    try:
+        second = socket.socket()
+        second.bind(('127.0.0.2', port))
+        sockets.append(second)
+        for sock in sockets:
+            sock.listen(16)
+        yield port
+    finally:
+        for sock in sockets:
+            sock.close()
+
+
+@pytest.mark.parametrize('workers', ['1', '3'])
+def test_each_network_records_its_own_stats(scanner, listeners, workers):
+    scanner.config.set('PERFORMANCE', 'parallel_scans', workers)
+    scanner.config.set('PERFORMANCE', 'cpu_usage_limit', '10000')
+    profile = scanner.get_scan_profile('fast')._replace(ports=PortPlan.parse(f'{listeners}-{listeners + 4}'))
+    networks = ['127.0.0.1', '127.0.0.2-127.0.0.4', 'localhost']
+    scanner.perform_multi_network_scan(networks, 'fast', profile)
+    scans = {scan['target']: scan for scan in scanner.scan_results.values()}
+    assert set(scans) == set(networks)
+    for network, hosts in (('127.0.0.1', 1), ('127.0.0.2-127.0.0.4', 3), ('localhost', 1)):
+        scan = scans[network]
+        assert scan['scan_type'] == 'fast'
+        assert sum(scan['stats'].values()) == hosts * 5
+        assert scan['stats']['open'] == 1
+    assert [(r['target'], r['port']) for r in scans['127.0.0.2-127.0.0.4']['results']] == [('127.0.0.2', listeners)]
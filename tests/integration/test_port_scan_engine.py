@@ -0,0 +1,93 @@
+import asyncio
+import collections
+import errno
+import socket
+
+import pytest
+
+import heax_scanner
+from heax_scanner import PortPlan, PortScanEngine, TargetSpace
+
+HOSTS = ['127.0.0.1', '127.0.0.2', '127.0.0.3', '127.0.0.4']
+
+
+@pytest.fixture
+def listener_farm():
+    # A few listening sockets on each loopback address; every other host/port pair refuses
+    sockets, open_ports = [], set()
+    try:
+        for host in HOSTS:
+            for _ in range(5):
+                sock = socket.socket()
+                sock.bind((host, 0))
+                sock.listen(128)
+                sockets.append(sock)
+                open_ports.add(sock.getsockname())
+        yield open_ports
+    finally:
+        for sock in sockets:
+            sock.close()
+
+
+def scan(engine, hosts, plan, **callbacks):
+    return asyncio.run(engine.scan_items(((host, port) for port in plan for host in hosts), **callbacks))
+
+
+@pytest.mark.parametrize('speed', ['normal', 'insane'])
+def test_engine_finds_exactly_the_listening_ports(listener_farm, speed):
+    ports = sorted({port for _, port in listener_farm})
+    plan = PortPlan(((port, port) for port in ports), order='random', seed=3)
+    engine = PortScanEngine(concurrency=64, speed=speed, max_timeout=2.0)
+    states = {}
+    found = scan(engine, TargetSpace(['127.0.0.1-127.0.0.4']), plan,
+                 on_done=lambda host, port, state: states.__setitem__((host, port), state))
+    assert set(found) == listener_farm
+    assert len(found) == len(listener_farm)
+    assert len(states) == engine.completed == len(HOSTS) * len(ports)
+    assert collections.Counter(states.values()) == {'open': len(listener_farm),
+                                                    'closed': len(states) - len(listener_farm)}
+    assert engine.controller.window.inflight == 0
+
+
+def test_engine_scan_reports_opens_through_callback(listener_farm):
+    host, port = sorted(listener_farm)[0]
+    opened, answered = [], []
+    engine = PortScanEngine(concurrency=16, max_timeout=2.0)
+    found = asyncio.run(engine.scan([host], PortPlan.parse(f'{port - 5}-{port + 5}', order='sequential'),
+                                    on_open=lambda *item: opened.append(item)))
+    assert found == opened
+    assert (host, port) in found
+    assert set(found) <= listener_farm
+
+
+def test_engine_handles_more_probes_than_its_window(listener_farm):
+    farm = {port for host, port in listener_farm if host == '127.0.0.2'}
+    first = max(min(farm) - 1500, 1)
+    ports = PortPlan.parse(f'{first}-{min(first + 3000, 65535)}', order='likely')
+    engine = PortScanEngine(concurrency=32, speed='fast', max_timeout=2.0)
+    found = {port for _, port in scan(engine, ['127.0.0.2'], ports)}
+    assert engine.completed == len(ports)
+    assert {port for port in farm if port in ports} <= found
+    # Anything else open in the range belongs to a wildcard listener on this machine
+    for port in found - farm:
+        with socket.create_connection(('127.0.0.2', port), timeout=2):
+            pass
+
+
+def test_socket_errors_finish_the_probe(listener_farm, monkeypatch):
+    # Every third socket() fails as if the process ran out of descriptors; retries pick those up
+    real_socket, calls = socket.socket, collections.Counter()
+
+    def flaky_socket(*args, **kwargs):
+        calls['socket'] += 1
+        if calls['socket'] % 3 == 0:
+            raise OSError(errno.EMFILE, 'Too many open files')
+        return real_socket(*args, **kwargs)
+
+    monkeypatch.setattr(heax_scanner.socket, 'socket', flaky_socket)
+    ports = sorted({port for _, port in listener_farm})
+    engine = PortScanEngine(concurrency=16, max_timeout=2.0, retries=5)
+    found = scan(engine, HOSTS, PortPlan(((port, port) for port in ports), order='sequential'))
+    assert set(found) == listener_farm
+    assert engine.completed == len(HOSTS) * len(ports)
+    assert engine.controller.window.inflight == 0
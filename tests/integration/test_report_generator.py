@@ -0,0 +1,60 @@
+import csv
+import gzip
+import json
+import xml.etree.ElementTree as ElementTree
+
+import pytest
+
+from heax_scanner import ReportGenerator
+
+# A banner with terminal escapes, a bell, a NUL and markup characters
+BANNER = 'SSH-2.0-\x1b[31mOpenSSH\x07\x00 <&> "quoted"'
+
+
+def finding(target, port, severity, description):
+    return (target, port, 'SSH', 'Open Port', severity, description, None, 'Restrict access')
+
+
+@pytest.fixture
+def findings(scanner):
+    writer = scanner.get_result_writer()
+    writer.write_many('vulnerability', [
+        finding('10.0.0.1', 22, 'high', BANNER),
+        finding('10.0.0.1', 23, 'critical', 'telnet'),
+        finding('10.0.0.2', 22, 'low', 'other scan')
+    ])
+    writer.write_many('scan_finding', [
+        ('scan-a', '10.0.0.1', 22, 'Open Port', BANNER),
+        ('scan-a', '10.0.0.1', 23, 'Open Port', 'telnet'),
+        ('scan-b', '10.0.0.2', 22, 'Open Port', 'other scan')
+    ])
+    writer.flush()
+    return scanner.db_path
+
+
+def test_xml_report_drops_control_characters_and_stays_well_formed(findings, tmp_path):
+    generator = ReportGenerator(findings, tmp_path, ['xml'])
+    paths, count = generator.generate(generator.iter_findings(), 'report', title='Scan \x1b of <lab>')
+    root = ElementTree.parse(paths[0]).getroot()
+    assert count == 3 and root.get('title') == 'Scan  of <lab>'
+    descriptions = [element.findtext('description') for element in root.iter('finding')]
+    assert 'SSH-2.0-[31mOpenSSH <&> "quoted"' in descriptions
+    # Most severe first, and the summary matches the rows
+    assert [element.get('severity') for element in root.iter('finding')] == ['critical', 'high', 'low']
+    assert root.find('summary').get('total') == '3'
+
+
+def test_scan_report_covers_only_that_scan_in_every_format(findings, tmp_path):
+    generator = ReportGenerator(findings, tmp_path, ['json', 'csv', 'xml', 'html', 'pdf'], compress=True)
+    paths, count = generator.generate(generator.iter_findings('scan-a'), 'scan-a')
+    assert count == 2
+    assert sorted(path.name for path in paths) == ['scan-a.csv.gz', 'scan-a.html.gz', 'scan-a.jsonl.gz',
+                                                   'scan-a.pdf', 'scan-a.xml.gz']
+    with gzip.open(tmp_path / 'scan-a.jsonl.gz', 'rt', encoding='utf-8') as f:
+        rows = [json.loads(line) for line in f]
+    assert [(row['target'], row['port']) for row in rows] == [('10.0.0.1', 23), ('10.0.0.1', 22)]
+    with gzip.open(tmp_path / 'scan-a.csv.gz', 'rt', encoding='utf-8', newline='') as f:
+        assert len(list(csv.DictReader(f))) == 2
+    with gzip.open(tmp_path / 'scan-a.xml.gz') as f:
+        assert len(ElementTree.parse(f).getroot().findall('finding')) == 2
+    assert (tmp_path / 'scan-a.pdf').read_bytes().startswith(b'%PDF-1.4')
@@ -0,0 +1,60 @@
+import sqlite3
+
+import pytest
+
+from heax_scanner import ResultWriter
+
+
+@pytest.fixture
+def writer(scanner):
+    instance = ResultWriter(scanner.db_path, batch_size=10)
+    instance.start()
+    yield instance
+    instance.close()
+
+
+def finding(port, severity='low', remediation=None, description='exposed'):
+    return ('10.0.0.1', port, 'HTTP', 'Open Port', severity, description, None, remediation)
+
+
+def rows(scanner, query):
+    conn = sqlite3.connect(scanner.db_path)
+    try:
+        return conn.execute(query).fetchall()
+    finally:
+        conn.close()
+
+
+def test_refound_findings_update_one_row(scanner, writer):
+    writer.write('vulnerability', finding(80, remediation='Close it'))
+    assert writer.flush(10)
+    writer.write('vulnerability', finding(80, severity='high'))
+    assert writer.flush(10)
+    assert rows(scanner, 'SELECT port, severity, remediation, seen_count FROM vulnerabilities') == [
+        (80, 'high', 'Close it', 2)]
+
+
+def test_rows_are_committed_in_batches(scanner, writer):
+    writer.write_many('vulnerability', (finding(port) for port in range(25)))
+    assert writer.flush(10)
+    assert rows(scanner, 'SELECT COUNT(*) FROM vulnerabilities') == [(25,)]
+    assert writer.stats['rows'] == 25
+    assert writer.stats['batches'] >= 3
+
+
+def test_a_failing_batch_is_dropped_whole_and_the_writer_keeps_going(scanner, writer):
+    # The second row has too few values, so the whole transaction rolls back
+    writer.write_many('vulnerability', [finding(1), finding(2)[:5]])
+    assert writer.flush(10)
+    assert writer.stats['dropped'] == 2
+    assert rows(scanner, 'SELECT COUNT(*) FROM vulnerabilities') == [(0,)]
+    writer.write('vulnerability', finding(3))
+    assert writer.flush(10)
+    assert rows(scanner, 'SELECT port FROM vulnerabilities') == [(3,)]
+
+
+def test_close_commits_what_is_still_queued(scanner, writer):
+    writer.write_many('vulnerability', (finding(port) for port in range(5)))
+    writer.close()
+    assert not writer.is_alive()
+    assert rows(scanner, 'SELECT COUNT(*) FROM vulnerabilities') == [(5,)]
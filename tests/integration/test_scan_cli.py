@@ -0,0 +1,58 @@
+import configparser
+import json
+import os
+import socket
+import subprocess
+import sys
+
+import pytest
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'heax_scanner.py')
+
+
+@pytest.fixture
+def workdir(tmp_path):
+    # The CLI reads heax_config.ini from its working directory; keep the banner wait short
+    config = configparser.ConfigParser()
+    config.read(os.path.join(os.path.dirname(SCRIPT), 'heax_config.ini'), encoding='utf-8')
+    config.set('SCANNER', 'banner_timeout', '0.5')
+    with open(tmp_path / 'heax_config.ini', 'w', encoding='utf-8') as f:
+        config.write(f)
+    return tmp_path
+
+
+@pytest.fixture
+def listener():
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    sock.listen(16)
+    yield sock.getsockname()[1]
+    sock.close()
+
+
+def run_scan(workdir, *args):
+    return subprocess.run([sys.executable, SCRIPT, 'scan', *args], cwd=workdir, capture_output=True, text=True,
+                          timeout=120)
+
+
+def test_scan_streams_json_lines_to_stdout(workdir, listener):
+    probe = socket.socket()
+    probe.bind(('127.0.0.1', 0))
+    closed = probe.getsockname()[1]
+    probe.close()
+    result = run_scan(workdir, '127.0.0.1', '--ports', f"{listener},{closed}")
+    assert result.returncode == 0, result.stderr
+    events = [json.loads(line) for line in result.stdout.splitlines()]
+    kinds = [event['type'] for event in events]
+    assert kinds[-1] == 'scan'
+    assert [(event['target'], event['port']) for event in events if event['type'] == 'open_port'] == [
+        ('127.0.0.1', listener)]
+    scan = events[-1]
+    assert scan['target'] == '127.0.0.1' and scan['scan_type'] == 'targeted' and scan['open_ports'] == 1
+    assert all('time' in event for event in events)
+
+
+def test_scan_with_invalid_ports_fails_with_clean_stdout(workdir):
+    result = run_scan(workdir, '127.0.0.1', '--ports', '70000')
+    assert result.returncode == 1
+    assert result.stdout == ''
@@ -0,0 +1,104 @@
+import json
+import socket
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from heax_scanner import ScanDaemon, post_json, sign_request
+
+SECRET = 'test-secret'
+
+
+@pytest.fixture
+def listeners():
+    socks = []
+    for _ in range(3):
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        sock.listen(16)
+        socks.append(sock)
+    yield [sock.getsockname()[1] for sock in socks]
+    for sock in socks:
+        sock.close()
+
+
+@pytest.fixture
+def daemon(scanner):
+    scanner.config.set('PERFORMANCE', 'parallel_scans', '3')
+    scanner.config.set('SCANNER', 'service_detection', 'false')
+    instance = ScanDaemon(scanner, port=0, secret=SECRET)
+    instance.start()
+    yield instance
+    instance.stop()
+
+
+def url(daemon, path):
+    return f"http://127.0.0.1:{daemon.port}{path}"
+
+
+def get(daemon, path, secret=None):
+    headers = {}
+    if secret:
+        timestamp = str(int(time.time()))
+        headers = {'X-Heax-Timestamp': timestamp, 'X-Heax-Signature': sign_request(secret, timestamp, b'')}
+    with urllib.request.urlopen(urllib.request.Request(url(daemon, path), headers=headers), timeout=5) as response:
+        return json.loads(response.read())
+
+
+def test_daemon_with_a_secret_refuses_unsigned_requests(daemon):
+    with pytest.raises(urllib.error.HTTPError) as error:
+        post_json(url(daemon, '/scans'), {'targets': ['127.0.0.1']})
+    assert error.value.code == 401
+    with pytest.raises(urllib.error.HTTPError) as error:
+        get(daemon, '/scans')
+    assert error.value.code == 401
+    assert get(daemon, '/health')['status'] == 'ok'
+    assert get(daemon, '/scans', SECRET) == {'jobs': []}
+
+
+def test_daemon_refuses_a_public_bind_without_a_secret(scanner):
+    assert scanner.run_daemon('0.0.0.0', 0) is False
+
+
+def test_parallel_jobs_each_get_their_own_scan(daemon, listeners):
+    # Three jobs run at once on the shared scanner; every job must see only the scan it started
+    job_ids = [post_json(url(daemon, '/scans'), {'targets': ['127.0.0.1'], 'ports': str(port)},
+                         secret=SECRET)['job_id'] for port in listeners]
+    deadline = time.time() + 60
+    while not all(daemon.jobs[job_id].done for job_id in job_ids) and time.time() < deadline:
+        time.sleep(0.1)
+    for job_id, port in zip(job_ids, listeners):
+        job = daemon.jobs[job_id]
+        assert job.state == 'completed'
+        assert len(job.scan_ids) == 1
+        assert [event['port'] for event in job.events if event['type'] == 'open_port'] == [port]
+        assert [result['port'] for result in daemon.scanner.scan_results[job.scan_ids[0]]['results']] == [port]
+
+
+def test_batch_scan_ignores_scans_recorded_by_other_threads(scanner, listeners, monkeypatch):
+    recorded = threading.Event()
+    failing_started = threading.Event()
+    perform_targeted_scan = scanner.perform_targeted_scan
+
+    def targeted_scan(target, ports):
+        if target == 'failing':
+            # Fails without recording a scan, but only after the other thread has recorded one
+            failing_started.set()
+            recorded.wait(30)
+            return
+        failing_started.wait(30)
+        perform_targeted_scan(target, ports)
+        recorded.set()
+
+    monkeypatch.setattr(scanner, 'perform_targeted_scan', targeted_scan)
+    results = {}
+    threads = [threading.Thread(target=lambda target=target: results.__setitem__(
+        target, scanner.run_batch_scan([target], ports=str(listeners[0])))) for target in ('127.0.0.1', 'failing')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(60)
+    assert results == {'127.0.0.1': True, 'failing': False}
@@ -0,0 +1,94 @@
+import asyncio
+import socket
+import threading
+import time
+
+import pytest
+
+from heax_scanner import ProbeCache, ServiceDetector
+
+
+class BannerListener:
+    # Answers each connection with canned bytes: greeting services talk first, the others wait for a request
+    def __init__(self, greeting=b'', reply=()):
+        self.greeting = greeting
+        self.reply = reply
+        self.connections = 0
+        self.sock = socket.socket()
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.listen(16)
+        self.port = self.sock.getsockname()[1]
+        threading.Thread(target=self.serve, daemon=True).start()
+
+    def serve(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            self.connections += 1
+            threading.Thread(target=self.handle, args=(conn,), daemon=True).start()
+
+    def handle(self, conn):
+        with conn:
+            try:
+                if self.greeting:
+                    conn.sendall(self.greeting)
+                if self.reply:
+                    conn.recv(1024)
+                    for part in self.reply:
+                        conn.sendall(part)
+                        time.sleep(0.05)
+                time.sleep(0.5)
+            except OSError:
+                pass
+
+    def close(self):
+        self.sock.close()
+
+
+@pytest.fixture
+def listeners():
+    servers = {
+        'ssh': BannerListener(greeting=b'SSH-2.0-OpenSSH_9.6p1 Ubuntu-3\r\n'),
+        # The response headers arrive in two segments; detection must wait for the end of the header block
+        'http': BannerListener(reply=(b'HTTP/1.1 200 OK\r\nDate: today\r\n', b'Server: nginx/1.25.3\r\n\r\n')),
+        'odd': BannerListener(greeting=b'\x00\x1bwelcome\x07 friend\r\nsecond line')
+    }
+    yield servers
+    for server in servers.values():
+        server.close()
+
+
+def closed_port():
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def test_banners_are_grabbed_and_identified(listeners):
+    detector = ServiceDetector(timeout=1.0)
+    endpoints = [('127.0.0.1', server.port) for server in listeners.values()] + [('127.0.0.1', closed_port())]
+    results = asyncio.run(detector.detect(endpoints))
+    ssh, http, odd, closed = (results[endpoint] for endpoint in endpoints)
+    assert (ssh['service'], ssh['product'], ssh['version']) == ('SSH', 'OpenSSH', '9.6p1')
+    assert (http['service'], http['product'], http['version']) == ('HTTP', 'nginx', '1.25.3')
+    assert http['banner'] == 'HTTP/1.1 200 OK'
+    # Unknown services keep a printable first line only
+    assert odd['service'] is None and odd['banner'] == '..welcome. friend'
+    assert closed == {'service': None, 'product': None, 'version': None, 'banner': ''}
+    assert detector.stats == {'identified': 2, 'unidentified': 2}
+
+
+def test_cached_banners_skip_the_connection(listeners, tmp_path):
+    cache = ProbeCache(str(tmp_path / 'cache.db'))
+    endpoint = ('127.0.0.1', listeners['ssh'].port)
+    first = asyncio.run(ServiceDetector(timeout=1.0, cache=cache).detect([endpoint]))
+    detector = ServiceDetector(timeout=1.0, cache=cache)
+    second = asyncio.run(detector.detect([endpoint]))
+    cache.close()
+    assert first == second
+    assert listeners['ssh'].connections == 1
+    assert detector.stats['cached'] == 1
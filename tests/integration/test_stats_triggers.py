@@ -0,0 +1,69 @@
+import sqlite3
+
+
+def execute(scanner, statement, params=()):
+    conn = sqlite3.connect(scanner.db_path)
+    with conn:
+        conn.execute(statement, params)
+    conn.close()
+
+
+def recounted(scanner):
+    # What the summary tables should hold, counted the slow way
+    conn = sqlite3.connect(scanner.db_path)
+    try:
+        severity = conn.execute('''SELECT severity, status, COUNT(*) FROM vulnerabilities
+                                   GROUP BY 1, 2 ORDER BY 1, 2''').fetchall()
+        targets = conn.execute('''SELECT target, COUNT(*), SUM(status = 'open'),
+                                         SUM(status = 'open' AND severity = 'critical')
+                                  FROM vulnerabilities GROUP BY target ORDER BY target''').fetchall()
+        stored_severity = conn.execute('''SELECT severity, status, count FROM vulnerability_stats
+                                          WHERE count != 0 ORDER BY 1, 2''').fetchall()
+        stored_targets = conn.execute('''SELECT target, total, open, critical FROM target_stats
+                                         WHERE total != 0 ORDER BY target''').fetchall()
+    finally:
+        conn.close()
+    return (severity, targets), (stored_severity, stored_targets)
+
+
+def nonzero(counts):
+    # Emptied buckets stay behind with a zero count
+    return {key: count for key, count in counts.items() if count}
+
+
+def write_findings(scanner, *findings):
+    writer = scanner.get_result_writer()
+    writer.write_many('vulnerability', findings)
+    writer.flush()
+
+
+def finding(target, port, severity):
+    return (target, port, 'HTTP', 'Open Port', severity, f"port {port}", None, None)
+
+
+def test_summary_tables_follow_upserts_deletes_and_status_moves(scanner):
+    write_findings(scanner, finding('10.0.0.1', 80, 'critical'), finding('10.0.0.1', 22, 'low'),
+                   finding('10.0.0.2', 443, 'medium'))
+    # Found again: one with the same severity (no change), one upgraded (moves between buckets)
+    write_findings(scanner, finding('10.0.0.1', 22, 'low'), finding('10.0.0.2', 443, 'critical'))
+    expected, stored = recounted(scanner)
+    assert stored == expected
+    assert nonzero(scanner.load_dashboard_stats()['open_by_severity']) == {'critical': 2, 'low': 1}
+    
+    execute(scanner, "UPDATE vulnerabilities SET status = 'fixed' WHERE port = 80")
+    execute(scanner, 'DELETE FROM vulnerabilities WHERE port = 22')
+    expected, stored = recounted(scanner)
+    assert stored == expected
+    stats = scanner.load_dashboard_stats()
+    assert nonzero(stats['by_status']) == {'open': 1, 'fixed': 1} and stats['total'] == 2
+    assert nonzero(stats['open_by_severity']) == {'critical': 1}
+    assert [tuple(row) for row in stats['top_targets']] == [('10.0.0.2', 1, 1, 1)]
+
+
+def test_scan_count_follows_inserts_and_deletes(scanner):
+    for scan_id, end_time in (('a', '2026-01-01T10:00:00'), ('b', '2026-01-02T10:00:00')):
+        execute(scanner, "INSERT INTO scan_results (scan_id, target, end_time) VALUES (?, '10.0.0.1', ?)",
+                (scan_id, end_time))
+    execute(scanner, "DELETE FROM scan_results WHERE scan_id = 'a'")
+    stats = scanner.load_dashboard_stats()
+    assert (stats['total_scans'], stats['last_scan']) == (1, '2026-01-02T10:00:00')
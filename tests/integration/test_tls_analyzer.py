@@ -0,0 +1,144 @@
+import asyncio
+import socket
+import ssl
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+x509 = pytest.importorskip('cryptography.x509')
+from cryptography.hazmat.primitives import hashes, serialization  # noqa: E402
+from cryptography.hazmat.primitives.asymmetric import rsa  # noqa: E402
+
+from heax_scanner import ProbeCache, TlsAnalyzer  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def certificate(tmp_path_factory):
+    # Self-signed, 1024-bit and expiring in ten days, so the certificate checks all have something to report
+    key = rsa.generate_private_key(public_exponent=65537, key_size=1024)
+    name = x509.Name([x509.NameAttribute(x509.NameOID.COMMON_NAME, 'heax.test')])
+    now = datetime.now(timezone.utc)
+    cert = (x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key())
+            .serial_number(x509.random_serial_number()).not_valid_before(now - timedelta(days=1))
+            .not_valid_after(now + timedelta(days=10))
+            .add_extension(x509.SubjectAlternativeName([x509.DNSName('heax.test')]), critical=False)
+            .sign(key, hashes.SHA256()))
+    directory = tmp_path_factory.mktemp('tls')
+    (directory / 'cert.pem').write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    (directory / 'key.pem').write_bytes(key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.TraditionalOpenSSL, serialization.NoEncryption()))
+    return str(directory / 'cert.pem'), str(directory / 'key.pem')
+
+
+class TlsListener:
+    # Blocking accept loop wrapping each connection server-side; one context keeps the session cache
+    def __init__(self, certificate, maximum_version=ssl.TLSVersion.TLSv1_2):
+        self.context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        self.context.set_ciphers('DEFAULT:@SECLEVEL=0')
+        self.context.load_cert_chain(*certificate)
+        self.context.maximum_version = maximum_version
+        self.sock = socket.socket()
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.listen(64)
+        self.address = self.sock.getsockname()
+        self.handshakes = 0
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+    def serve(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self.handle, args=(conn,), daemon=True).start()
+
+    def handle(self, conn):
+        try:
+            with self.context.wrap_socket(conn, server_side=True) as tls:
+                self.handshakes += 1
+                tls.settimeout(2)
+                tls.recv(1)
+        except (OSError, ssl.SSLError):
+            conn.close()
+
+    def close(self):
+        # shutdown wakes the blocked accept; close alone does not on Linux
+        self.sock.shutdown(socket.SHUT_RDWR)
+        self.sock.close()
+        self.thread.join(timeout=5)
+
+
+@pytest.fixture
+def listener(certificate):
+    server = TlsListener(certificate)
+    yield server
+    server.close()
+
+
+def scan(analyzer, endpoints):
+    return asyncio.run(analyzer.scan(endpoints))
+
+
+def test_reports_protocol_certificate_and_findings(listener):
+    analyzer = TlsAnalyzer(timeout=3, enumerate_ciphers=False)
+    findings, reports = scan(analyzer, [listener.address])
+    report = reports[listener.address]
+    assert report['protocol'] == 'TLSv1.2'
+    assert 'TLSv1.3' not in report['protocols']
+    cert = analyzer.certificates[report['certificate']]
+    assert cert['names'] == ['heax.test']
+    assert cert['self_signed'] and cert['key_size'] == 1024
+    assert cert['not_after'].tzinfo is not None
+    types = {finding['vulnerability_type'] for finding in findings}
+    assert {'Self-Signed Certificate', 'Weak Certificate Key', 'Certificate Expiring'} <= types
+
+
+def test_session_resumption(listener):
+    analyzer = TlsAnalyzer(timeout=3, enumerate_ciphers=False)
+    _, reports = scan(analyzer, [listener.address])
+    assert reports[listener.address]['resumption'] is True
+    # A revisit resumes the stored session and keeps the chain from the full handshake
+    _, again = scan(analyzer, [listener.address])
+    assert again[listener.address]['resumption'] is True
+    assert again[listener.address]['certificate'] == reports[listener.address]['certificate']
+
+
+def test_certificate_parsed_once_per_fingerprint(certificate):
+    servers = [TlsListener(certificate) for _ in range(3)]
+    try:
+        analyzer = TlsAnalyzer(timeout=3, enumerate_ciphers=False)
+        _, reports = scan(analyzer, [server.address for server in servers])
+        assert len(reports) == 3
+        assert len({report['certificate'] for report in reports.values()}) == 1
+        assert analyzer.stats['certificates_parsed'] == 1
+        assert analyzer.stats['certificate_cache_hits'] >= 2
+    finally:
+        for server in servers:
+            server.close()
+
+
+def test_probe_cache_replays_report(listener, tmp_path):
+    cache = ProbeCache(str(tmp_path / 'cache.db'))
+    try:
+        findings, reports = scan(TlsAnalyzer(timeout=3, enumerate_ciphers=False, cache=cache), [listener.address])
+        handshakes = listener.handshakes
+        analyzer = TlsAnalyzer(timeout=3, enumerate_ciphers=False, cache=cache)
+        cached_findings, cached_reports = scan(analyzer, [listener.address])
+        assert listener.handshakes == handshakes
+        assert analyzer.stats['cached'] == 1
+        assert cached_findings == findings
+        report = cached_reports[listener.address]
+        assert analyzer.certificates[report['certificate']]['not_after'].tzinfo is not None
+    finally:
+        cache.close()
+
+
+def test_unreachable_endpoint_has_no_report():
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    address = sock.getsockname()
+    sock.close()
+    findings, reports = scan(TlsAnalyzer(timeout=1, enumerate_ciphers=False), [address])
+    assert findings == [] and reports == {}
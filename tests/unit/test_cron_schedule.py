@@ -0,0 +1,54 @@
+from datetime import datetime
+
+import pytest
+
+from heax_scanner import CronSchedule, schedule_expression
+
+
+@pytest.mark.parametrize('expression, moment, expected', [
+    ('* * * * *', datetime(2026, 3, 1, 10, 15, 30), datetime(2026, 3, 1, 10, 16)),
+    ('0 * * * *', datetime(2026, 3, 1, 10, 0), datetime(2026, 3, 1, 11, 0)),
+    ('30 2 * * *', datetime(2026, 3, 1, 2, 30), datetime(2026, 3, 2, 2, 30)),
+    ('*/15 9-17 * * mon-fri', datetime(2026, 10, 16, 17, 50), datetime(2026, 10, 19, 9, 0)),
+    ('0 0 1 * *', datetime(2026, 1, 31, 12, 0), datetime(2026, 2, 1, 0, 0)),
+    ('0 0 29 2 *', datetime(2026, 3, 1), datetime(2028, 2, 29, 0, 0)),
+    ('0 12 31 * *', datetime(2026, 4, 1), datetime(2026, 5, 31, 12, 0)),
+    ('0 6 * dec sun', datetime(2026, 11, 30), datetime(2026, 12, 6, 6, 0)),
+    ('0 6 * * 7', datetime(2026, 10, 17), datetime(2026, 10, 18, 6, 0)),
+    # Restricted day-of-month and day-of-week: either one matching fires, as in cron
+    ('0 0 13 * fri', datetime(2026, 10, 10), datetime(2026, 10, 13, 0, 0)),
+    ('0 0 13 * fri', datetime(2026, 10, 13, 0, 0), datetime(2026, 10, 16, 0, 0)),
+])
+def test_next_after(expression, moment, expected):
+    assert CronSchedule(expression).next_after(moment) == expected
+
+
+def test_next_after_is_strictly_later():
+    schedule = CronSchedule('*/5 * * * *')
+    moment = datetime(2026, 10, 17, 8, 0)
+    fires = []
+    for _ in range(4):
+        moment = schedule.next_after(moment)
+        fires.append(moment)
+    assert fires == [datetime(2026, 10, 17, 8, minute) for minute in (5, 10, 15, 20)]
+
+
+@pytest.mark.parametrize('expression', ['* * * *', '60 * * * *', '* 24 * * *', '* * 0 * *', '*/0 * * * *'])
+def test_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        CronSchedule(expression)
+
+
+def test_impossible_date_never_fires():
+    with pytest.raises(ValueError):
+        CronSchedule('0 0 31 2 *').next_after(datetime(2026, 1, 1))
+
+
+@pytest.mark.parametrize('every, at, day, expected', [
+    ('daily', '02:30', None, '30 2 * * *'),
+    ('weekly', '7', 'mon', '0 7 * * mon'),
+    ('monthly', '23:45', 15, '45 23 15 * *'),
+    ('cron', '*/10 * * * *', None, '*/10 * * * *'),
+])
+def test_schedule_expression(every, at, day, expected):
+    assert schedule_expression(every, at, day) == expected
@@ -0,0 +1,19 @@
+import heax_scanner
+from heax_scanner import lazy_import
+
+
+def test_repeated_lazy_imports_are_listed_once(monkeypatch):
+    monkeypatch.setattr(heax_scanner, 'LAZY_MODULES', [])
+    assert lazy_import('aiohttp') is heax_scanner.aiohttp
+    lazy_import('aiohttp')
+    assert heax_scanner.LAZY_MODULES == ['aiohttp']
+
+
+def test_missing_package_is_none(monkeypatch):
+    monkeypatch.setattr(heax_scanner, 'LAZY_MODULES', [])
+    assert lazy_import('heax_no_such_package') is None
+
+
+def test_banner_falls_back_to_plain_text_without_pyfiglet(scanner, monkeypatch):
+    monkeypatch.setattr(heax_scanner, 'pyfiglet', None)
+    assert scanner.banner == 'HEAX SCANNER'
@@ -0,0 +1,74 @@
+import logging
+import sqlite3
+import types
+
+import pytest
+
+import heax_scanner
+from heax_scanner import HeaxScanner, SCHEMA_MIGRATIONS, migrate_database
+
+
+@pytest.fixture
+def legacy_db(tmp_path, monkeypatch):
+    # The unversioned (v0) layout: HeaxScanner's base tables with no migration applied
+    path = str(tmp_path / 'legacy.db')
+    monkeypatch.setattr(heax_scanner, 'migrate_database', lambda conn: [])
+    HeaxScanner.init_database(types.SimpleNamespace(db_path=path, logger=logging.getLogger(__name__)))
+    conn = sqlite3.connect(path)
+    rows = [
+        ('10.0.0.1', 22, 'ssh', 'Open Port', 'medium', 'ssh service exposed on 22/tcp', None, '2026-01-01 00:00:00'),
+        ('10.0.0.1', 22, 'ssh', 'Open Port', 'medium', 'ssh service exposed on 22/tcp', None, '2026-02-01 00:00:00'),
+        ('10.0.0.1', None, 'http', 'Weak TLS', 'high', 'TLSv1.0 accepted', None, '2026-01-05 00:00:00'),
+        ('10.0.0.2', 443, 'https', 'CVE', 'critical', 'Heartbleed', 'CVE-2014-0160', '2026-01-03 00:00:00'),
+        ('10.0.0.2', 443, 'https', 'CVE', 'critical', 'Heartbleed again', 'CVE-2014-0160', '2026-03-03 00:00:00'),
+    ]
+    conn.executemany('''INSERT INTO vulnerabilities
+                        (target, port, service, vulnerability_type, severity, description, cve_id, discovered_date)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)''', rows)
+    conn.execute("INSERT INTO scan_results (scan_id, target, start_time, end_time) "
+                 "VALUES ('s1', 'lab', '2026-01-01', '2026-01-01')")
+    conn.commit()
+    conn.isolation_level = None
+    yield conn
+    conn.close()
+
+
+def test_migrates_v0_to_latest(legacy_db):
+    assert migrate_database(legacy_db) == [version for version, _ in SCHEMA_MIGRATIONS]
+    versions = [row[0] for row in legacy_db.execute('SELECT version FROM schema_version ORDER BY version')]
+    assert versions == list(range(1, len(SCHEMA_MIGRATIONS) + 1))
+    tables = {row[0] for row in legacy_db.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert {'vulnerability_stats', 'target_stats', 'scan_stats', 'export_state', 'scan_fingerprints', 'host_state',
+            'scheduled_scans', 'schedule_runs', 'scan_checkpoints', 'scan_findings'} <= tables
+
+
+def test_duplicates_collapse_onto_oldest_row(legacy_db):
+    migrate_database(legacy_db)
+    rows = legacy_db.execute(
+        'SELECT id, target, port, last_seen, seen_count FROM vulnerabilities ORDER BY id').fetchall()
+    assert rows == [
+        (1, '10.0.0.1', 22, '2026-02-01 00:00:00', 2),
+        (3, '10.0.0.1', None, '2026-01-05 00:00:00', 1),
+        (4, '10.0.0.2', 443, '2026-03-03 00:00:00', 2),
+    ]
+    with pytest.raises(sqlite3.IntegrityError):
+        legacy_db.execute("INSERT INTO vulnerabilities (target, port, vulnerability_type, description) "
+                          "VALUES ('10.0.0.1', 22, 'Open Port', 'ssh service exposed on 22/tcp')")
+
+
+def test_summary_tables_follow_findings(legacy_db):
+    migrate_database(legacy_db)
+    stats = dict(((severity, status), count) for severity, status, count
+                 in legacy_db.execute('SELECT severity, status, count FROM vulnerability_stats'))
+    assert stats == {('medium', 'open'): 1, ('high', 'open'): 1, ('critical', 'open'): 1}
+    legacy_db.execute("UPDATE vulnerabilities SET status = 'fixed' WHERE severity = 'critical'")
+    assert legacy_db.execute("SELECT total, open, critical FROM target_stats WHERE target = '10.0.0.2'").fetchone() \
+        == (1, 0, 0)
+    assert legacy_db.execute('SELECT total_scans FROM scan_stats').fetchone() == (1,)
+
+
+def test_migrations_apply_once(legacy_db):
+    migrate_database(legacy_db)
+    assert migrate_database(legacy_db) == []
+    count = legacy_db.execute('SELECT COUNT(*) FROM schema_version').fetchone()[0]
+    assert count == len(SCHEMA_MIGRATIONS)
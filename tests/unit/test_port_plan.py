@@ -0,0 +1,31 @@
+import pytest
+
+from heax_scanner import PortPlan
+
+
+@pytest.mark.parametrize('order', ['likely', 'random', 'sequential'])
+@pytest.mark.parametrize('spec', ['1-1024', '22,80,443,8000-8100', '1-65535'])
+def test_port_plan_is_a_permutation(order, spec):
+    plan = PortPlan.parse(spec, order=order, seed=42)
+    ports = list(plan)
+    assert len(ports) == len(plan)
+    assert sorted(ports) == sorted(set(ports))
+    assert set(ports) == {port for start, end in plan.ranges for port in range(start, end + 1)}
+    assert [plan[index] for index in range(len(plan))] == ports
+
+
+def test_port_plan_likely_order_puts_top_ports_first():
+    plan = PortPlan.parse('1-1024', order='likely')
+    assert list(plan)[:len(plan.priority)] == list(plan.priority)
+    assert 80 in list(plan)[:10]
+
+
+def test_port_plan_random_order_depends_on_seed():
+    assert list(PortPlan.parse('1-2000', 'random', seed=1)) == list(PortPlan.parse('1-2000', 'random', seed=1))
+    assert list(PortPlan.parse('1-2000', 'random', seed=1)) != list(PortPlan.parse('1-2000', 'random', seed=2))
+
+
+def test_port_plan_is_immutable():
+    plan = PortPlan.parse('1-10')
+    with pytest.raises(AttributeError):
+        plan.size = 3
@@ -0,0 +1,91 @@
+import sqlite3
+
+from heax_scanner import PortPlan, ScanCheckpoint, TargetSpace
+
+COLUMNS = ('target', 'scan_type', 'created', 'updated', 'layout', 'reused', 'cursor', 'done', 'open_ports', 'stats')
+
+
+class Profile:
+    def __init__(self, ports, host_major=False):
+        self.ports = ports
+        self.host_major = host_major
+
+
+def as_row(values):
+    conn = sqlite3.connect(':memory:')
+    conn.row_factory = sqlite3.Row
+    conn.execute(f"CREATE TABLE scan_checkpoints ({', '.join(COLUMNS)})")
+    conn.execute(f"INSERT INTO scan_checkpoints VALUES ({', '.join('?' * len(COLUMNS))})", values)
+    return conn.execute('SELECT * FROM scan_checkpoints').fetchone()
+
+
+def complete(checkpoint, items):
+    items = list(items)
+    for host, port in items:
+        checkpoint.complete(host, port, 'open' if port == 443 else 'closed')
+    return items
+
+
+def run(checkpoint, stop):
+    # Completes items in a scrambled order, the way concurrent probes finish, then stops with
+    # every other in-flight probe unanswered, as if the scanner was killed
+    claimed, finished = [], set()
+    for item in checkpoint.iter_work():
+        claimed.append(item)
+        if len(claimed) == 7:
+            if checkpoint.progress() >= stop:
+                finished.update(complete(checkpoint, claimed[1::2]))
+                break
+            finished.update(complete(checkpoint, reversed(claimed)))
+            claimed.clear()
+    return finished
+
+
+def test_full_walk_probes_every_item_once():
+    hosts = TargetSpace(['10.0.0.0/28', '10.0.1.1'], permute=True, seed=11, literal=True)
+    checkpoint = ScanCheckpoint.start('10.0.0.0/28', 'normal', hosts, Profile(PortPlan.parse('22,80,443,8000-8010')))
+    probes = list(checkpoint.iter_work())
+    assert len(probes) == len(set(probes)) == len(hosts) * len(checkpoint.ports)
+
+
+def test_save_and_resume_round_trip():
+    profile = Profile(PortPlan.parse('20-30,80,443', order='random', seed=1))
+    hosts = TargetSpace(['10.0.0.0/27', 'fe80::1-fe80::4'], permute=True, seed=5, literal=True)
+    checkpoint = ScanCheckpoint.start('lab', 'normal', hosts, profile, reused={'10.9.9.9': []})
+    finished = run(checkpoint, stop=checkpoint.total // 3)
+    assert checkpoint.done, 'the partial walk should leave finished items past the cursor'
+    probed = set(checkpoint.open_ports)
+
+    resumed = ScanCheckpoint.from_row(as_row(checkpoint.to_row()))
+    assert resumed.matches(profile)
+    assert (resumed.cursor, resumed.done, resumed.reused) == (checkpoint.cursor, checkpoint.done, checkpoint.reused)
+    assert list(resumed.ports) == list(checkpoint.ports)
+    assert list(resumed.hosts.iter_slots()) == list(checkpoint.hosts.iter_slots())
+
+    remaining = list(resumed.iter_work())
+    assert len(remaining) == len(set(remaining))
+    assert set(remaining) == {(host, port) for host in hosts for port in profile.ports} - finished
+    complete(resumed, remaining)
+    assert resumed.progress() == resumed.total and not resumed.done
+    assert set(resumed.open_ports) == probed | {(host, port) for host, port in remaining if port == 443}
+    assert {host for host, _ in resumed.open_ports} == set(hosts)
+
+
+def test_progress_row_updates_the_saved_state():
+    hosts = TargetSpace(['10.0.0.0/29'], literal=True)
+    checkpoint = ScanCheckpoint.start('10.0.0.0/29', 'fast', hosts, Profile(PortPlan.parse('1-50')))
+    row = list(checkpoint.to_row())
+    run(checkpoint, stop=100)
+    updated, cursor, done, open_ports, stats = checkpoint.progress_row({'open': 2})[:5]
+    row[3:4] = [updated]
+    row[6:10] = [cursor, done, open_ports, stats]
+    resumed = ScanCheckpoint.from_row(as_row(row))
+    assert resumed.progress() == checkpoint.progress()
+    assert resumed.stats['open'] == 2
+
+
+def test_profile_change_invalidates_checkpoint():
+    hosts = TargetSpace(['10.0.0.1'], literal=True)
+    checkpoint = ScanCheckpoint.start('10.0.0.1', 'normal', hosts, Profile(PortPlan.parse('1-100')))
+    assert not checkpoint.matches(Profile(PortPlan.parse('1-200')))
+    assert not checkpoint.matches(Profile(PortPlan.parse('1-100'), host_major=True))
@@ -0,0 +1,53 @@
+from heax_scanner import ScanFingerprint, diff_fingerprints
+
+
+def port(target, number, service='ssh', version=None, risk='Low'):
+    return {'target': target, 'port': number, 'service': service, 'product': None, 'version': version,
+            'risk': risk}
+
+
+def vuln(target, number, severity, description):
+    return {'target': target, 'port': number, 'vulnerability_type': 'Open Port', 'severity': severity,
+            'description': description, 'cve_id': None}
+
+
+def round_trip(fingerprint):
+    return ScanFingerprint.from_blobs(*fingerprint.to_blobs())
+
+
+def test_added_removed_and_changed_items_are_told_apart():
+    old = ScanFingerprint.from_scan([port('10.0.0.1', 22), port('10.0.0.1', 80, 'http')],
+                                    [vuln('10.0.0.1', 22, 'low', 'weak kex')])
+    new = ScanFingerprint.from_scan([port('10.0.0.1', 22, version='9.6'), port('10.0.0.1', 443, 'https')],
+                                    [vuln('10.0.0.1', 22, 'high', 'weak kex')])
+    diff = diff_fingerprints(round_trip(old), round_trip(new))
+    assert diff['new'] == [('port', 'low', '10.0.0.1:443 https')]
+    assert diff['resolved'] == [('port', 'low', '10.0.0.1:80 http')]
+    assert sorted(diff['changed']) == sorted([
+        (('port', 'low', '10.0.0.1:22 ssh'), ('port', 'low', '10.0.0.1:22 ssh  9.6')),
+        (('vuln', 'low', '10.0.0.1:22 Open Port: weak kex'), ('vuln', 'high', '10.0.0.1:22 Open Port: weak kex'))
+    ])
+
+
+def test_identical_scans_have_no_delta():
+    results = [port('10.0.0.1', number) for number in range(100)]
+    diff = diff_fingerprints(ScanFingerprint.from_scan(results, []), round_trip(ScanFingerprint.from_scan(results, [])))
+    assert diff == {'new': [], 'resolved': [], 'changed': []}
+
+
+def test_state_changes_are_found_in_every_chunk():
+    # Same keys on both sides takes the chunked path; changes at chunk edges must not be missed
+    old = ScanFingerprint.from_scan([port('10.0.0.1', number) for number in range(50)], [])
+    changed = {0, 7, 8, 49}
+    new = ScanFingerprint.from_scan([port('10.0.0.1', number, version='2' if number in changed else None)
+                                     for number in range(50)], [])
+    diff = diff_fingerprints(old, new, chunk=8)
+    assert diff['new'] == diff['resolved'] == []
+    assert sorted(int(after[2].split(':')[1].split()[0]) for _, after in diff['changed']) == sorted(changed)
+
+
+def test_empty_fingerprint_round_trips():
+    empty = round_trip(ScanFingerprint.from_scan([], []))
+    assert len(empty) == 0
+    diff = diff_fingerprints(empty, ScanFingerprint.from_scan([port('10.0.0.9', 22)], []))
+    assert diff['new'] == [('port', 'low', '10.0.0.9:22 ssh')]
@@ -0,0 +1,54 @@
+from heax_scanner import StreamingHTMLAnalyzer
+
+
+def analyze(chunks, scheme='http', **options):
+    analyzer = StreamingHTMLAnalyzer(scheme, **options)
+    for chunk in chunks:
+        if analyzer.feed_bytes(chunk):
+            break
+    return analyzer
+
+
+def titles(analyzer):
+    return [title for title, *_ in analyzer.findings()]
+
+
+def test_every_form_is_reported_up_to_the_cap():
+    page = (b'<html><head><title>Login</title></head><body>'
+            b'<form method="post" action="/a"><input type="password" name="p"></form>'
+            b'<form method="post" action="/b"><input type="text" name="q"></form>'
+            b'<form method="post" action="/c"><input type="hidden" name="csrf_token"></form>')
+    analyzer = analyze([page])
+    assert not analyzer.decided()
+    assert [form['action'] for form in analyzer.forms] == ['/a', '/b', '/c']
+    assert titles(analyzer).count('Missing CSRF Token') == 2
+    assert titles(analyzer).count('Insecure Form') == 1
+
+
+def test_every_mixed_content_script_is_reported():
+    page = b'<html><body><script src="http://cdn.test/a.js"></script><script src="http://cdn.test/b.js"></script>'
+    analyzer = analyze([page], scheme='https')
+    assert titles(analyzer).count('Mixed Content') == 2
+
+
+def test_page_is_decided_at_closing_body():
+    analyzer = analyze([b'<html><head><title>x</title></head><body></body>', b'<form method="post"></form>'])
+    assert analyzer.finished
+    assert analyzer.forms == []
+
+
+def test_commented_out_markup_split_across_chunks_is_ignored():
+    filler = b'x' * 5000
+    chunks = [b'<html><body><!-- ', filler, b'<form method="post" action="/old"><input type="password">',
+              filler, b'</form> -->', b'<p>live</p>']
+    analyzer = analyze(chunks, max_pending=4096)
+    assert analyzer.forms == []
+    assert analyzer.overflowed and analyzer.decided()
+
+
+def test_oversized_inline_script_stops_the_page_instead_of_parsing_its_body():
+    chunks = [b'<html><body><script>', b'var s = "<form method=post>";' * 300, b'</script>']
+    analyzer = analyze(chunks, max_pending=4096)
+    assert analyzer.overflowed
+    assert analyzer.forms == []
+    assert 'Missing CSRF Token' not in titles(analyzer)
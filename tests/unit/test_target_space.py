@@ -0,0 +1,62 @@
+import collections
+
+import pytest
+
+from heax_scanner import TargetSpace
+
+SPECS = ['10.0.0.0/28', '192.168.1.5-192.168.1.9', '127.0.0.1', 'fe80::1-fe80::6']
+
+
+def expected_hosts():
+    hosts = [f"10.0.0.{i}" for i in range(1, 15)] + [f"192.168.1.{i}" for i in range(5, 10)] + ['127.0.0.1']
+    return hosts + [f"fe80::{i}" for i in range(1, 7)]
+
+
+@pytest.mark.parametrize('seed', [None, 1, 7, 12345])
+@pytest.mark.parametrize('permute', [False, True])
+def test_target_space_yields_each_host_once(permute, seed):
+    space = TargetSpace(SPECS, permute=permute, seed=seed, literal=True)
+    hosts = list(space)
+    assert len(space) == len(expected_hosts())
+    assert collections.Counter(hosts) == collections.Counter(expected_hosts())
+
+
+def test_permuted_slots_cover_every_index_once():
+    space = TargetSpace(['10.1.0.0/22'], permute=True, seed=3, literal=True)
+    indices = [space.canonical_index(slot) for slot in range(space.slots)]
+    assert sorted(index for index in indices if index is not None) == list(range(len(space)))
+    assert indices.count(None) == space.slots - len(space)
+
+
+def test_permutation_is_reproducible_from_seed():
+    first = list(TargetSpace(['10.1.0.0/24'], permute=True, seed=99))
+    assert list(TargetSpace(['10.1.0.0/24'], permute=True, seed=99)) == first
+    assert first != sorted(first, key=lambda host: tuple(map(int, host.split('.'))))
+
+
+def test_iter_slots_resumes_mid_walk():
+    space = TargetSpace(['10.2.0.0/25'], permute=True, seed=5)
+    slots = list(space.iter_slots())
+    assert list(space.iter_slots(40)) == slots[40:]
+
+
+def test_max_hosts_truncates():
+    space = TargetSpace(['10.0.0.0/24'], max_hosts=10, permute=True, seed=1)
+    assert space.truncated
+    assert sorted(space, key=lambda host: int(host.rsplit('.', 1)[1])) == [f"10.0.0.{i}" for i in range(1, 11)]
+
+
+def test_spec_of_maps_hosts_to_their_spec():
+    space = TargetSpace(['10.0.0.0/30', '10.9.0.1'])
+    assert space.spec_of('10.0.0.2') == 0
+    assert space.spec_of('10.9.0.1') == 1
+    assert space.spec_of('10.9.0.2') is None
+
+
+def test_without_splits_blocks_around_excluded_hosts():
+    space = TargetSpace(SPECS, literal=True)
+    excluded = {'10.0.0.1', '10.0.0.7', '192.168.1.9', 'fe80::3'}
+    remaining = space.without(excluded)
+    assert collections.Counter(remaining) == collections.Counter(
+        host for host in expected_hosts() if host not in excluded)
+    assert len(remaining.blocks) < len(remaining)